@@ -0,0 +1,115 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+# 동시에 실행하는 집계 작업 수
+DEFAULT_WORKERS = 2
+
+# 실행 중인 작업 외에 기다릴 수 있는 작업 수 (넘으면 바로 거절)
+DEFAULT_MAX_QUEUE = 2
+
+# 요청 하나가 집계 결과를 기다리는 최대 시간 (초)
+DEFAULT_TIMEOUT = 10.0
+
+
+class PoolBusy(Exception):
+    """실행 중/대기 중인 작업이 가득 차 새 작업을 받지 않음"""
+
+
+class PoolTimeout(Exception):
+    """제한 시간 안에 집계가 끝나지 않음"""
+
+
+class AggregationPool:
+    """무거운 집계를 요청 스레드 대신 실행하는 크기 제한 스레드 풀
+
+    동시에 실행하는 작업은 workers개, 기다리는 작업은 max_queue개까지만 받고
+    그 이상은 PoolBusy로 바로 거절합니다(admission control). 그래서 무거운 요청이
+    몰려도 서버의 요청 스레드가 모두 집계에 묶이지 않고, 가벼운 요청(리포트 등)은
+    남은 스레드에서 바로 처리됩니다. 요청 스레드는 timeout초까지만 기다리고
+    PoolTimeout을 냅니다. 스레드는 중간에 멈출 수 없으므로 시간이 초과된 작업도
+    끝까지 실행되며, on_late_result를 주면 늦게 나온 결과를 그 함수로 넘깁니다
+    (응답 캐시에 넣어 두면 다시 요청했을 때 바로 응답).
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_queue=DEFAULT_MAX_QUEUE, timeout=DEFAULT_TIMEOUT):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='aggregation')
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.running = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def _release(self, future):
+        with self._lock:
+            self.pending -= 1
+
+    def submit(self, function):
+        """작업을 대기열에 넣고 Future를 반환합니다. 가득 차 있으면 PoolBusy를 냅니다."""
+        with self._lock:
+            if self.pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise PoolBusy(f'집계 작업 {self.pending}개가 이미 실행/대기 중입니다')
+            self.pending += 1
+
+        def task():
+            with self._lock:
+                self.running += 1
+            try:
+                return function()
+            finally:
+                with self._lock:
+                    self.running -= 1
+
+        try:
+            future = self._executor.submit(task)
+        except BaseException:
+            with self._lock:
+                self.pending -= 1
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def run(self, function, timeout=None, on_late_result=None):
+        """function()을 풀에서 실행하고 결과를 기다려 반환합니다."""
+        future = self.submit(function)
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            if on_late_result is not None:
+                future.add_done_callback(
+                    lambda done: on_late_result(done.result()) if done.exception() is None else None
+                )
+            raise PoolTimeout(f'집계가 {timeout}초 안에 끝나지 않았습니다')
+
+    async def run_async(self, function, timeout=None, on_late_result=None):
+        """run의 asyncio 버전입니다. 결과를 기다리는 동안 이벤트 루프를 막지 않습니다."""
+        future = self.submit(function)
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            # shield: 시간이 초과돼도 풀의 작업은 취소하지 않고 끝까지 실행
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            if on_late_result is not None:
+                future.add_done_callback(
+                    lambda done: on_late_result(done.result()) if done.exception() is None else None
+                )
+            raise PoolTimeout(f'집계가 {timeout}초 안에 끝나지 않았습니다')
+
+    def stats(self):
+        """실행 중/대기 중 작업 수와 거절/시간 초과 횟수를 반환합니다."""
+        with self._lock:
+            return {
+                'running': self.running,
+                'queued': self.pending - self.running,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts,
+            }
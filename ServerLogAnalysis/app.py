@@ -1,11 +1,32 @@
-from flask import Flask, render_template, jsonify, send_from_directory
-import re
+from flask import Flask, Response, g, render_template, jsonify, request, send_from_directory, stream_with_context
 import pandas as pd
 from datetime import datetime
 import os
+import gzip
+import json
+import hashlib
 import logging
+import time
+import threading
 import traceback
 
+from aggregation_pool import AggregationPool, PoolBusy, PoolTimeout
+from log_aggregates import SLOW_REQUEST_COLUMNS, RequestTracker
+from log_anomaly import METRIC_LABELS, AnomalyDetector
+from log_cache import ColumnCache
+from log_feed import LiveFeed
+from log_history import (COMPACT_INTERVAL, INGEST_INTERVAL, MINUTE_ROLLUP_DAYS, RAW_RETENTION_DAYS,
+                         ROLLUP_RETENTION_DAYS, HistoryIngester, LogHistory)
+from log_parser import parse_log_block
+from log_query import QueryError, normalize_query, parse_duration, parse_query_args
+from log_partitions import (REFRESH_INTERVAL, BackgroundRefresher, LogPartition, PartitionedLogStore,
+                            parse_source_specs, source_name)
+from log_rollups import STATUS_CLASSES, CombinedRollups, RollupStore
+from log_shared import SharedLogStore, source_directory
+from log_store import LogStore
+from perf_metrics import metrics, profile_call, sample_stacks
+from response_cache import ResponseCache
+
 app = Flask(__name__, static_folder='static')
 
 # 로깅 설정
@@ -35,47 +56,582 @@ def setup_logging():
 # 로거 초기화
 logger = setup_logging()
 
-# 로그 파일 경로 (프로젝트 루트의 server_sample.log)
-LOG_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'server_sample.log')
+# 로그 파일 경로 (기본: 프로젝트 루트의 server_sample.log, SERVER_LOG_FILE 환경 변수로 변경 가능)
+LOG_FILE = os.environ.get('SERVER_LOG_FILE') or os.path.join(os.path.dirname(os.path.dirname(__file__)), 'server_sample.log')
+
+# 최근/느린 요청 목록 크기와 이상 징후 목록 최대 개수
+RECENT_REQUESTS_SIZE = 10
+SLOW_REQUESTS_SIZE = 5
+ANOMALY_LIMIT = 20
+
+# 파티션(로그 소스)마다 새로 만드는 증분 집계
+# - 분/시간/일 단위 롤업 (차트/통계 API는 원본 행 대신 이 버킷들을 조회)
+# - 최근 요청 링 버퍼와 느린 요청 힙 (조회 조건이 없는 요청은 전체 데이터 대신 여기서 응답)
+# - 엔드포인트별 응답시간/에러 비율 이상 탐지 (수집 시점에 기준선 갱신)
+def new_consumers():
+    return [
+        RollupStore(),
+        RequestTracker(recent_size=RECENT_REQUESTS_SIZE, slow_k=SLOW_REQUESTS_SIZE),
+        AnomalyDetector()
+    ]
+
+# 모든 API가 공유하는 로그 저장소 (소스별 파티션, 디스크 캐시 이후에 새로 추가된 줄만 이어서 파싱)
+# - SERVER_LOG_SOURCES: 여러 호스트의 로그를 호스트별 파티션으로 수집 ('web1=/var/log/web1/access.log*;web2=...')
+# - SHARED_COLUMNS_DIR: serve.py의 운영 모드. 수집 담당 프로세스가 파싱해 공유 메모리에 게시한 열을
+#   모든 작업자가 매핑해 읽음 (SERVER_LOG_SOURCES와 함께 주면 소스마다 source_directory()에 게시된 열)
+# - 둘 다 없으면 LOG_FILE 하나를 파티션 하나로 수집
+LOG_SOURCES = parse_source_specs(os.environ.get('SERVER_LOG_SOURCES', ''))
+SHARED_COLUMNS_DIR = os.environ.get('SHARED_COLUMNS_DIR')
+if LOG_SOURCES and SHARED_COLUMNS_DIR:
+    log_store = PartitionedLogStore({
+        name: SharedLogStore(None, source_directory(SHARED_COLUMNS_DIR, index), consumers=new_consumers())
+        for index, (name, _) in enumerate(LOG_SOURCES)
+    })
+elif LOG_SOURCES:
+    log_store = PartitionedLogStore({
+        name: LogPartition(name, patterns, parse_log_block, consumers=new_consumers())
+        for name, patterns in LOG_SOURCES
+    })
+elif SHARED_COLUMNS_DIR:
+    log_store = PartitionedLogStore({
+        source_name(LOG_FILE): SharedLogStore(LOG_FILE, SHARED_COLUMNS_DIR, consumers=new_consumers())
+    })
+else:
+    log_store = PartitionedLogStore({
+        source_name(LOG_FILE): LogStore(LOG_FILE, parse_log_block, cache=ColumnCache(LOG_FILE), consumers=new_consumers())
+    })
+
+# 새로 추가된 줄은 백그라운드 스레드가 LOG_REFRESH_INTERVAL초마다 반영함
+# (요청 스레드는 게시된 데이터 버전만 읽고 파일 읽기/파싱은 하지 않음)
+log_refresher = BackgroundRefresher(log_store, interval=float(os.environ.get('LOG_REFRESH_INTERVAL', REFRESH_INTERVAL)))
+log_refresher.start()
+
+# 지난 기간 조회용 이력 DB (HISTORY_DB를 주면 수집한 로그를 SQLite에 쌓아 /api/history로 조회)
+# 백그라운드 스레드가 HISTORY_INTERVAL초마다 새로 추가된 부분만 넣고, 보관 정책(HISTORY_*_DAYS)을 적용함
+HISTORY_DB = os.environ.get('HISTORY_DB')
+if HISTORY_DB:
+    history = LogHistory(
+        HISTORY_DB,
+        raw_retention_days=float(os.environ.get('HISTORY_RAW_DAYS', RAW_RETENTION_DAYS)),
+        minute_rollup_days=float(os.environ.get('HISTORY_MINUTE_DAYS', MINUTE_ROLLUP_DAYS)),
+        rollup_retention_days=float(os.environ.get('HISTORY_ROLLUP_DAYS', ROLLUP_RETENTION_DAYS))
+    )
+    history_ingester = HistoryIngester(
+        history, LOG_SOURCES or [('', [LOG_FILE])],
+        interval=float(os.environ.get('HISTORY_INTERVAL', INGEST_INTERVAL)),
+        compact_interval=COMPACT_INTERVAL
+    )
+    history_ingester.start()
+else:
+    history = history_ingester = None
+
+# 분석 리포트 파일 경로 (log_analysis.py가 생성)
+REPORT_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'analysis_report.txt')
+
+# 조회 조건을 (호스트 목록, 나머지 조건)으로 나눔 (호스트는 파티션을 고르는 데만 씀)
+def split_hosts(query):
+    query = dict(query or {})
+    return query.pop('host', None), query
+
+# 고른 파티션들의 증분 집계를 하나로 합침 (파티션이 하나면 그대로 사용)
+def combined_rollups(hosts=None):
+    stores = [store for _, store in log_store.consumers(RollupStore, hosts)]
+    return stores[0] if len(stores) == 1 else CombinedRollups(stores)
+
+def combined_tracker(hosts=None):
+    trackers = log_store.consumers(RequestTracker, hosts)
+    if len(trackers) == 1:
+        return trackers[0][1]
+    tracker = RequestTracker(recent_size=RECENT_REQUESTS_SIZE, slow_k=SLOW_REQUESTS_SIZE)
+    for _, partition_tracker in trackers:
+        tracker.merge(partition_tracker)
+    return tracker
+
+def combined_anomalies(hosts=None):
+    detectors = log_store.consumers(AnomalyDetector, hosts)
+    if not LOG_SOURCES:
+        return detectors[0][1]
+    detector = AnomalyDetector()
+    for name, partition_detector in detectors:
+        detector.merge(partition_detector, host=name)
+    return detector
+
+# 조회 조건에 맞는 롤업 (조건이 없으면 파티션별 전체 롤업을 합쳐서 사용)
+def rollups_for(query):
+    hosts, conditions = split_hosts(query)
+    if not conditions:
+        return combined_rollups(hosts)
+    # 시각 인덱스로 구간의 행만 골라 그 행들로만 임시 롤업을 만듦 (비용은 결과 크기에 비례)
+    # 롤업은 행 순서와 관계없으므로 파티션별 결과를 병합 정렬하지 않고 그대로 더함
+    source = RollupStore()
+    for _, df in log_store.query_partitions(hosts, **conditions):
+        source.update(df)
+    return source
+
+# 요약 통계 계산
+def build_stats(query=None):
+    totals = rollups_for(query).totals()
+    
+    if totals.count == 0:
+        logger.warning("통계 계산을 위한 데이터가 없습니다")
+        return {
+            'total_requests': 0,
+            'avg_response_time': 0,
+            'success_rate': 0,
+            'error_rate': 0
+        }
+    
+    # 기본 통계 (미리 집계된 일 단위 롤업 버킷 기준)
+    total_requests = totals.count
+    avg_response_time = totals.avg_latency()
+    
+    # 성공률과 에러율 계산
+    success_count = totals.status_count('2xx')
+    error_count = totals.status_count('4xx') + totals.status_count('5xx')
+    
+    success_rate = (success_count / total_requests * 100) if total_requests > 0 else 0
+    error_rate = (error_count / total_requests * 100) if total_requests > 0 else 0
+    
+    logger.info(f"통계 계산 완료: 총 요청 {total_requests}개")
+    return {
+        'total_requests': total_requests,
+        'avg_response_time': round(avg_response_time, 2),
+        'success_rate': round(success_rate, 2),
+        'error_rate': round(error_rate, 2)
+    }
+
+# 시계열 차트 단위 선택 (데이터 구간이 짧으면 더 잘게)
+def choose_series_tier(series_span):
+    if series_span <= 3 * 3600:
+        return 'minute'
+    if series_span <= 7 * 86400:
+        return 'hour'
+    return 'day'
+
+SERIES_LABEL_FORMATS = {'minute': '%m-%d %H:%M', 'hour': '%m-%d %H시', 'day': '%Y-%m-%d'}
+
+# 차트 데이터 계산
+def build_chart_data(query=None):
+    source = rollups_for(query)
+    by_endpoint = source.by_endpoint()
+    if not by_endpoint:
+        logger.warning("차트 데이터를 위한 데이터가 없습니다")
+        return {"error": "No data"}
+
+    # 시간별 요청 건수 (하루 중 시각 기준, 기존 차트 호환용)
+    hourly = source.hour_of_day()
+    hourly_labels = [int(x) for x in hourly]
+    hourly_data = [int(x) for x in hourly.values()]
+
+    # 실제 시간축 기준 요청 건수 (날짜가 섞이지 않음)
+    # 단위는 버킷 시작 시각이 아니라 실제 첫/마지막 로그 시각 사이의 길이로 고름
+    earliest, latest = source.time_range()
+    series_span = latest - earliest + 1
+    series_tier = choose_series_tier(series_span)
+    series = source.series(series_tier)
+    series_labels = [datetime.utcfromtimestamp(int(ts)).strftime(SERIES_LABEL_FORMATS[series_tier]) for ts in series]
+    series_data = [int(bucket.count) for bucket in series.values()]
+
+    # 상태 코드 분포
+    totals = source.totals()
+    status_labels = [cls for cls in STATUS_CLASSES if totals.status_count(cls)]
+    status_data = [totals.status_count(cls) for cls in status_labels]
+
+    # 엔드포인트별 호출수
+    endpoint_counts = sorted(by_endpoint.items(), key=lambda item: item[1].count, reverse=True)
+    endpoint_labels = [str(ep) for ep, _ in endpoint_counts]
+    endpoint_data = [int(bucket.count) for _, bucket in endpoint_counts]
+
+    # 엔드포인트별 평균/꼬리 응답시간 (버킷에 저장된 스케치를 합쳐서 계산)
+    endpoint_avg_labels = [str(x) for x in by_endpoint]
+    endpoint_avg_data = [float(b.avg_latency()) for b in by_endpoint.values()]
+    endpoint_p90_data = [float(b.sketch.quantile(0.9)) for b in by_endpoint.values()]
+    endpoint_p99_data = [float(b.sketch.quantile(0.99)) for b in by_endpoint.values()]
+
+    # 모든 값이 기본 타입인지 재확인 (혹시 모를 numpy 타입 방지)
+    def to_py(val):
+        if hasattr(val, 'item'):
+            return val.item()
+        return val
+    hourly_labels = [to_py(x) for x in hourly_labels]
+    hourly_data = [to_py(x) for x in hourly_data]
+    status_labels = [to_py(x) for x in status_labels]
+    status_data = [to_py(x) for x in status_data]
+    endpoint_labels = [to_py(x) for x in endpoint_labels]
+    endpoint_data = [to_py(x) for x in endpoint_data]
+    endpoint_avg_labels = [to_py(x) for x in endpoint_avg_labels]
+    endpoint_avg_data = [to_py(x) for x in endpoint_avg_data]
+    endpoint_p90_data = [to_py(x) for x in endpoint_p90_data]
+    endpoint_p99_data = [to_py(x) for x in endpoint_p99_data]
 
-# 로그 파싱 함수
-def parse_log_line(line):
+    logger.info("차트 데이터 생성 완료")
+    return {
+        "hourly": {"labels": hourly_labels, "data": hourly_data},
+        "timeseries": {"interval": series_tier, "labels": series_labels, "data": series_data},
+        "status": {"labels": status_labels, "data": status_data},
+        "endpoint": {"labels": endpoint_labels, "data": endpoint_data},
+        "endpoint_avg": {
+            "labels": endpoint_avg_labels,
+            "data": endpoint_avg_data,
+            "p90": endpoint_p90_data,
+            "p99": endpoint_p99_data
+        }
+    }
+
+# 요청 행 (datetime, method, endpoint, status, resp_ms) 튜플을 API 응답 형식으로 변환
+def format_request_rows(rows, include_resp=True):
+    result = []
+    for dt, method, endpoint, status, resp_ms in rows:
+        item = {
+            'datetime': dt.strftime('%H:%M:%S'),
+            'method': method,
+            'endpoint': endpoint,
+            'status': int(status)
+        }
+        if include_resp:
+            item['resp_ms'] = int(resp_ms)
+        result.append(item)
+    return result
+
+# 느린 요청 목록
+def build_slow_requests(query=None, window_seconds=None):
+    hosts, conditions = split_hosts(query)
+    if conditions:
+        # 조회 조건이 있으면 조건에 맞는 행에서 직접 찾음
+        df = log_store.query(hosts, **conditions)
+        if df.empty:
+            logger.warning("느린 요청 데이터가 없습니다")
+            return []
+        slow_requests = df.nlargest(SLOW_REQUESTS_SIZE, 'resp_ms')[SLOW_REQUEST_COLUMNS]
+        rows = slow_requests.itertuples(index=False, name=None)
+    else:
+        # 느린 요청 (상위 5개, 수집 시점에 유지되는 힙에서 바로 응답)
+        tracker = combined_tracker(hosts)
+        if window_seconds is not None and window_seconds > tracker.window_seconds:
+            raise QueryError(f"window는 최대 {tracker.window_seconds}초까지 조회할 수 있습니다")
+        rows = tracker.slowest(window_seconds)
+    
+    slow_requests_list = format_request_rows(rows)
+    if not slow_requests_list:
+        logger.warning("느린 요청 데이터가 없습니다")
+    logger.info(f"느린 요청 데이터 생성 완료: {len(slow_requests_list)}개")
+    return slow_requests_list
+
+# 최근 요청 목록
+def build_recent_requests(query=None):
+    hosts, conditions = split_hosts(query)
+    if conditions:
+        df = log_store.query(hosts, **conditions)
+        if df.empty:
+            logger.warning("최근 요청 데이터가 없습니다")
+            return []
+        recent_requests = df.nlargest(RECENT_REQUESTS_SIZE, 'datetime')[SLOW_REQUEST_COLUMNS]
+        rows = recent_requests.itertuples(index=False, name=None)
+    else:
+        # 최근 요청 (최근 10개, 수집 시점에 유지되는 힙에서 바로 응답)
+        rows = combined_tracker(hosts).recent()
+    
+    recent_requests_list = format_request_rows(rows, include_resp=False)
+    if not recent_requests_list:
+        logger.warning("최근 요청 데이터가 없습니다")
+    logger.info(f"최근 요청 데이터 생성 완료: {len(recent_requests_list)}개")
+    return recent_requests_list
+
+# 이상 징후 목록 (method/status 조건은 적용되지 않음)
+def build_anomalies(query=None, limit=ANOMALY_LIMIT):
+    hosts, query = split_hosts(query)
+    events = combined_anomalies(hosts).events(query.get('start'), query.get('end'), query.get('endpoint'), limit)
+    anomalies = [{
+        'host': event.get('host'),
+        'window_start': event['window_start'].strftime('%m-%d %H:%M'),
+        'window_seconds': event['window_seconds'],
+        'endpoint': event['endpoint'],
+        'metric': event['metric'],
+        'metric_label': METRIC_LABELS[event['metric']],
+        'value': round(event['value'], 1 if event['metric'] == 'latency' else 4),
+        'baseline': round(event['baseline'], 1 if event['metric'] == 'latency' else 4),
+        'score': round(event['score'], 2),
+        'count': event['count'],
+        'ongoing': event['ongoing']
+    } for event in events]
+    logger.info(f"이상 징후 데이터 생성 완료: {len(anomalies)}개")
+    return anomalies
+
+# 이력 DB 조회 (엔드포인트별 요약 + interval초 구간별 추이, 롤업 버킷 단위로 맞춰짐)
+def build_history(query=None, interval=3600):
+    if history is None:
+        raise QueryError("이력 DB가 설정되지 않았습니다 (HISTORY_DB 환경 변수)")
+    hosts, query = split_hosts(query)
+    if 'status' in query:
+        raise QueryError("이력 조회는 status 조건을 지원하지 않습니다 (4xx/5xx 건수는 결과에 포함)")
+    # 알 수 없는 호스트면 QueryError (파일 하나만 수집할 때는 이력 DB에 호스트 이름을 붙이지 않음)
+    log_store.select(hosts)
+    conditions = {
+        'start': query.get('start'),
+        'end': query.get('end'),
+        'endpoint': query.get('endpoint'),
+        'method': query.get('method'),
+        'host': hosts if LOG_SOURCES else None
+    }
+    endpoints = [{
+        'endpoint': item['endpoint'],
+        'requests': item['requests'],
+        'errors_4xx': item['errors_4xx'],
+        'errors_5xx': item['errors_5xx'],
+        'avg_resp': round(item['avg_resp'], 2),
+        'p50_resp': round(item['p50_resp'], 2),
+        'p90_resp': round(item['p90_resp'], 2),
+        'p99_resp': round(item['p99_resp'], 2),
+        'max_resp': item['max_resp']
+    } for item in history.summary(**conditions)]
+    series = [{
+        'time': item['bucket'].strftime('%Y-%m-%d %H:%M'),
+        'requests': item['requests'],
+        'errors_4xx': item['errors_4xx'],
+        'errors_5xx': item['errors_5xx'],
+        'avg_resp': round(item['avg_resp'], 2)
+    } for item in history.series(width=interval, **conditions)]
+    logger.info(f"이력 데이터 생성 완료: 엔드포인트 {len(endpoints)}개, 구간 {len(series)}개")
+    return {'endpoints': endpoints, 'series': series}
+
+# 분석 리포트 읽기
+def read_report():
+    if not os.path.exists(REPORT_PATH):
+        logger.warning("분석 리포트 파일이 존재하지 않습니다")
+        return '분석 리포트가 아직 생성되지 않았습니다.'
+    with open(REPORT_PATH, 'r', encoding='utf-8') as f:
+        content = f.read()
+    logger.info("리포트 파일 읽기 완료")
+    return content
+
+# 대시보드 전체 스냅샷 (실시간 피드에서 섹션별로 비교해 바뀐 것만 전송)
+def build_snapshot():
+    with metrics.timer('api.snapshot.aggregate'):
+        return {
+            'stats': build_stats(),
+            'chart': build_chart_data(),
+            'slow': build_slow_requests(),
+            'recent': build_recent_requests(),
+            'anomalies': build_anomalies(),
+            'report': read_report()
+        }
+
+# 로그 데이터 버전 (파티션별 수집한 파일의 inode/offset + 저장소 버전. 재시작해도 같은 데이터면 같은 값)
+# hosts를 주면 그 파티션들만 보므로 다른 호스트에 로그가 추가돼도 응답 캐시가 그대로 유지됨
+# 갱신은 백그라운드 수집 스레드가 하므로 여기서는 마지막으로 게시된 버전만 읽음
+def data_version(hosts=None):
+    return log_store.versions(hosts)
+
+# 스냅샷을 다시 만들어야 하는지 판단하는 버전 (데이터 버전 + 리포트 수정 시각)
+def snapshot_version():
     try:
-        pattern = r"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z) (\w+) (\S+) (\d{3}) (\d+)ms"
-        match = re.match(pattern, line)
-        if match:
-            dt, method, endpoint, status, resp = match.groups()
-            return {
-                'datetime': pd.to_datetime(dt),
-                'method': method,
-                'endpoint': endpoint,
-                'status': int(status),
-                'resp_ms': int(resp)
-            }
-        return None
-    except Exception as e:
-        logger.error(f"로그 라인 파싱 오류: {line.strip()}, 오류: {str(e)}")
-        return None
+        report_mtime = os.stat(REPORT_PATH).st_mtime_ns
+    except OSError:
+        report_mtime = None
+    return data_version() + (report_mtime,)
+
+# 조회 API 응답 캐시 (키: 경로 + 정규화한 조회 조건 + 데이터 버전)
+ROUTE_CACHE_TTLS = {
+    'stats': 5,
+    'chart-data': 5,
+    'slow-requests': 5,
+    'recent-requests': 5,
+    'anomalies': 5,
+    'history': 30
+}
+response_cache = ResponseCache(max_entries=256)
+
+# 캐시에 없는 집계를 실행하는 크기 제한 풀 (무거운 요청이 몰려도 요청 스레드가 모두 묶이지 않도록)
+# 실행 중 + 대기 중 작업 수는 서버의 요청 스레드 수(serve.py 기본 8개)의 절반 정도로 둠.
+# 집계는 GIL을 오래 잡으므로 프로세스당 동시 실행을 늘려도 빨라지지 않고 가벼운 요청만 느려짐
+aggregation_pool = AggregationPool(
+    workers=int(os.environ.get('AGGREGATION_WORKERS', 2)),
+    max_queue=int(os.environ.get('AGGREGATION_QUEUE', 2)),
+    timeout=float(os.environ.get('AGGREGATION_TIMEOUT', 10))
+)
+
+# 집계 풀이 가득 찼거나 시간이 초과됐을 때 다시 시도하라고 알려 주는 시간 (초)
+RETRY_AFTER_SECONDS = 2
+
+def cached_response(route, query, compute, *extra):
+    """같은 조건/같은 데이터 버전의 응답은 한 번만 계산해 재사용합니다.
+
+    캐시에 없으면 집계 풀에서 계산하며, 풀이 가득 차 있으면 PoolBusy, 제한 시간을
+    넘기면 PoolTimeout을 냅니다. 시간이 초과돼도 늦게 끝난 결과는 캐시에 넣어 둡니다.
+    """
+    key, ttl, timed_compute = _cache_entry(route, query, compute, extra)
+
+    def offloaded_compute():
+        return aggregation_pool.run(timed_compute, on_late_result=lambda value: response_cache.put(key, value, ttl))
+    return response_cache.get_or_compute(key, offloaded_compute, ttl)
+
+async def cached_response_async(route, query, compute, *extra):
+    """cached_response의 asyncio 버전입니다 (asgi.py의 비동기 조회 API용).
+
+    캐시 조회와 집계 결과 대기 모두 이벤트 루프를 막지 않으므로, 요청마다 스레드를
+    잡아 두지 않습니다. 집계 자체는 같은 aggregation_pool에서 실행됩니다.
+    """
+    key, ttl, timed_compute = _cache_entry(route, query, compute, extra)
+
+    async def offloaded_compute():
+        return await aggregation_pool.run_async(timed_compute, on_late_result=lambda value: response_cache.put(key, value, ttl))
+    return await response_cache.get_or_compute_async(key, offloaded_compute, ttl)
+
+def _cache_entry(route, query, compute, extra):
+    """응답 캐시의 (키, TTL, 소요 시간을 기록하는 계산 함수)를 만듭니다."""
+    key = (route, normalize_query(query), extra, data_version(split_hosts(query)[0]))
 
-# 로그 파일 읽기 및 파싱
-def load_log_to_df(log_file):
+    def timed_compute():
+        with metrics.timer(f'api.{route}.aggregate'):
+            return compute()
+    return key, ROUTE_CACHE_TTLS[route], timed_compute
+
+def overload_error(route, error):
+    """집계 풀이 가득 찼으면 503, 제한 시간을 넘겼으면 504와 오류 메시지를 반환합니다."""
+    if isinstance(error, PoolBusy):
+        metrics.inc('aggregation_rejected_total', help_text='집계 풀이 가득 차 거절한 요청 수', route=route)
+        logger.warning(f"집계 요청 거절 ({route}): {str(error)}")
+        return 503, {'error': '요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도하세요'}
+    metrics.inc('aggregation_timeouts_total', help_text='집계 제한 시간을 넘긴 요청 수', route=route)
+    logger.warning(f"집계 시간 초과 ({route}): {str(error)}")
+    return 504, {'error': '집계 시간이 초과되었습니다. 잠시 후 다시 시도하세요'}
+
+def overloaded_response(route, error):
+    """집계 풀이 가득 찼으면 503, 제한 시간을 넘겼으면 504로 응답합니다."""
+    status, payload = overload_error(route, error)
+    response = jsonify(payload)
+    response.status_code = status
+    response.headers['Retry-After'] = str(RETRY_AFTER_SECONDS)
+    return response
+
+# 응답을 캐시하는 조회 API의 요청 파라미터 해석 (조회 조건, 계산 함수, 캐시 키에 더할 값들)
+def _stats_request(args):
+    query = parse_query_args(args)
+    return query, lambda: build_stats(query)
+
+def _chart_data_request(args):
+    query = parse_query_args(args)
+    return query, lambda: build_chart_data(query)
+
+def _slow_requests_request(args):
+    window = args.get('window')
+    window_seconds = parse_duration(window) if window else None
+    query = parse_query_args(args)
+    return query, lambda: build_slow_requests(query, window_seconds), window_seconds
+
+def _recent_requests_request(args):
+    query = parse_query_args(args)
+    return query, lambda: build_recent_requests(query)
+
+def _anomalies_request(args):
+    query = parse_query_args(args)
+    limit = args.get('limit', str(ANOMALY_LIMIT))
+    if not limit.isdigit():
+        raise QueryError(f"limit은 0 이상의 정수여야 합니다: {limit}")
+    limit = int(limit)
+    return query, lambda: build_anomalies(query, limit), limit
+
+def _history_request(args):
+    interval = args.get('interval')
+    interval = parse_duration(interval) if interval else 3600
+    query = parse_query_args(args)
+    return query, lambda: build_history(query, interval), interval
+
+# 경로 -> (요청 해석 함수, 로그에 쓰는 이름, 실패 시 오류 메시지)
+# Flask 핸들러(cached_route)와 asgi.py의 비동기 핸들러가 함께 씀
+CACHED_ROUTES = {
+    'stats': (_stats_request, '통계', '통계를 계산할 수 없습니다'),
+    'chart-data': (_chart_data_request, '차트 데이터', '차트 데이터를 생성할 수 없습니다'),
+    'slow-requests': (_slow_requests_request, '느린 요청', '느린 요청 데이터를 가져올 수 없습니다'),
+    'recent-requests': (_recent_requests_request, '최근 요청', '최근 요청 데이터를 가져올 수 없습니다'),
+    'anomalies': (_anomalies_request, '이상 징후', '이상 징후 데이터를 가져올 수 없습니다'),
+    'history': (_history_request, '이력', '이력 데이터를 가져올 수 없습니다')
+}
+
+def cached_route(route, args):
+    """응답을 캐시하는 조회 API 하나를 처리합니다."""
+    parse_request, label, error_message = CACHED_ROUTES[route]
     try:
-        if not os.path.exists(log_file):
-            logger.warning(f"로그 파일이 존재하지 않습니다: {log_file}")
-            return pd.DataFrame()
-        
-        with open(log_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        records = [parse_log_line(line) for line in lines]
-        records = [r for r in records if r]
-        df = pd.DataFrame(records)
-        
-        logger.info(f"로그 파일 로드 완료: {len(df)} 개의 레코드")
-        return df
+        logger.info(f"{label} API 요청")
+        return json_response(route, cached_response(route, *parse_request(args)))
+    except (PoolBusy, PoolTimeout) as e:
+        return overloaded_response(route, e)
+    except QueryError as e:
+        logger.warning(f"{label} API 조회 조건 오류: {str(e)}")
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        logger.error(f"로그 파일 로드 오류: {str(e)}\n{traceback.format_exc()}")
-        return pd.DataFrame()
+        logger.error(f"{label} API 오류: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({'error': error_message}), 500
+
+def json_response(route, data):
+    """응답 데이터를 JSON으로 직렬화합니다 (직렬화 시간은 api.<경로>.serialize로 기록)."""
+    with metrics.timer(f'api.{route}.serialize'):
+        return jsonify(data)
+
+# 접속한 모든 대시보드가 공유하는 실시간 피드
+# 스냅샷은 가장 무거운 집계이므로 다른 조회 API와 같이 집계 풀에서 만듦 (가득 차면 503, 시간 초과면 504)
+live_feed = LiveFeed(lambda: aggregation_pool.run(build_snapshot), snapshot_version)
+
+# 버전별로 한 번만 직렬화/압축해 두는 /api/dashboard 응답 본문
+_dashboard_body = {'version': None}
+_dashboard_body_lock = threading.Lock()
+
+def dashboard_body():
+    """현재 스냅샷의 (ETag, JSON 바이트, gzip 바이트)를 반환합니다."""
+    version, snapshot = live_feed.current()
+    with _dashboard_body_lock:
+        if _dashboard_body['version'] != version:
+            with metrics.timer('api.dashboard.serialize'):
+                body = json.dumps(snapshot, ensure_ascii=False).encode('utf-8')
+                _dashboard_body.update({
+                    'version': version,
+                    'etag': hashlib.sha1(repr(version).encode('utf-8')).hexdigest()[:20],
+                    'body': body,
+                    'gzip': gzip.compress(body, compresslevel=6)
+                })
+        return _dashboard_body['etag'], _dashboard_body['body'], _dashboard_body['gzip']
+
+# 성능 지표 (/metrics에서 Prometheus 텍스트 형식으로 노출)
+def _cache_stat(name):
+    return lambda: response_cache.stats()[name]
+
+def _cache_hit_ratio():
+    stats = response_cache.stats()
+    lookups = stats['hits'] + stats['misses'] + stats['waits']
+    # 계산을 기다렸다 받은 요청(waits)도 다시 계산하지 않았으므로 적중으로 셈
+    return (stats['hits'] + stats['waits']) / lookups if lookups else None
+
+metrics.register_gauge('response_cache_entries', '응답 캐시 항목 수', _cache_stat('entries'))
+metrics.register_gauge('response_cache_hits_total', '응답 캐시 적중 횟수', _cache_stat('hits'), kind='counter')
+metrics.register_gauge('response_cache_misses_total', '응답 캐시 미적중(새로 계산) 횟수', _cache_stat('misses'), kind='counter')
+metrics.register_gauge('response_cache_waits_total', '다른 요청의 계산 결과를 기다려 받은 횟수', _cache_stat('waits'), kind='counter')
+metrics.register_gauge('response_cache_hit_ratio', '응답 캐시 적중률 (기다려 받은 경우 포함)', _cache_hit_ratio)
+metrics.register_gauge('aggregation_pool_running', '집계 풀에서 실행 중인 작업 수', lambda: aggregation_pool.stats()['running'])
+metrics.register_gauge('aggregation_pool_queued', '집계 풀에서 기다리는 작업 수', lambda: aggregation_pool.stats()['queued'])
+metrics.register_gauge('live_feed_subscribers', '실시간 피드 접속 수', lambda: live_feed.subscriber_count())
+def _partition_stat(collect):
+    return lambda: {(('partition', name),): collect(store) for name, store in log_store.partitions.items()}
+
+metrics.register_gauge('log_store_rows', '파티션별 수집된 행 수', _partition_stat(lambda store: len(store.columns)))
+metrics.register_gauge('log_store_column_bytes', '파티션별 열 버퍼 크기(바이트)', _partition_stat(lambda store: store.columns.nbytes))
+metrics.register_gauge('log_store_version', '파티션별 데이터 버전', _partition_stat(lambda store: store.version))
+
+# 온디맨드 프로파일링 (운영 중 노출되지 않도록 환경 변수로 켤 때만 사용)
+PROFILING_ENABLED = os.environ.get('ENABLE_PROFILING') == '1'
+MAX_PROFILE_SECONDS = 60
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    # 실시간 피드는 연결이 유지되는 동안이 아니라 응답 시작까지만 잼
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        metrics.observe_request(route, request.method, response.status_code, time.perf_counter() - started)
+    return response
 
 @app.route('/')
 def dashboard():
@@ -88,174 +644,127 @@ def dashboard():
 
 @app.route('/api/stats')
 def get_stats():
-    try:
-        logger.info("통계 API 요청")
-        df = load_log_to_df(LOG_FILE)
-        
-        if df.empty:
-            logger.warning("통계 계산을 위한 데이터가 없습니다")
-            return jsonify({
-                'total_requests': 0,
-                'avg_response_time': 0,
-                'success_rate': 0,
-                'error_rate': 0
-            })
-        
-        # 기본 통계
-        total_requests = len(df)
-        avg_response_time = df['resp_ms'].mean()
-        
-        # 성공률과 에러율 계산
-        status_cat = df['status'].apply(lambda x: f'{x//100}xx')
-        status_dist = status_cat.value_counts()
-        
-        success_count = status_dist.get('2xx', 0)
-        error_count = status_dist.get('4xx', 0) + status_dist.get('5xx', 0)
-        
-        success_rate = (success_count / total_requests * 100) if total_requests > 0 else 0
-        error_rate = (error_count / total_requests * 100) if total_requests > 0 else 0
-        
-        logger.info(f"통계 계산 완료: 총 요청 {total_requests}개")
-        return jsonify({
-            'total_requests': total_requests,
-            'avg_response_time': round(avg_response_time, 2),
-            'success_rate': round(success_rate, 2),
-            'error_rate': round(error_rate, 2)
-        })
-    except Exception as e:
-        logger.error(f"통계 API 오류: {str(e)}\n{traceback.format_exc()}")
-        return jsonify({'error': '통계를 계산할 수 없습니다'}), 500
+    return cached_route('stats', request.args)
 
 @app.route('/api/chart-data')
 def get_chart_data():
-    try:
-        logger.info("차트 데이터 API 요청")
-        df = load_log_to_df(LOG_FILE)
-        if df.empty:
-            logger.warning("차트 데이터를 위한 데이터가 없습니다")
-            return jsonify({"error": "No data"})
-
-        # 시간별 요청 건수
-        hourly = df.groupby(df['datetime'].dt.hour).size()
-        hourly_labels = [int(x) for x in hourly.index.tolist()]
-        hourly_data = [int(x) for x in hourly.values.tolist()]
-
-        # 상태 코드 분포
-        status_counts = df['status'].apply(lambda x: f"{x//100}xx").value_counts().sort_index()
-        status_labels = [str(x) for x in status_counts.index.tolist()]
-        status_data = [int(x) for x in status_counts.values.tolist()]
-
-        # 엔드포인트별 호출수
-        endpoint_counts = df['endpoint'].value_counts()
-        endpoint_labels = [str(x) for x in endpoint_counts.index.tolist()]
-        endpoint_data = [int(x) for x in endpoint_counts.values.tolist()]
-
-        # 엔드포인트별 평균 응답시간
-        endpoint_avg_resp = df.groupby('endpoint')['resp_ms'].mean()
-        endpoint_avg_labels = [str(x) for x in endpoint_avg_resp.index.tolist()]
-        endpoint_avg_data = [float(x) for x in endpoint_avg_resp.values.tolist()]
-
-        # 모든 값이 기본 타입인지 재확인 (혹시 모를 numpy 타입 방지)
-        def to_py(val):
-            if hasattr(val, 'item'):
-                return val.item()
-            return val
-        hourly_labels = [to_py(x) for x in hourly_labels]
-        hourly_data = [to_py(x) for x in hourly_data]
-        status_labels = [to_py(x) for x in status_labels]
-        status_data = [to_py(x) for x in status_data]
-        endpoint_labels = [to_py(x) for x in endpoint_labels]
-        endpoint_data = [to_py(x) for x in endpoint_data]
-        endpoint_avg_labels = [to_py(x) for x in endpoint_avg_labels]
-        endpoint_avg_data = [to_py(x) for x in endpoint_avg_data]
-
-        logger.info("차트 데이터 생성 완료")
-        return jsonify({
-            "hourly": {"labels": hourly_labels, "data": hourly_data},
-            "status": {"labels": status_labels, "data": status_data},
-            "endpoint": {"labels": endpoint_labels, "data": endpoint_data},
-            "endpoint_avg": {"labels": endpoint_avg_labels, "data": endpoint_avg_data}
-        })
-    except Exception as e:
-        logger.error(f"차트 데이터 API 오류: {str(e)}\n{traceback.format_exc()}")
-        return jsonify({'error': '차트 데이터를 생성할 수 없습니다'}), 500
+    return cached_route('chart-data', request.args)
 
 @app.route('/api/slow-requests')
 def get_slow_requests():
-    try:
-        logger.info("느린 요청 API 요청")
-        df = load_log_to_df(LOG_FILE)
-        
-        if df.empty:
-            logger.warning("느린 요청 데이터가 없습니다")
-            return jsonify([])
-        
-        # 느린 요청 (상위 5개)
-        slow_requests = df.nlargest(5, 'resp_ms')[['datetime', 'method', 'endpoint', 'status', 'resp_ms']]
-        slow_requests_list = []
-        for _, row in slow_requests.iterrows():
-            slow_requests_list.append({
-                'datetime': row['datetime'].strftime('%H:%M:%S'),
-                'method': row['method'],
-                'endpoint': row['endpoint'],
-                'status': row['status'],
-                'resp_ms': row['resp_ms']
-            })
-        
-        logger.info(f"느린 요청 데이터 생성 완료: {len(slow_requests_list)}개")
-        return jsonify(slow_requests_list)
-    except Exception as e:
-        logger.error(f"느린 요청 API 오류: {str(e)}\n{traceback.format_exc()}")
-        return jsonify({'error': '느린 요청 데이터를 가져올 수 없습니다'}), 500
+    return cached_route('slow-requests', request.args)
 
 @app.route('/api/recent-requests')
 def get_recent_requests():
-    try:
-        logger.info("최근 요청 API 요청")
-        df = load_log_to_df(LOG_FILE)
-        
-        if df.empty:
-            logger.warning("최근 요청 데이터가 없습니다")
-            return jsonify([])
-        
-        # 최근 요청 (최근 10개)
-        recent_requests = df.nlargest(10, 'datetime')[['datetime', 'method', 'endpoint', 'status']]
-        recent_requests_list = []
-        for _, row in recent_requests.iterrows():
-            recent_requests_list.append({
-                'datetime': row['datetime'].strftime('%H:%M:%S'),
-                'method': row['method'],
-                'endpoint': row['endpoint'],
-                'status': row['status']
-            })
-        
-        logger.info(f"최근 요청 데이터 생성 완료: {len(recent_requests_list)}개")
-        return jsonify(recent_requests_list)
-    except Exception as e:
-        logger.error(f"최근 요청 API 오류: {str(e)}\n{traceback.format_exc()}")
-        return jsonify({'error': '최근 요청 데이터를 가져올 수 없습니다'}), 500
+    return cached_route('recent-requests', request.args)
+
+@app.route('/api/anomalies')
+def get_anomalies():
+    return cached_route('anomalies', request.args)
+
+@app.route('/api/history')
+def get_history():
+    return cached_route('history', request.args)
 
 @app.route('/api/report')
 def get_report():
     try:
         logger.info("리포트 API 요청")
-        report_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'analysis_report.txt')
-        if not os.path.exists(report_path):
-            logger.warning("분석 리포트 파일이 존재하지 않습니다")
-            return '분석 리포트가 아직 생성되지 않았습니다.'
-        with open(report_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        logger.info("리포트 파일 읽기 완료")
-        return content
+        return read_report()
     except Exception as e:
         logger.error(f"리포트 API 오류: {str(e)}\n{traceback.format_exc()}")
         return f'리포트 파일을 읽을 수 없습니다. 오류: {str(e)}'
 
+@app.route('/api/dashboard')
+def get_dashboard():
+    """대시보드 전체 스냅샷 (stats/chart/slow/recent/report)
+
+    데이터 버전마다 한 번만 계산하며, ETag가 같으면(If-None-Match) 304를 돌려줍니다.
+    클라이언트가 gzip을 받을 수 있으면 압축된 본문을 보냅니다.
+    """
+    try:
+        logger.info("대시보드 스냅샷 API 요청")
+        etag, body, gzipped = dashboard_body()
+        if etag in request.if_none_match:
+            response = Response(status=304)
+        elif 'gzip' in request.accept_encodings:
+            response = Response(gzipped, mimetype='application/json')
+            response.headers['Content-Encoding'] = 'gzip'
+        else:
+            response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
+    except (PoolBusy, PoolTimeout) as e:
+        return overloaded_response('dashboard', e)
+    except Exception as e:
+        logger.error(f"대시보드 스냅샷 API 오류: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({'error': '대시보드 데이터를 가져올 수 없습니다'}), 500
+
+@app.route('/api/stream')
+def stream():
+    """대시보드 실시간 피드 (Server-Sent Events)
+
+    처음에는 전체 스냅샷(stats/chart/slow/recent/report)을, 이후에는 바뀐 섹션만
+    'update' 이벤트로 보냅니다.
+    """
+    try:
+        logger.info("실시간 피드 연결")
+        subscription = live_feed.subscribe()
+        return Response(
+            stream_with_context(live_feed.stream(subscription)),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+    except Exception as e:
+        logger.error(f"실시간 피드 오류: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({'error': '실시간 피드를 시작할 수 없습니다'}), 500
+
+@app.route('/metrics')
+def get_metrics():
+    """단계별 소요 시간/처리 행 수, API 응답 시간, 캐시 적중률, RSS (Prometheus 텍스트 형식)"""
+    try:
+        return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+    except Exception as e:
+        logger.error(f"성능 지표 API 오류: {str(e)}\n{traceback.format_exc()}")
+        return '성능 지표를 생성할 수 없습니다', 500
+
+@app.route('/debug/profile')
+def get_profile():
+    """온디맨드 프로파일 (ENABLE_PROFILING=1일 때만 사용 가능)
+
+    mode=sample(기본)은 seconds초 동안 모든 스레드의 호출 스택을 샘플링해 접힌 스택
+    형식으로, mode=cprofile은 대시보드 스냅샷 한 번을 cProfile로 실행한 결과를 돌려줍니다.
+    """
+    if not PROFILING_ENABLED:
+        return jsonify({'error': '프로파일링이 꺼져 있습니다 (ENABLE_PROFILING=1로 실행)'}), 404
+    try:
+        mode = request.args.get('mode', 'sample')
+        if mode == 'cprofile':
+            logger.info("cProfile 프로파일 요청")
+            _, text = profile_call(build_snapshot, sort=request.args.get('sort', 'cumulative'))
+        elif mode == 'sample':
+            seconds = float(request.args.get('seconds', 5))
+            if not 0 < seconds <= MAX_PROFILE_SECONDS:
+                return jsonify({'error': f'seconds는 0보다 크고 {MAX_PROFILE_SECONDS} 이하여야 합니다'}), 400
+            logger.info(f"스택 샘플링 프로파일 요청: {seconds}초")
+            text = sample_stacks(seconds)
+        else:
+            return jsonify({'error': f'알 수 없는 mode입니다: {mode}'}), 400
+        return Response(text, mimetype='text/plain; charset=utf-8')
+    except ValueError:
+        return jsonify({'error': 'seconds는 숫자여야 합니다'}), 400
+    except Exception as e:
+        logger.error(f"프로파일 API 오류: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({'error': '프로파일을 생성할 수 없습니다'}), 500
+
 if __name__ == '__main__':
     try:
         logger.info("Flask 서버를 시작합니다...")
         print("Flask 서버를 시작합니다...")
         print("대시보드 접속: http://127.0.0.1:5000/")
+        print("개발용 서버입니다. 운영 환경에서는 serve.py를 사용하세요.")
         app.run(debug=True, host='0.0.0.0', port=5000)
     except Exception as e:
         logger.error(f"Flask 서버 시작 오류: {str(e)}\n{traceback.format_exc()}")
@@ -0,0 +1,142 @@
+"""
+ASGI 서버(uvicorn 등)용 진입점
+
+    pip install asgiref uvicorn
+    uvicorn asgi:application --app-dir ServerLogAnalysis --port 5000
+
+조회 API(/api/stats, /api/chart-data, /api/slow-requests, /api/recent-requests,
+/api/anomalies, /api/history)와 실시간 피드(/api/stream)는 이벤트 루프에서 바로
+처리합니다. 캐시에 없는 집계는 app.py의 aggregation_pool에서 실행하고 결과를
+await로 기다리므로, 집계를 기다리는 요청이나 열려 있는 피드 연결이 스레드를
+잡아 두지 않습니다. 풀이 가득 차면 503, 제한 시간을 넘기면 504로 응답합니다.
+나머지 경로(대시보드 페이지, /api/dashboard, /metrics 등)는 asgiref의 스레드에서
+Flask 앱으로 전달됩니다.
+여러 작업자 프로세스가 필요하면 serve.py(gunicorn/waitress + 공유 수집)를 사용하세요.
+"""
+
+import time
+import asyncio
+import traceback
+from contextlib import aclosing
+from urllib.parse import parse_qsl
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError as e:
+    raise ImportError('ASGI 서버로 실행하려면 asgiref가 필요합니다: pip install asgiref uvicorn') from e
+
+from werkzeug.datastructures import MultiDict
+
+from aggregation_pool import PoolBusy, PoolTimeout
+from app import (CACHED_ROUTES, RETRY_AFTER_SECONDS, app, cached_response_async, live_feed, logger,
+                 overload_error)
+from log_query import QueryError
+from perf_metrics import metrics
+
+flask_application = WsgiToAsgi(app)
+
+API_PREFIX = '/api/'
+
+JSON_HEADERS = [(b'content-type', b'application/json')]
+
+STREAM_HEADERS = [
+    (b'content-type', b'text/event-stream; charset=utf-8'),
+    (b'cache-control', b'no-cache'),
+    (b'x-accel-buffering', b'no')
+]
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] == 'http' and scope['method'] == 'GET':
+        path = scope['path']
+        if path == '/api/stream':
+            await stream(receive, send)
+            return
+        route = path[len(API_PREFIX):] if path.startswith(API_PREFIX) else None
+        if route in CACHED_ROUTES:
+            await cached_read(route, scope, send)
+            return
+    await flask_application(scope, receive, send)
+
+
+async def lifespan(receive, send):
+    # 앱은 import할 때 준비되므로 시작/종료 때 따로 할 일은 없음
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def cached_read(route, scope, send):
+    """응답을 캐시하는 조회 API를 이벤트 루프에서 처리합니다 (app.cached_route와 같은 응답)."""
+    started = time.perf_counter()
+    parse_request, label, error_message = CACHED_ROUTES[route]
+    headers = []
+    try:
+        logger.info(f"{label} API 요청 (async)")
+        args = MultiDict(parse_qsl(scope['query_string'].decode('latin-1'), keep_blank_values=True))
+        data = await cached_response_async(route, *parse_request(args))
+        status = 200
+    except (PoolBusy, PoolTimeout) as e:
+        status, data = overload_error(route, e)
+        headers.append((b'retry-after', str(RETRY_AFTER_SECONDS).encode()))
+    except QueryError as e:
+        logger.warning(f"{label} API 조회 조건 오류: {str(e)}")
+        status, data = 400, {'error': str(e)}
+    except Exception as e:
+        logger.error(f"{label} API 오류: {str(e)}\n{traceback.format_exc()}")
+        status, data = 500, {'error': error_message}
+
+    with metrics.timer(f'api.{route}.serialize'):
+        body = json_body(data)
+    await send({'type': 'http.response.start', 'status': status, 'headers': JSON_HEADERS + headers})
+    await send({'type': 'http.response.body', 'body': body})
+    metrics.observe_request(API_PREFIX + route, 'GET', status, time.perf_counter() - started)
+
+
+async def stream(receive, send):
+    """대시보드 실시간 피드 (Server-Sent Events, 연결마다 스레드를 쓰지 않음)"""
+    started = time.perf_counter()
+    try:
+        logger.info("실시간 피드 연결 (async)")
+        # 구독할 때 스냅샷이 오래됐으면 집계 풀에서 새로 만들므로 그동안만 스레드에서 기다림
+        subscription = await asyncio.get_running_loop().run_in_executor(None, live_feed.subscribe)
+    except Exception as e:
+        logger.error(f"실시간 피드 오류: {str(e)}\n{traceback.format_exc()}")
+        body = json_body({'error': '실시간 피드를 시작할 수 없습니다'})
+        await send({'type': 'http.response.start', 'status': 500, 'headers': JSON_HEADERS})
+        await send({'type': 'http.response.body', 'body': body})
+        return
+
+    await send({'type': 'http.response.start', 'status': 200, 'headers': STREAM_HEADERS})
+    # 실시간 피드는 연결이 유지되는 동안이 아니라 응답 시작까지만 잼
+    metrics.observe_request('/api/stream', 'GET', 200, time.perf_counter() - started)
+
+    # 클라이언트가 연결을 끊으면 구독을 닫아 바로 끝냄
+    disconnected = asyncio.ensure_future(wait_disconnect(receive))
+    disconnected.add_done_callback(lambda _: subscription.close())
+    try:
+        async with aclosing(live_feed.stream_async(subscription)) as chunks:
+            async for chunk in chunks:
+                await send({'type': 'http.response.body', 'body': chunk.encode('utf-8'), 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        disconnected.cancel()
+
+
+def json_body(data):
+    # Flask의 jsonify와 같은 형식(구분자, 끝의 줄바꿈)으로 직렬화
+    return app.json.response(data).get_data()
+
+
+async def wait_disconnect(receive):
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+서버 로그 분석 벤치마크
+- 시드 고정 대량 로그 생성 (generate_fresh_logs.generate_bulk_lines)
+- 파싱 처리량, 분석 소요 시간, API p50/p99 응답시간, 최대 메모리(RSS) 측정
+- 결과를 JSON으로 저장하고 이전 결과와 비교
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import traceback
+import subprocess
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# 로깅 설정
+def setup_logging():
+    """로깅 설정을 초기화합니다."""
+    log_dir = 'logs'
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    # 벤치마크 로거 설정
+    logger = logging.getLogger('benchmark')
+    logger.setLevel(logging.INFO)
+
+    # 파일 핸들러 설정
+    file_handler = logging.FileHandler(f'{log_dir}/benchmark.log', encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+
+    # 포맷터 설정
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    file_handler.setFormatter(formatter)
+
+    # 핸들러 추가
+    logger.addHandler(file_handler)
+
+    return logger
+
+# 로거 초기화
+logger = setup_logging()
+
+# 기본 데이터셋 크기 (줄 수)
+DEFAULT_SIZES = [10000, 100000, 1000000]
+
+# 기본 생성 옵션 (하루치, 에러 폭주 구간 3개)
+DEFAULT_SEED = 42
+DEFAULT_SPAN = 86400
+DEFAULT_BURSTS = 3
+
+# 경로별 API 측정 횟수
+DEFAULT_API_REQUESTS = 30
+
+# 측정하는 API (조회 조건이 있는 요청 포함)
+API_ROUTES = [
+    '/api/stats',
+    '/api/chart-data',
+    '/api/slow-requests',
+    '/api/recent-requests',
+    '/api/anomalies',
+    '/api/dashboard',
+    '/api/stats?from=-15m',
+    '/api/chart-data?status=5xx',
+    '/api/slow-requests?from=-1h&endpoint=/api/order/create',
+]
+
+# 단계별로 별도 프로세스에서 실행해 최대 RSS를 단계마다 따로 잼
+PHASES = ['parse', 'analysis', 'api']
+
+# 이전 결과 대비 이 비율 이상 나빠지면 회귀로 표시
+DEFAULT_REGRESSION_THRESHOLD = 0.10
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def peak_rss_mb():
+    """현재 프로세스의 최대 RSS(MB)를 반환합니다. 측정할 수 없는 환경이면 None."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def latency_summary(samples):
+    """응답시간 목록(초)을 밀리초 단위 p50/p99/평균/최대로 요약합니다."""
+    ms = np.asarray(samples) * 1000
+    return {
+        'p50_ms': round(float(np.percentile(ms, 50)), 3),
+        'p99_ms': round(float(np.percentile(ms, 99)), 3),
+        'mean_ms': round(float(ms.mean()), 3),
+        'max_ms': round(float(ms.max()), 3),
+    }
+
+
+def throughput(rows, size, seconds):
+    return {
+        'seconds': round(seconds, 4),
+        'lines_per_sec': round(rows / seconds) if seconds else None,
+        'mb_per_sec': round(size / (1024 * 1024) / seconds, 1) if seconds else None,
+    }
+
+
+def bench_parse(log_file):
+    """텍스트 블록 파싱(웹 서버 수집 경로)과 메모리 매핑 파싱의 처리량을 잽니다."""
+    from log_mmap import read_log_range
+    from log_parser import parse_log_block
+    from log_store import LogStore
+
+    size = os.path.getsize(log_file)
+    started = time.perf_counter()
+    store = LogStore(log_file, parse_log_block)
+    store.refresh()
+    text_seconds = time.perf_counter() - started
+    rows = len(store.columns)
+
+    started = time.perf_counter()
+    df = read_log_range(log_file)
+    mmap_seconds = time.perf_counter() - started
+
+    return {
+        'rows': rows,
+        'text': throughput(rows, size, text_seconds),
+        'mmap': throughput(len(df), size, mmap_seconds),
+        'column_bytes_per_row': round(store.columns.nbytes / rows, 1) if rows else None,
+    }
+
+
+def bench_analysis(log_file):
+    """log_analysis의 로드/집계 단계(출력·리포트 저장 제외) 소요 시간을 잽니다."""
+    from log_analysis import compute_results, compute_results_streaming, load_log_to_df
+
+    started = time.perf_counter()
+    df = load_log_to_df(log_file, use_cache=False)
+    load_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    results = compute_results(df)
+    compute_seconds = time.perf_counter() - started
+    del df
+
+    started = time.perf_counter()
+    streaming = compute_results_streaming(log_file)
+    streaming_seconds = time.perf_counter() - started
+
+    return {
+        'rows': results['total'],
+        'load_seconds': round(load_seconds, 4),
+        'compute_seconds': round(compute_seconds, 4),
+        'total_seconds': round(load_seconds + compute_seconds, 4),
+        'streaming_seconds': round(streaming_seconds, 4),
+        'anomalies': len(streaming['anomalies']),
+    }
+
+
+def bench_api(log_file, requests=DEFAULT_API_REQUESTS):
+    """Flask 테스트 클라이언트로 API 경로별 응답시간을 잽니다.
+
+    경로마다 응답 캐시를 비운 상태(계산 비용)와 캐시에 적중한 상태를 따로 잽니다.
+    첫 요청은 로그 수집(파싱/롤업)까지 포함하므로 first_request_seconds로 따로 기록합니다.
+    """
+    # app은 가져올 때 로그 파일 경로가 정해지므로 환경 변수를 먼저 설정
+    os.environ['SERVER_LOG_FILE'] = log_file
+    import app as dashboard_app
+
+    client = dashboard_app.app.test_client()
+    started = time.perf_counter()
+    response = client.get('/api/stats')
+    first_request_seconds = time.perf_counter() - started
+    if response.status_code != 200:
+        raise RuntimeError(f"/api/stats 응답 오류: {response.status_code}")
+
+    routes = {}
+    for route in API_ROUTES:
+        cold = []
+        for _ in range(requests):
+            dashboard_app.response_cache.clear()
+            started = time.perf_counter()
+            response = client.get(route)
+            cold.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                raise RuntimeError(f"{route} 응답 오류: {response.status_code}")
+        cached = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            client.get(route)
+            cached.append(time.perf_counter() - started)
+        routes[route] = {'uncached': latency_summary(cold), 'cached': latency_summary(cached)}
+
+    return {'first_request_seconds': round(first_request_seconds, 4), 'requests': requests, 'routes': routes}
+
+
+def run_phase(phase, log_file, api_requests):
+    """단계 하나를 현재 프로세스에서 실행하고 최대 RSS를 붙여 반환합니다."""
+    if phase == 'parse':
+        result = bench_parse(log_file)
+    elif phase == 'analysis':
+        result = bench_analysis(log_file)
+    else:
+        result = bench_api(log_file, api_requests)
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+
+def run_phase_subprocess(phase, log_file, api_requests):
+    """단계 하나를 새 프로세스에서 실행합니다 (단계끼리 메모리/캐시가 섞이지 않도록)."""
+    command = [sys.executable, os.path.abspath(__file__), '--phase', phase,
+               '--log-file', log_file, '--api-requests', str(api_requests)]
+    completed = subprocess.run(command, capture_output=True, text=True, encoding='utf-8')
+    if completed.returncode != 0:
+        raise RuntimeError(f"{phase} 단계 실패:\n{completed.stderr}")
+    # 마지막 줄이 결과 JSON (그 앞의 출력은 무시)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def git_revision():
+    try:
+        completed = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPT_DIR,
+                                   capture_output=True, text=True)
+        return completed.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_benchmark(sizes, data_dir=None, seed=DEFAULT_SEED, span_seconds=DEFAULT_SPAN, skew=0.0,
+                  bursts=DEFAULT_BURSTS, phases=PHASES, api_requests=DEFAULT_API_REQUESTS):
+    """크기별로 로그를 생성하고 각 단계를 측정해 결과 dict를 반환합니다."""
+    from generate_fresh_logs import write_bulk_log
+
+    keep = data_dir is not None
+    data_dir = data_dir or tempfile.mkdtemp(prefix='log_bench_')
+    os.makedirs(data_dir, exist_ok=True)
+    results = []
+    try:
+        for size in sizes:
+            log_file = os.path.abspath(os.path.join(data_dir, f'bench_{size}_{seed}.log'))
+            print(f'[{size:,}줄] 로그 생성 중...')
+            generate_seconds = write_bulk_log(log_file, size, seed=seed, span_seconds=span_seconds,
+                                              skew=skew, bursts=bursts)
+            entry = {
+                'lines': size,
+                'file_mb': round(os.path.getsize(log_file) / (1024 * 1024), 1),
+                'generate': {'seconds': round(generate_seconds, 4),
+                             'lines_per_sec': round(size / generate_seconds) if generate_seconds else None},
+            }
+            for phase in phases:
+                print(f'[{size:,}줄] {phase} 측정 중...')
+                # 이전 단계가 만든 디스크 캐시가 측정에 섞이지 않도록 삭제
+                shutil.rmtree(os.path.join(data_dir, '.log_cache'), ignore_errors=True)
+                entry[phase] = run_phase_subprocess(phase, log_file, api_requests)
+                logger.info(f"{size}줄 {phase} 측정 완료: {entry[phase]}")
+            results.append(entry)
+            if not keep:
+                os.remove(log_file)
+    finally:
+        if not keep:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    return {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'seed': seed,
+            'span_seconds': span_seconds,
+            'skew': skew,
+            'bursts': bursts,
+            'api_requests': api_requests,
+        },
+        'results': results,
+    }
+
+
+def flatten_metrics(entry, prefix=''):
+    """중첩된 결과 dict를 'parse.text.seconds' 형태의 숫자 지표 dict로 펼칩니다."""
+    metrics = {}
+    for key, value in entry.items():
+        name = f'{prefix}{key}'
+        if isinstance(value, dict):
+            metrics.update(flatten_metrics(value, f'{name}.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            metrics[name] = value
+    return metrics
+
+
+def higher_is_better(metric):
+    return metric.endswith('_per_sec')
+
+
+def compare_results(baseline, current, threshold=DEFAULT_REGRESSION_THRESHOLD):
+    """두 결과에서 같은 크기의 지표를 비교해 (크기, 지표, 이전, 현재, 변화율, 회귀 여부) 목록을 반환합니다."""
+    baseline_by_lines = {entry['lines']: flatten_metrics(entry) for entry in baseline['results']}
+    rows = []
+    for entry in current['results']:
+        before = baseline_by_lines.get(entry['lines'])
+        if before is None:
+            continue
+        for metric, value in flatten_metrics(entry).items():
+            old = before.get(metric)
+            if metric in ('lines', 'file_mb') or metric.endswith('.rows') or not old or value is None:
+                continue
+            change = (value - old) / old
+            worse = -change if higher_is_better(metric) else change
+            rows.append((entry['lines'], metric, old, value, change, worse > threshold))
+    return rows
+
+
+def print_summary(report):
+    for entry in report['results']:
+        print(f"\n[{entry['lines']:,}줄, {entry['file_mb']}MB]")
+        print(f"  생성: {entry['generate']['lines_per_sec']:,}줄/초")
+        if 'parse' in entry:
+            parse = entry['parse']
+            print(f"  파싱: 텍스트 {parse['text']['lines_per_sec']:,}줄/초, 메모리 매핑 {parse['mmap']['lines_per_sec']:,}줄/초, "
+                  f"최대 RSS {parse['peak_rss_mb']}MB")
+        if 'analysis' in entry:
+            analysis = entry['analysis']
+            print(f"  분석: 로드+집계 {analysis['total_seconds']}초, 스트리밍 {analysis['streaming_seconds']}초, "
+                  f"최대 RSS {analysis['peak_rss_mb']}MB")
+        if 'api' in entry:
+            api = entry['api']
+            print(f"  API: 첫 요청 {api['first_request_seconds']}초, 최대 RSS {api['peak_rss_mb']}MB")
+            for route, stats in api['routes'].items():
+                uncached = stats['uncached']
+                print(f"    {route}: p50 {uncached['p50_ms']}ms / p99 {uncached['p99_ms']}ms "
+                      f"(캐시 적중 p50 {stats['cached']['p50_ms']}ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='서버 로그 분석 벤치마크')
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help='측정할 데이터셋 크기(줄 수) 목록, 쉼표로 구분 (예: 100000,1000000,10000000)')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='로그 생성 시드')
+    parser.add_argument('--span', type=int, default=DEFAULT_SPAN, help='로그가 퍼지는 기간(초)')
+    parser.add_argument('--skew', type=float, default=0.0, help='엔드포인트 쏠림 정도 (0이면 균등)')
+    parser.add_argument('--bursts', type=int, default=DEFAULT_BURSTS, help='에러 폭주 구간 수')
+    parser.add_argument('--phases', default=','.join(PHASES), help=f'측정할 단계 ({",".join(PHASES)})')
+    parser.add_argument('--api-requests', type=int, default=DEFAULT_API_REQUESTS, help='API 경로별 측정 횟수')
+    parser.add_argument('--data-dir', default=None, help='생성한 로그를 남겨 둘 디렉토리 (기본: 임시 디렉토리, 측정 후 삭제)')
+    parser.add_argument('--output', default='benchmark_results.json', help='결과 JSON 파일 경로')
+    parser.add_argument('--compare', default=None, help='비교할 이전 결과 JSON 파일')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help='회귀로 표시할 악화 비율 (기본 0.10 = 10%%)')
+    # 내부용: 단계 하나를 이 프로세스에서 실행하고 결과 JSON을 출력
+    parser.add_argument('--phase', choices=PHASES, help=argparse.SUPPRESS)
+    parser.add_argument('--log-file', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.phase:
+        print(json.dumps(run_phase(args.phase, args.log_file, args.api_requests)))
+        return
+
+    try:
+        sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+        phases = [phase for phase in args.phases.split(',') if phase.strip()]
+        unknown = set(phases) - set(PHASES)
+        if unknown:
+            parser.error(f"알 수 없는 단계: {', '.join(sorted(unknown))}")
+        logger.info(f"벤치마크 시작: 크기 {sizes}, 단계 {phases}")
+        report = run_benchmark(sizes, args.data_dir, args.seed, args.span, args.skew, args.bursts,
+                               phases, args.api_requests)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print_summary(report)
+        print(f'\n결과 저장: {args.output}')
+        logger.info(f"벤치마크 완료: {args.output}")
+
+        if args.compare:
+            with open(args.compare, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+            rows = compare_results(baseline, report, args.threshold)
+            regressions = [row for row in rows if row[5]]
+            print(f"\n[이전 결과와 비교: {args.compare} ({baseline['meta'].get('revision')})]")
+            for lines, metric, old, new, change, regressed in rows:
+                mark = '  << 회귀' if regressed else ''
+                print(f"  {lines:>12,}줄 {metric}: {old} → {new} ({change:+.1%}){mark}")
+            print(f"회귀 {len(regressions)}건 (기준 {args.threshold:.0%})")
+            if regressions:
+                sys.exit(1)
+    except Exception as e:
+        logger.error(f"벤치마크 오류: {str(e)}\n{traceback.format_exc()}")
+        print(f"벤치마크 중 오류가 발생했습니다: {str(e)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
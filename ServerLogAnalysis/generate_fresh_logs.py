@@ -1,6 +1,10 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import argparse
+import calendar
+import math
+import multiprocessing
 import random
 import time
 import logging
@@ -8,6 +12,8 @@ import os
 import traceback
 from datetime import datetime, timedelta
 
+import numpy as np
+
 # 로깅 설정
 def setup_logging():
     """로깅 설정을 초기화합니다."""
@@ -35,6 +41,276 @@ def setup_logging():
 # 로거 초기화
 logger = setup_logging()
 
+# 엔드포인트 목록
+ENDPOINTS = [
+    "/api/user/login",
+    "/api/user/logout",
+    "/api/user/list",
+    "/api/product/list",
+    "/api/product/detail",
+    "/api/order/create",
+    "/api/order/cancel",
+    "/api/admin/stats"
+]
+
+# HTTP 메서드
+METHODS = ["GET", "POST", "PUT", "DELETE"]
+
+# 상태 코드 (더 다양한 에러 포함)
+STATUS_CODES = {
+    "success": [200, 201, 204],
+    "client_error": [400, 401, 403, 404],
+    "server_error": [500, 502, 503]
+}
+
+# 항상 느린 엔드포인트
+SLOW_ENDPOINT = "/api/admin/stats"
+
+# 대량 생성 로그의 기본 시작 시각 (UTC). 고정해 두어 같은 seed면 파일이 완전히 같음
+BULK_START_TIME = datetime(2025, 7, 4)
+
+# 대량 생성 시 한 번에 만들어 쓰는 줄 수
+BULK_CHUNK_LINES = 500000
+
+# 에러 폭주 구간 안에서 대상 엔드포인트 요청이 서버 에러가 되는 비율
+BURST_ERROR_RATE = 0.5
+
+
+def _random_status(rng, n, success_rate=0.7, client_rate=0.8):
+    """초기 로그와 같은 규칙(성공 → 클라이언트 에러 → 서버 에러)으로 상태 코드와 응답시간을 뽑습니다."""
+    success = rng.random(n) < success_rate
+    client = ~success & (rng.random(n) < client_rate)
+    server = ~success & ~client
+    status = np.empty(n, dtype=np.int64)
+    resp = np.empty(n, dtype=np.int64)
+    for mask, codes, low, high in [(success, STATUS_CODES["success"], 50, 300),
+                                   (client, STATUS_CODES["client_error"], 50, 200),
+                                   (server, STATUS_CODES["server_error"], 200, 800)]:
+        status[mask] = rng.choice(codes, mask.sum())
+        resp[mask] = rng.integers(low, high + 1, mask.sum())
+    return status, resp
+
+
+def _random_columns(rng, n, weights):
+    """엔드포인트/메서드/상태 코드/응답시간 열을 n개 뽑습니다 (SLOW_ENDPOINT는 항상 느림)."""
+    endpoint = rng.choice(len(ENDPOINTS), n, p=weights)
+    method = rng.integers(0, len(METHODS), n)
+    status, resp = _random_status(rng, n)
+    slow = endpoint == ENDPOINTS.index(SLOW_ENDPOINT)
+    resp[slow] = rng.integers(800, 1201, slow.sum())
+    return endpoint, method, status, resp
+
+
+def endpoint_weights(skew=0.0):
+    """엔드포인트 선택 확률을 반환합니다. skew가 0이면 균등, 클수록 앞쪽 엔드포인트에 몰림(Zipf)."""
+    weights = 1.0 / np.arange(1, len(ENDPOINTS) + 1) ** skew
+    return weights / weights.sum()
+
+
+def format_lines(epoch_seconds, methods, endpoints, status, resp):
+    """열 배열들을 로그 텍스트 한 덩어리로 만듭니다."""
+    stamps = np.datetime_as_string(np.asarray(epoch_seconds, dtype='datetime64[s]'), unit='s').tolist()
+    return ''.join(
+        f"{stamp}Z {method} {endpoint} {code} {ms}ms\n"
+        for stamp, method, endpoint, code, ms in zip(stamps, methods, endpoints, status.tolist(), resp.tolist())
+    )
+
+
+def generate_bulk_lines(count, start_time=BULK_START_TIME, span_seconds=86400, seed=None, skew=0.0,
+                        bursts=0, burst_seconds=300, chunk_lines=BULK_CHUNK_LINES):
+    """벤치마크용 로그 count줄을 chunk_lines줄씩 텍스트 덩어리로 돌려줍니다.
+
+    엔드포인트/메서드/상태 코드 분포는 초기 로그 생성과 같고, 시각은 start_time(UTC)부터 span_seconds 동안 시간순으로 퍼집니다.
+    skew로 엔드포인트 쏠림을, bursts/burst_seconds로 엔드포인트 하나에 서버 에러와
+    느린 응답이 몰리는 구간 수/길이를 정합니다. 같은 seed면 같은 내용이 만들어집니다.
+    """
+    rng = np.random.default_rng(seed)
+    start = calendar.timegm(start_time.timetuple())
+    weights = endpoint_weights(skew)
+    endpoint_names = np.asarray(ENDPOINTS, dtype=object)
+    method_names = np.asarray(METHODS, dtype=object)
+    burst_starts = rng.integers(0, max(span_seconds - burst_seconds, 1), bursts)
+    burst_endpoints = rng.integers(0, len(ENDPOINTS), bursts)
+
+    for first in range(0, count, chunk_lines):
+        n = min(chunk_lines, count - first)
+        # 청크마다 전체 기간 중 자기 몫의 구간 안에서만 시각을 뽑아 파일 전체가 시간순이 되게 함
+        low = first * span_seconds // count
+        high = max((first + n) * span_seconds // count, low + 1)
+        offsets = np.sort(rng.integers(low, high, n))
+        endpoint, method, status, resp = _random_columns(rng, n, weights)
+
+        for burst_start, burst_endpoint in zip(burst_starts, burst_endpoints):
+            burst = ((offsets >= burst_start) & (offsets < burst_start + burst_seconds)
+                     & (endpoint == burst_endpoint) & (rng.random(n) < BURST_ERROR_RATE))
+            status[burst] = rng.choice(STATUS_CODES["server_error"], burst.sum())
+            resp[burst] = rng.integers(800, 3001, burst.sum())
+
+        yield format_lines(start + offsets, method_names[method].tolist(), endpoint_names[endpoint].tolist(), status, resp)
+
+
+def write_bulk_log(path, count, **options):
+    """generate_bulk_lines로 만든 로그를 path에 씁니다. options는 generate_bulk_lines와 같습니다."""
+    started = time.perf_counter()
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        for text in generate_bulk_lines(count, **options):
+            f.write(text)
+    elapsed = time.perf_counter() - started
+    logger.info(f"대량 로그 {count}줄 생성 완료: {path} ({elapsed:.1f}초)")
+    return elapsed
+
+# 고속 생성 모드: 한 번에 몰아 쓰는 주기(초), 난수 열을 미리 뽑아 두는 단위(줄), 진행 상황 출력 주기(초)
+LIVE_BATCH_INTERVAL = 0.1
+LIVE_BLOCK_LINES = 4096
+LIVE_STATS_INTERVAL = 5
+
+
+class LineSource:
+    """줄 내용(엔드포인트/메서드/상태 코드/응답시간)을 고정 크기 블록 단위로 뽑아 두는 원천
+
+    한 번에 몇 줄씩 가져가든 같은 seed면 같은 순서의 내용이 나오도록, 난수는 항상
+    LIVE_BLOCK_LINES줄씩 뽑아 두고 필요한 만큼 잘라 줍니다.
+    """
+
+    def __init__(self, seed=None, skew=0.0):
+        self.rng = np.random.default_rng(seed)
+        self.weights = endpoint_weights(skew)
+        self._endpoint_names = np.asarray(ENDPOINTS, dtype=object)
+        self._method_names = np.asarray(METHODS, dtype=object)
+        self._columns = [np.zeros(0, dtype=np.int64) for _ in range(4)]
+
+    def take(self, n):
+        """다음 n줄의 (메서드 목록, 엔드포인트 목록, 상태 코드 배열, 응답시간 배열)을 반환합니다."""
+        while len(self._columns[0]) < n:
+            block = _random_columns(self.rng, LIVE_BLOCK_LINES, self.weights)
+            self._columns = [np.concatenate([old, new]) for old, new in zip(self._columns, block)]
+        taken = [column[:n] for column in self._columns]
+        self._columns = [column[n:] for column in self._columns]
+        endpoint, method, status, resp = taken
+        return self._method_names[method].tolist(), self._endpoint_names[endpoint].tolist(), status, resp
+
+
+def traffic_factor(elapsed, diurnal_amplitude=0.0, diurnal_period=86400, burst_every=0, burst_seconds=0,
+                   burst_multiplier=1.0):
+    """시작 후 elapsed초 시점의 목표 속도 배율을 반환합니다.
+
+    diurnal_amplitude가 있으면 diurnal_period초를 하루로 보고 밤(1-진폭)에서 시작해
+    중간에 낮 최고점(1+진폭)을 찍는 곡선을 그립니다. burst_every초마다 그 주기의 마지막
+    burst_seconds초 동안은 burst_multiplier배로 늘어납니다.
+    """
+    factor = 1.0
+    if diurnal_amplitude:
+        factor -= diurnal_amplitude * math.cos(2 * math.pi * elapsed / diurnal_period)
+    if burst_every and elapsed % burst_every >= burst_every - burst_seconds:
+        factor *= burst_multiplier
+    return max(factor, 0.0)
+
+
+def _write_all(fd, data):
+    while data:
+        written = os.write(fd, data)
+        data = data[written:]
+
+
+def run_writer(log_file, rate, duration, seed, skew, traffic, batch_interval, stop_event, counter):
+    """작성자 하나가 목표 속도로 줄을 만들어 batch_interval마다 한 번에 붙여 씁니다.
+
+    여러 작성자가 같은 파일에 써도 줄이 섞이지 않도록 O_APPEND로 열고 배치 하나를
+    write 한 번으로 씁니다. 지금까지 써야 할 줄 수는 목표 속도를 시간에 대해 적분해
+    정하므로, 배치가 늦어지면 다음 배치에서 따라잡습니다. 작성자 프로세스에서
+    실행되므로 모듈 최상위 함수로 둡니다.
+    """
+    source = LineSource(seed, skew)
+    fd = os.open(log_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o644)
+    started = time.monotonic()
+    wall_started = time.time()
+    due = 0.0
+    written = 0
+    last_elapsed = 0.0
+    last_factor = traffic_factor(0.0, **traffic)
+    try:
+        while not stop_event.is_set():
+            tick = time.monotonic()
+            elapsed = tick - started
+            if duration is not None:
+                elapsed = min(elapsed, duration)
+            factor = traffic_factor(elapsed, **traffic)
+            due += rate * (last_factor + factor) / 2 * (elapsed - last_elapsed)
+            n = int(due) - written
+            if n > 0:
+                methods, endpoints, status, resp = source.take(n)
+                # 배치 안의 줄들은 지난 배치 이후 시간 동안 고르게 퍼진 시각으로 기록
+                seconds = np.linspace(wall_started + last_elapsed, wall_started + elapsed, n, endpoint=False)
+                _write_all(fd, format_lines(seconds.astype(np.int64), methods, endpoints, status, resp).encode('utf-8'))
+                written += n
+                counter.value = written
+            last_elapsed, last_factor = elapsed, factor
+            if duration is not None and elapsed >= duration:
+                break
+            time.sleep(max(0.0, batch_interval - (time.monotonic() - tick)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        os.close(fd)
+
+
+def generate_high_rate_logs(log_file, rate, duration=None, writers=1, seed=None, skew=0.0,
+                            batch_interval=LIVE_BATCH_INTERVAL, truncate=False, **traffic):
+    """초당 rate줄(작성자들의 합)의 로그를 duration초 동안(None이면 Ctrl+C까지) 붙여 씁니다.
+
+    writers개의 프로세스가 rate를 나눠 같은 파일에 씁니다. 작성자 i는 seed와 i로 만든
+    난수를 쓰므로 같은 seed면 작성자별 줄 내용의 순서가 같습니다(시각은 실제 시각).
+    traffic은 traffic_factor의 인자(diurnal_amplitude, diurnal_period, burst_every,
+    burst_seconds, burst_multiplier)입니다. 실제로 쓴 줄 수를 반환합니다.
+    """
+    if truncate:
+        open(log_file, 'w').close()
+    stop_event = multiprocessing.Event()
+    counters = [multiprocessing.Value('q', 0) for _ in range(writers)]
+    processes = [
+        multiprocessing.Process(
+            target=run_writer,
+            args=(log_file, rate / writers, duration, None if seed is None else [seed, i], skew, traffic,
+                  batch_interval, stop_event, counters[i]),
+            name=f'log-writer-{i}',
+            daemon=True,
+        )
+        for i in range(writers)
+    ]
+    logger.info(f"고속 로그 생성 시작: {log_file}, 목표 {rate}줄/초, 작성자 {writers}개, 기간 {duration}초")
+    started = time.monotonic()
+    for process in processes:
+        process.start()
+
+    last_total, last_time = 0, started
+    try:
+        while any(process.is_alive() for process in processes):
+            for process in processes:
+                process.join(timeout=LIVE_STATS_INTERVAL / len(processes))
+            now = time.monotonic()
+            total = sum(counter.value for counter in counters)
+            if now - last_time >= LIVE_STATS_INTERVAL or not any(process.is_alive() for process in processes):
+                current_rate = (total - last_total) / (now - last_time) if now > last_time else 0
+                print(f"누적 {total:,}줄, 최근 {current_rate:,.0f}줄/초 (목표 {rate * traffic_factor(now - started, **traffic):,.0f}줄/초)")
+                last_total, last_time = total, now
+    except KeyboardInterrupt:
+        print("\n로그 생성이 중단되었습니다.")
+    finally:
+        stop_event.set()
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            # 기다리는 중에 한 번 더 중단하면 작성자들을 바로 종료
+            for process in processes:
+                process.terminate()
+
+    total = sum(counter.value for counter in counters)
+    elapsed = time.monotonic() - started
+    logger.info(f"고속 로그 생성 종료: {total}줄, {elapsed:.1f}초, 평균 {total / elapsed if elapsed else 0:.0f}줄/초")
+    return total
+
+
 def generate_fresh_logs():
     """새로운 로그 파일을 생성하여 대시보드에서 변화를 명확히 볼 수 있도록 함"""
     
@@ -44,27 +320,9 @@ def generate_fresh_logs():
         # 로그 파일 경로
         log_file = "server_sample.log"
         
-        # 엔드포인트 목록
-        endpoints = [
-            "/api/user/login",
-            "/api/user/logout", 
-            "/api/user/list",
-            "/api/product/list",
-            "/api/product/detail",
-            "/api/order/create",
-            "/api/order/cancel",
-            "/api/admin/stats"
-        ]
-        
-        # HTTP 메서드
-        methods = ["GET", "POST", "PUT", "DELETE"]
-        
-        # 상태 코드 (더 다양한 에러 포함)
-        status_codes = {
-            "success": [200, 201, 204],
-            "client_error": [400, 401, 403, 404],
-            "server_error": [500, 502, 503]
-        }
+        endpoints = ENDPOINTS
+        methods = METHODS
+        status_codes = STATUS_CODES
         
         print("새로운 로그 파일을 생성합니다...")
         print("대시보드에서 변화를 명확히 볼 수 있도록 다양한 패턴의 로그를 생성합니다.")
@@ -161,4 +419,40 @@ def generate_fresh_logs():
         print(f"로그 생성 중 오류가 발생했습니다: {str(e)}")
 
 if __name__ == "__main__":
-    generate_fresh_logs() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='서버 로그 생성')
+    parser.add_argument('--bulk', type=int, default=None,
+                        help='실시간 생성 대신 이 줄 수만큼 한 번에 생성 (벤치마크용)')
+    parser.add_argument('--output', default='server_sample.log', help='--bulk/--rate 결과 파일 경로')
+    parser.add_argument('--start', type=datetime.fromisoformat, default=BULK_START_TIME,
+                        help='--bulk 로그의 시작 시각 (UTC, 예: 2025-07-04T00:00:00)')
+    parser.add_argument('--span', type=int, default=86400, help='--bulk 로그가 퍼지는 기간(초)')
+    parser.add_argument('--seed', type=int, default=None, help='난수 시드 (같은 값이면 같은 로그)')
+    parser.add_argument('--skew', type=float, default=0.0, help='엔드포인트 쏠림 정도 (0이면 균등)')
+    parser.add_argument('--bursts', type=int, default=0, help='에러 폭주 구간 수')
+    parser.add_argument('--burst-seconds', type=int, default=None,
+                        help='--bulk: 에러 폭주 구간 길이(초, 기본 300), --rate: 트래픽 폭주 구간 길이(초, 기본 10)')
+    parser.add_argument('--rate', type=float, default=None,
+                        help='고속 생성 모드: 초당 줄 수 (작성자 전체 합). 지정하지 않으면 3초마다 한 줄')
+    parser.add_argument('--duration', type=float, default=None, help='고속 생성 모드 실행 시간(초, 기본: Ctrl+C까지)')
+    parser.add_argument('--writers', type=int, default=1, help='같은 파일에 동시에 쓰는 작성자 프로세스 수')
+    parser.add_argument('--batch-interval', type=float, default=LIVE_BATCH_INTERVAL,
+                        help='모아서 한 번에 쓰는 주기(초)')
+    parser.add_argument('--diurnal-amplitude', type=float, default=0.0,
+                        help='하루 주기 곡선 진폭 (0~1, 0.5면 목표 속도의 0.5~1.5배)')
+    parser.add_argument('--diurnal-period', type=float, default=86400, help='하루 주기 곡선의 한 주기(초)')
+    parser.add_argument('--burst-every', type=float, default=0, help='트래픽 폭주 주기(초, 0이면 없음)')
+    parser.add_argument('--burst-multiplier', type=float, default=5.0, help='트래픽 폭주 구간의 속도 배율')
+    parser.add_argument('--truncate', action='store_true', help='고속 생성 모드 시작 전에 파일을 비움')
+    args = parser.parse_args()
+    if args.rate is not None:
+        generate_high_rate_logs(args.output, args.rate, duration=args.duration, writers=args.writers, seed=args.seed,
+                                skew=args.skew, batch_interval=args.batch_interval, truncate=args.truncate,
+                                diurnal_amplitude=args.diurnal_amplitude, diurnal_period=args.diurnal_period,
+                                burst_every=args.burst_every, burst_seconds=args.burst_seconds or 10,
+                                burst_multiplier=args.burst_multiplier)
+    elif args.bulk is None:
+        generate_fresh_logs()
+    else:
+        elapsed = write_bulk_log(args.output, args.bulk, start_time=args.start, span_seconds=args.span, seed=args.seed, skew=args.skew,
+                                 bursts=args.bursts, burst_seconds=args.burst_seconds or 300)
+        print(f"로그 {args.bulk}줄을 생성했습니다: {args.output} ({elapsed:.1f}초)") 
\ No newline at end of file
@@ -0,0 +1,173 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+# 기본 상대 오차 (1%)
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+# 리포트/대시보드에서 보여주는 분위수
+REPORT_QUANTILES = {'p50': 0.5, 'p90': 0.9, 'p99': 0.99, 'p999': 0.999}
+
+
+class LatencySketch:
+    """응답시간(ms) 분포를 근사하는 로그 버킷 히스토그램 (DDSketch 방식)
+
+    값 x(>0)를 ceil(log_gamma(x)) 번 버킷에 세어 두므로, 메모리는 값의 범위에
+    대해 로그로만 늘어나고(1ms~1시간이면 1천 개 남짓) 샘플 수와는 무관합니다.
+    버킷 배열은 실제로 값이 들어온 키 구간(key_offset부터)만 유지합니다.
+    분위수 추정치는 실제 값 대비 relative_accuracy 이내의 상대 오차를 가지며,
+    같은 정확도로 만든 스케치끼리는 버킷을 더하는 것만으로 합칠 수 있습니다.
+    """
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.key_offset = 0
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _keys(self, values):
+        return np.ceil(np.log(values) / self._log_gamma).astype(np.int64)
+
+    def _add_counts(self, counts, offset):
+        """offset 키부터 시작하는 버킷 카운트 배열을 더합니다."""
+        if len(counts) == 0:
+            return
+        if len(self.counts) == 0:
+            self.counts = np.array(counts, dtype=np.int64)
+            self.key_offset = offset
+            return
+        low = min(self.key_offset, offset)
+        high = max(self.key_offset + len(self.counts), offset + len(counts))
+        if low != self.key_offset or high != self.key_offset + len(self.counts):
+            grown = np.zeros(high - low, dtype=np.int64)
+            start = self.key_offset - low
+            grown[start:start + len(self.counts)] = self.counts
+            self.counts = grown
+            self.key_offset = low
+        start = offset - self.key_offset
+        self.counts[start:start + len(counts)] += counts
+
+    def add(self, value):
+        """값 하나를 추가합니다."""
+        self.add_many(np.array([value]))
+
+    def add_many(self, values):
+        """여러 값을 한 번에 추가합니다."""
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return
+        self.count += int(values.size)
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        positive = values[values >= 1]
+        self.zero_count += int(values.size - positive.size)
+        if positive.size:
+            keys = self._keys(positive)
+            low = int(keys.min())
+            self._add_counts(np.bincount(keys - low), low)
+
+    def merge(self, other):
+        """같은 정확도의 다른 스케치를 합칩니다."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("상대 오차가 다른 스케치는 합칠 수 없습니다")
+        self._add_counts(other.counts, other.key_offset)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def mean(self):
+        return self.total / self.count if self.count else math.nan
+
+    def _value_at_rank(self, rank, cumulative):
+        """rank번째(0부터) 값의 추정치를 반환합니다."""
+        if rank < self.zero_count:
+            return max(self.min, 0.0)
+        key = self.key_offset + int(np.searchsorted(cumulative, rank - self.zero_count, side='right'))
+        estimate = 2 * self.gamma ** key / (self.gamma + 1)
+        # 버킷 대표값이 실제 최소/최대를 벗어나지 않도록 보정
+        return min(max(estimate, self.min), self.max)
+
+    def copy(self):
+        other = LatencySketch(self.relative_accuracy)
+        return other.merge(self)
+
+    def quantile(self, q):
+        """q 분위수를 추정합니다 (pandas의 linear 보간과 같은 방식)."""
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs):
+        """여러 분위수를 한 번에 추정합니다."""
+        if self.count == 0:
+            return [math.nan for _ in qs]
+        cumulative = np.cumsum(self.counts)
+        return [self._quantile(q, cumulative) for q in qs]
+
+    def _quantile(self, q, cumulative):
+        position = q * (self.count - 1)
+        lower = math.floor(position)
+        upper = min(lower + 1, self.count - 1)
+        low = self._value_at_rank(lower, cumulative)
+        if upper == lower:
+            return low
+        high = self._value_at_rank(upper, cumulative)
+        return low + (high - low) * (position - lower)
+
+
+def sketches_by_group(groups, values, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+    """그룹별 스케치를 한 번에 만듭니다.
+
+    groupby + 그룹마다 파이썬 함수 호출 대신, 그룹 코드와 버킷 번호를 합친
+    키의 개수를 한 번에 세어 그룹별로 나눕니다. {그룹: LatencySketch}를 반환합니다.
+    """
+    codes, uniques = pd.factorize(np.asarray(groups), sort=True)
+    values = np.asarray(values, dtype=np.float64)
+    sketches = {group: LatencySketch(relative_accuracy) for group in uniques}
+    if values.size == 0:
+        return sketches
+
+    n_groups = len(uniques)
+    group_counts = np.bincount(codes, minlength=n_groups)
+    totals = np.bincount(codes, weights=values, minlength=n_groups)
+    mins = np.full(n_groups, np.inf)
+    maxs = np.full(n_groups, -np.inf)
+    np.minimum.at(mins, codes, values)
+    np.maximum.at(maxs, codes, values)
+
+    # (그룹, 버킷) 조합별 개수를 그룹 순서로 정렬된 형태로 구함
+    template = next(iter(sketches.values()))
+    positive = values >= 1
+    keys = template._keys(values[positive])
+    low = int(keys.min()) if keys.size else 0
+    width = (int(keys.max()) - low + 1) if keys.size else 1
+    combined, combined_counts = np.unique(codes[positive] * width + (keys - low), return_counts=True)
+    combined_groups = combined // width
+    combined_keys = combined % width + low
+    bounds = np.searchsorted(combined_groups, np.arange(n_groups + 1))
+
+    for i, group in enumerate(uniques):
+        sketch = sketches[group]
+        start, end = bounds[i], bounds[i + 1]
+        if end > start:
+            group_keys = combined_keys[start:end]
+            counts = np.zeros(group_keys[-1] - group_keys[0] + 1, dtype=np.int64)
+            counts[group_keys - group_keys[0]] = combined_counts[start:end]
+            sketch.counts = counts
+            sketch.key_offset = int(group_keys[0])
+        sketch.zero_count = int(group_counts[i] - (combined_counts[start:end].sum() if end > start else 0))
+        sketch.count = int(group_counts[i])
+        sketch.total = float(totals[i])
+        sketch.min = float(mins[i])
+        sketch.max = float(maxs[i])
+    return sketches
@@ -0,0 +1,294 @@
+import heapq
+import threading
+from collections import Counter, defaultdict
+
+import pandas as pd
+
+from latency_sketch import REPORT_QUANTILES, LatencySketch, sketches_by_group
+from log_anomaly import AnomalyDetector
+
+ERROR_CATEGORIES = ['4xx', '5xx']
+
+SLOW_REQUEST_COLUMNS = ['datetime', 'method', 'endpoint', 'status', 'resp_ms']
+
+# 구간별 느린 요청 힙의 구간 크기 (초)
+WINDOW_BUCKET_SECONDS = 60
+
+
+class TopK:
+    """키가 가장 큰 k개만 유지하는 최소 힙
+
+    항목은 (key, tiebreak, payload) 튜플로 넣으며(tiebreak는 항목마다 고유해야 함),
+    힙 크기가 k를 넘으면 가장 작은 항목을 버리므로 메모리는 k개로 고정됩니다.
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self._heap = []
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, key, tiebreak, payload):
+        item = (key, tiebreak, payload)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, item)
+        elif (key, tiebreak) > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, item)
+
+    def merge(self, other):
+        for key, tiebreak, payload in other._heap:
+            self.push(key, tiebreak, payload)
+        return self
+
+    def items(self):
+        """키가 큰 순서대로 (key, tiebreak, payload) 목록을 반환합니다."""
+        return sorted(self._heap, key=lambda item: item[:2], reverse=True)
+
+
+def _counter_series(counter, index_name, name=None, by_count=False):
+    """Counter를 groupby().size()/value_counts()와 같은 모양의 Series로 변환합니다."""
+    series = pd.Series(dict(sorted(counter.items())), dtype='int64', name=name)
+    series.index.name = index_name
+    if by_count:
+        series = series.sort_values(ascending=False, kind='stable')
+    return series
+
+
+def endpoint_stats_frame(sketches):
+    """엔드포인트별 스케치로 건수/평균/분위수 통계 DataFrame을 만듭니다."""
+    endpoints = sorted(sketches)
+    data = {
+        'count': [sketches[ep].count for ep in endpoints],
+        'avg_resp': [sketches[ep].mean() for ep in endpoints],
+    }
+    quantiles = [sketches[ep].quantiles(REPORT_QUANTILES.values()) for ep in endpoints]
+    for i, name in enumerate(REPORT_QUANTILES):
+        data[f'{name}_resp'] = [q[i] for q in quantiles]
+    endpoint_stats = pd.DataFrame(data, index=pd.Index(endpoints, name='endpoint'))
+    return endpoint_stats.sort_values('count', ascending=False, kind='stable')
+
+
+class RunningAggregates:
+    """청크 단위로 들어오는 로그를 누적 집계하는 스트리밍 분석기
+
+    행 자체는 보관하지 않고 건수/합계, 엔드포인트별 응답시간 스케치,
+    응답시간 상위 k개 힙, 엔드포인트별 이상 탐지 기준선만 유지하므로 파일 크기와 관계없이 메모리가 일정합니다.
+    results()는 log_analysis.compute_results와 같은 형태의 결과를 돌려줍니다.
+    """
+
+    def __init__(self, top_k=10):
+        self.rows = 0
+        self.hourly = Counter()
+        self.daily = Counter()
+        self.hourly_resp_sum = Counter()
+        self.endpoint_sketch = defaultdict(LatencySketch)
+        self.status_dist = Counter()
+        self.error_hourly = defaultdict(Counter)
+        self.error_endpoint = defaultdict(Counter)
+        self.slow = TopK(top_k)
+        self.anomalies = AnomalyDetector()
+
+    def update(self, df):
+        """파싱된 청크 하나를 누적합니다."""
+        if df.empty:
+            return
+        df = df.reset_index(drop=True)
+        hour = df['datetime'].dt.hour
+        resp = df['resp_ms']
+
+        self.hourly.update(hour.value_counts().to_dict())
+        self.daily.update(df['datetime'].dt.date.value_counts().to_dict())
+        self.hourly_resp_sum.update(resp.groupby(hour).sum().to_dict())
+
+        for endpoint, sketch in sketches_by_group(df['endpoint'], resp).items():
+            self.endpoint_sketch[endpoint].merge(sketch)
+
+        status_cat = (df['status'] // 100).astype(str) + 'xx'
+        self.status_dist.update(status_cat.value_counts().to_dict())
+        for err_cat in ERROR_CATEGORIES:
+            mask = status_cat == err_cat
+            if mask.any():
+                self.error_hourly[err_cat].update(hour[mask].value_counts().to_dict())
+                self.error_endpoint[err_cat].update(df.loc[mask, 'endpoint'].value_counts().to_dict())
+
+        # 청크 안에서 상위 k개만 골라 힙에 넣음 (동점이면 먼저 나온 행 우선)
+        top = df.sort_values('resp_ms', ascending=False, kind='stable').head(self.slow.k)
+        for idx, row in zip(top.index, top[SLOW_REQUEST_COLUMNS].itertuples(index=False)):
+            self.slow.push(int(row.resp_ms), -(self.rows + idx), tuple(row))
+
+        self.anomalies.update(df)
+        self.rows += len(df)
+
+    def merge(self, other, host=None):
+        """다른 소스(호스트)를 따로 누적한 결과를 합칩니다.
+
+        other의 행은 이 객체의 행 뒤에 이어진 것으로 봅니다(느린 요청 동점 처리).
+        이상 징후는 소스별 기준선으로 찾은 것을 그대로 모으며, host를 주면 이상
+        징후마다 host를 붙입니다.
+        """
+        self.hourly.update(other.hourly)
+        self.daily.update(other.daily)
+        self.hourly_resp_sum.update(other.hourly_resp_sum)
+        for endpoint, sketch in other.endpoint_sketch.items():
+            self.endpoint_sketch[endpoint].merge(sketch)
+        self.status_dist.update(other.status_dist)
+        for err_cat, counter in other.error_hourly.items():
+            self.error_hourly[err_cat].update(counter)
+        for err_cat, counter in other.error_endpoint.items():
+            self.error_endpoint[err_cat].update(counter)
+        for key, tiebreak, payload in other.slow.items():
+            self.slow.push(key, tiebreak - self.rows, payload)
+        self.anomalies.merge(other.anomalies, host)
+        self.rows += other.rows
+        return self
+
+    def results(self):
+        """누적 결과를 compute_results와 같은 형태로 반환합니다."""
+        endpoint_stats = endpoint_stats_frame(self.endpoint_sketch)
+
+        status_dist = _counter_series(self.status_dist, 'status', 'count', by_count=True)
+
+        errors = {}
+        for err_cat in ERROR_CATEGORIES:
+            if self.status_dist.get(err_cat):
+                errors[err_cat] = {
+                    'hourly': _counter_series(self.error_hourly[err_cat], 'hour'),
+                    'endpoint': _counter_series(self.error_endpoint[err_cat], 'endpoint', 'count', by_count=True),
+                }
+
+        slow_items = self.slow.items()
+        slow_requests = pd.DataFrame(
+            [payload for _, _, payload in slow_items],
+            columns=SLOW_REQUEST_COLUMNS,
+            index=[-tiebreak for _, tiebreak, _ in slow_items],
+        )
+
+        hourly = _counter_series(self.hourly, 'hour')
+        hourly_resp = pd.Series(
+            {h: self.hourly_resp_sum[h] / self.hourly[h] for h in sorted(self.hourly)},
+            name='resp_ms',
+        )
+        hourly_resp.index.name = 'hour'
+
+        return {
+            'total': self.rows,
+            'hourly': hourly,
+            'daily': _counter_series(self.daily, 'date'),
+            'endpoint_stats': endpoint_stats,
+            'endpoint_sketches': dict(self.endpoint_sketch),
+            'status_dist': status_dist,
+            'errors': errors,
+            'slow_requests': slow_requests,
+            'hourly_resp': hourly_resp,
+            'anomalies': self.anomalies.events(),
+        }
+
+
+class RequestTracker:
+    """최근 요청과 느린 요청을 수집 시점에 유지하는 LogStore consumer
+
+    최근 요청(시각 기준)과 느린 요청(응답시간 기준)을 각각 크기가 고정된 TopK
+    힙에 넣어 두므로 조회는 로그 양과 관계없이 힙 크기만큼만 읽습니다. 로그가
+    시간순이 아니어도(예: 과거 로그를 뒤에 붙인 파일) nlargest와 결과가 같도록
+    도착 순서가 아닌 시각을 키로 씁니다.
+    최근 window_seconds 동안의 느린 요청은 분 단위 구간별 TopK 힙으로 유지하고,
+    조회할 때 구간 힙들을 합칩니다. 행 순서(동점 처리)는 nlargest와 같습니다.
+    """
+
+    def __init__(self, recent_size=10, slow_k=5, window_seconds=3600):
+        self.recent_size = recent_size
+        self.slow_k = slow_k
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.rows = 0
+            self.latest = None
+            self._recent = TopK(self.recent_size)
+            self._slow = TopK(self.slow_k)
+            self._windows = {}
+
+    def update(self, df):
+        """새로 들어온 행들을 힙에 반영합니다."""
+        if df.empty:
+            return
+        df = df.reset_index(drop=True)[SLOW_REQUEST_COLUMNS]
+        seconds = df['datetime'].dt.as_unit('s').array.asi8
+        bucket = seconds - seconds % WINDOW_BUCKET_SECONDS
+
+        with self._lock:
+            start_row = self.rows
+            self.rows += len(df)
+
+            # 청크 안에서 가장 늦은 recent_size개만 후보로 넣으면 충분
+            times = df['datetime'].array.asi8
+            latest_rows = df.nlargest(self.recent_size, 'datetime')
+            for idx, row in zip(latest_rows.index, latest_rows.itertuples(index=False, name=None)):
+                self._recent.push(int(times[idx]), -(start_row + idx), row)
+
+            latest = int(seconds.max())
+            self.latest = latest if self.latest is None else max(self.latest, latest)
+            cutoff = self.latest - self.window_seconds
+
+            # 전체/구간별로 청크 안의 상위 k개만 골라 힙에 넣음 (동점이면 먼저 나온 행 우선)
+            top = df.sort_values('resp_ms', ascending=False, kind='stable')
+            for idx, row in zip(top.index[:self.slow_k], top.head(self.slow_k).itertuples(index=False, name=None)):
+                self._slow.push(row[4], -(start_row + idx), row)
+
+            top_bucket = pd.Series(bucket[top.index], index=top.index)
+            in_window = top[(top_bucket + WINDOW_BUCKET_SECONDS > cutoff).to_numpy()]
+            in_window = in_window.groupby(top_bucket[in_window.index], sort=False).head(self.slow_k)
+            for idx, row in zip(in_window.index, in_window.itertuples(index=False, name=None)):
+                window = self._windows.setdefault(int(bucket[idx]), TopK(self.slow_k))
+                window.push(row[4], -(start_row + idx), row)
+
+            for start in [start for start in self._windows if start + WINDOW_BUCKET_SECONDS <= cutoff]:
+                del self._windows[start]
+
+    def merge(self, other):
+        """다른 파티션(호스트)의 최근/느린 요청 힙을 합칩니다.
+
+        조회할 때 새 RequestTracker에 파티션별 tracker를 합쳐 쓰는 용도이며, 힙
+        크기만큼만 옮기므로 로그 양과 관계없습니다. other의 행은 이 객체의 행 뒤에
+        이어진 것으로 봅니다(동점 처리).
+        """
+        with other._lock, self._lock:
+            offset = self.rows
+            for key, tiebreak, payload in other._recent.items():
+                self._recent.push(key, tiebreak - offset, payload)
+            for key, tiebreak, payload in other._slow.items():
+                self._slow.push(key, tiebreak - offset, payload)
+            for start, window in other._windows.items():
+                merged = self._windows.setdefault(start, TopK(self.slow_k))
+                for key, tiebreak, payload in window.items():
+                    merged.push(key, tiebreak - offset, payload)
+            self.rows += other.rows
+            if other.latest is not None:
+                self.latest = other.latest if self.latest is None else max(self.latest, other.latest)
+        return self
+
+    def recent(self):
+        """최근 요청 행들을 시각이 늦은 순서로 반환합니다."""
+        with self._lock:
+            items = self._recent.items()
+        return [payload for _, _, payload in items]
+
+    def slowest(self, window_seconds=None):
+        """느린 요청 행들을 응답시간 순서로 반환합니다.
+
+        window_seconds를 주면 마지막 로그 시각 기준 그 기간 안의 행만 봅니다
+        (분 단위 구간으로 맞춰지며, 생성 시 지정한 window_seconds까지 가능).
+        """
+        with self._lock:
+            if window_seconds is None:
+                heap = TopK(self.slow_k).merge(self._slow)
+            else:
+                heap = TopK(self.slow_k)
+                cutoff = (self.latest or 0) - window_seconds
+                for start, window in self._windows.items():
+                    if start + WINDOW_BUCKET_SECONDS > cutoff:
+                        heap.merge(window)
+        return [payload for _, _, payload in heap.items()]
@@ -1,10 +1,27 @@
-import re
+import argparse
+import time
 import pandas as pd
 import traceback
 import logging
 import os
+from collections import deque
 from datetime import datetime
 
+from latency_sketch import sketches_by_group
+from log_aggregates import ERROR_CATEGORIES, RunningAggregates, endpoint_stats_frame
+from log_cache import ColumnCache
+from log_columns import RESP_MS_MAX
+from log_ingest import columns_to_frame, expand_log_paths, is_compressed, iter_compressed_blocks, iter_parsed_columns, load_logs_parallel
+from log_anomaly import AnomalyDetector, format_anomaly
+from log_history import LogHistory
+from log_mmap import MappedLog
+from log_parser import LOG_LINE_RE, parse_log_block
+from log_partitions import expand_source, parse_source_specs
+from log_query import parse_time
+from log_store import LogStore
+from log_tailer import LogTailer
+from perf_metrics import metrics, profile_call
+
 # 로깅 설정
 def setup_logging():
     """로깅 설정을 초기화합니다."""
@@ -32,16 +49,25 @@ def setup_logging():
 # 로거 초기화
 logger = setup_logging()
 
-# 로그 파일 경로
-LOG_FILE = 'server_sample.log'
+# 로그 파일 경로 (app.py와 같은 환경 변수로 바꿀 수 있음)
+LOG_FILE = os.environ.get('SERVER_LOG_FILE') or 'server_sample.log'
+
+# 스트리밍 모드 청크 크기와 자동 전환 기준 파일 크기
+STREAM_CHUNK_SIZE = 64 * 1024 * 1024
+STREAMING_THRESHOLD = 1024 * 1024 * 1024
+
+# 출력/리포트에 보여 주는 이상 징후 최대 개수
+REPORT_ANOMALY_LIMIT = 5
 
 # 로그 파싱 함수
 def parse_log_line(line):
     try:
-        pattern = r"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z) (\w+) (\S+) (\d{3}) (\d+)ms"
-        match = re.match(pattern, line)
+        match = LOG_LINE_RE.match(line)
         if match:
             dt, method, endpoint, status, resp = match.groups()
+            # parse_log_block과 같이 저장 범위를 넘는 응답 시간은 건너뜀
+            if int(resp) > RESP_MS_MAX:
+                return None
             return {
                 'datetime': pd.to_datetime(dt),
                 'method': method,
@@ -55,189 +81,463 @@ def parse_log_line(line):
         return None
 
 # 로그 파일 읽기 및 파싱
-def load_log_to_df(log_file):
+def load_log_to_df(log_file, use_cache=True):
     try:
         if not os.path.exists(log_file):
             logger.error(f"로그 파일이 존재하지 않습니다: {log_file}")
             return pd.DataFrame()
         
-        with open(log_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+        # 압축 파일은 이어서 읽을 수 없으므로 캐시 없이 블록 단위로 풀면서 파싱
+        if is_compressed(log_file):
+            df = load_logs_parallel([log_file], workers=1)
+            logger.info(f"압축 로그 파일 로드 완료: {len(df)} 개의 레코드")
+            return df
         
-        records = [parse_log_line(line) for line in lines]
-        records = [r for r in records if r]
-        df = pd.DataFrame(records)
+        # 디스크 캐시에 저장된 부분은 그대로 읽고, 그 뒤에 추가된 텍스트만 파싱
+        store = LogStore(log_file, parse_log_block, cache=ColumnCache(log_file) if use_cache else None)
+        store.refresh()
+        frames = [store.columns.to_wide_frame()]
+        # 아직 줄바꿈이 없는 마지막 줄도 포함 (캐시에는 저장하지 않음)
+        frames += [parse_log_block(block) for block in store.tailer.iter_blocks(final=True)]
+        frames = [df for df in frames if not df.empty]
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else (frames[0] if frames else pd.DataFrame())
         
         logger.info(f"로그 파일 로드 완료: {len(df)} 개의 레코드")
         return df
+    except ImportError:
+        # 압축 해제 패키지(zstandard 등)가 없음: 빈 결과 대신 설치 안내가 보이도록 그대로 올림
+        raise
     except Exception as e:
         logger.error(f"로그 파일 로드 오류: {str(e)}\n{traceback.format_exc()}")
         return pd.DataFrame()
 
-def main():
-    try:
-        logger.info("로그 분석 시작")
-        print('로그 데이터 로드 중...')
-        df = load_log_to_df(LOG_FILE)
-        
-        if df.empty:
-            logger.warning("분석할 로그 데이터가 없습니다")
-            print("분석할 로그 데이터가 없습니다")
-            return
-        
-        print(f'총 요청 수: {len(df)}')
-        logger.info(f"총 요청 수: {len(df)}")
+# 분석 결과 계산 (메모리에 모두 올린 DataFrame 기준)
+def compute_results(df):
+    df['hour'] = df['datetime'].dt.hour
+    df['date'] = df['datetime'].dt.date
+    status_cat = df['status'].apply(lambda x: f'{x//100}xx')
+    df['status_cat'] = status_cat
 
-        # 2. 트래픽 분포 분석 (시간별)
-        try:
-            df['hour'] = df['datetime'].dt.hour
-            df['date'] = df['datetime'].dt.date
-            hourly = df.groupby('hour').size()
-            daily = df.groupby('date').size()
+    # 엔드포인트별 응답시간 분포는 스케치로 한 번에 집계 (그룹마다 파이썬 lambda 호출 없음)
+    endpoint_sketches = sketches_by_group(df['endpoint'], df['resp_ms'])
+    endpoint_stats = endpoint_stats_frame(endpoint_sketches)
+
+    # 이상 탐지는 스트리밍 모드와 같도록 파일 순서대로 넣음
+    anomalies = AnomalyDetector()
+    anomalies.update(df)
+
+    errors = {}
+    for err_cat in ERROR_CATEGORIES:
+        err_df = df[df['status_cat'] == err_cat]
+        if not err_df.empty:
+            errors[err_cat] = {
+                'hourly': err_df.groupby('hour').size(),
+                'endpoint': err_df['endpoint'].value_counts(),
+            }
+
+    return {
+        'total': len(df),
+        'hourly': df.groupby('hour').size(),
+        'daily': df.groupby('date').size(),
+        'endpoint_stats': endpoint_stats,
+        'endpoint_sketches': endpoint_sketches,
+        'status_dist': status_cat.value_counts(),
+        'errors': errors,
+        'slow_requests': df.sort_values('resp_ms', ascending=False, kind='stable').head(10),
+        'hourly_resp': df.groupby('hour')['resp_ms'].mean(),
+        'anomalies': anomalies.events(),
+    }
+
+# 분석 결과 계산 (파일을 청크 단위로 읽으며 누적 집계)
+def compute_results_streaming(log_file, chunk_size=STREAM_CHUNK_SIZE):
+    if not os.path.exists(log_file):
+        logger.error(f"로그 파일이 존재하지 않습니다: {log_file}")
+        return None
+
+    aggregates = RunningAggregates(top_k=10)
+    if is_compressed(log_file):
+        blocks = iter_compressed_blocks(log_file, chunk_size)
+    else:
+        blocks = LogTailer(log_file, block_size=chunk_size).iter_blocks(final=True)
+    for block in blocks:
+        aggregates.update(parse_log_block(block))
+
+    logger.info(f"스트리밍 집계 완료: {aggregates.rows} 개의 레코드")
+    return aggregates.results()
+
+# 분석 결과 계산 (여러 파일을 작업자 프로세스에서 병렬 파싱하며 누적 집계)
+def compute_results_parallel_streaming(paths, chunk_size=STREAM_CHUNK_SIZE, workers=None, threads=None):
+    aggregates = RunningAggregates(top_k=10)
+    for columns in iter_parsed_columns(paths, workers, range_size=chunk_size, threads=threads):
+        aggregates.update(columns_to_frame(columns))
 
+    logger.info(f"병렬 스트리밍 집계 완료: {aggregates.rows} 개의 레코드")
+    return aggregates.results()
+
+# 분석 결과 계산 (소스(호스트)마다 따로 누적 집계한 뒤 합침)
+def compute_results_partitioned(sources, chunk_size=STREAM_CHUNK_SIZE, workers=None, threads=None):
+    total = RunningAggregates(top_k=10)
+    for name, patterns in sources:
+        # 이상 징후 기준선은 호스트별로 따로 학습 (여러 호스트의 로그가 섞이면 시간순이 아님)
+        aggregates = RunningAggregates(top_k=10)
+        for columns in iter_parsed_columns(expand_source(patterns), workers, range_size=chunk_size, threads=threads):
+            aggregates.update(columns_to_frame(columns))
+        logger.info(f"소스 집계 완료: {name}, {aggregates.rows} 개의 레코드")
+        total.merge(aggregates, host=name)
+
+    logger.info(f"소스별 집계 완료: 소스 {len(sources)}개, {total.rows} 개의 레코드")
+    return total.results()
+
+# 분석 결과 계산 (새로 추가된 부분만 이력 DB에 넣고, 지난 구간은 다시 파싱하지 않고 DB에서 읽음)
+def compute_results_history(history, sources, paths, start=None, end=None):
+    if sources:
+        for name, patterns in sources:
+            history.ingest(expand_source(patterns), name)
+    else:
+        history.ingest(paths)
+    history.compact()
+
+    # 호스트별로 따로 누적 집계한 뒤 합침 (이상 징후 기준선은 호스트별로 학습)
+    total = RunningAggregates(top_k=10)
+    for name in [name for name, _ in sources] if sources else [None]:
+        aggregates = RunningAggregates(top_k=10)
+        for df in history.iter_frames(start, end, host=None if name is None else [name]):
+            aggregates.update(df)
+        if name is None:
+            total = aggregates
+        else:
+            total.merge(aggregates, host=name)
+
+    logger.info(f"이력 DB 집계 완료: {total.rows} 개의 레코드 ({start} ~ {end})")
+    return total.results()
+
+# 분석 결과 계산 (메모리 매핑으로 바이트/시간 구간만 골라 읽음)
+def compute_results_range(paths, start=None, end=None, start_offset=0, end_offset=None, streaming=False):
+    aggregates = RunningAggregates(top_k=10) if streaming else None
+    frames = []
+    for path in paths:
+        if is_compressed(path):
+            logger.warning(f"압축 파일은 구간 읽기를 지원하지 않아 건너뜁니다: {path}")
+            continue
+        with MappedLog(path) as log:
+            for df in log.iter_frames(start_offset, end_offset, start, end):
+                if aggregates is not None:
+                    aggregates.update(df)
+                else:
+                    frames.append(df)
+
+    if aggregates is not None:
+        logger.info(f"구간 스트리밍 집계 완료: {aggregates.rows} 개의 레코드")
+        return aggregates.results()
+    if not frames:
+        return None
+    df = pd.concat(frames, ignore_index=True)
+    logger.info(f"구간 읽기 완료: {len(df)} 개의 레코드")
+    return compute_results(df)
+
+# 분석 결과 출력
+def print_results(results):
+    # 2. 트래픽 분포 분석 (시간별)
+    try:
+        with metrics.timer('analysis.section.traffic'):
             print('\n[트래픽 분포]')
             print('시간별 요청 건수:')
-            print(hourly)
+            print(results['hourly'])
             print('일별 요청 건수:')
-            print(daily)
+            print(results['daily'])
             logger.info("트래픽 분포 분석 완료")
-        except Exception as e:
-            logger.error(f"트래픽 분포 분석 오류: {str(e)}\n{traceback.format_exc()}")
-
-        # 3. 엔드포인트별 사용 현황
-        try:
-            endpoint_stats = df.groupby('endpoint').agg(
-                count=('endpoint', 'count'),
-                avg_resp=('resp_ms', 'mean'),
-                p90_resp=('resp_ms', lambda x: x.quantile(0.9))
-            ).sort_values('count', ascending=False)
+    except Exception as e:
+        logger.error(f"트래픽 분포 분석 오류: {str(e)}\n{traceback.format_exc()}")
 
+    # 3. 엔드포인트별 사용 현황
+    try:
+        with metrics.timer('analysis.section.endpoints'):
             print('\n[엔드포인트별 사용 현황]')
-            print(endpoint_stats)
+            # 분위수 열이 잘리지 않도록 출력 폭을 넓힘
+            with pd.option_context('display.width', 200, 'display.max_columns', None):
+                print(results['endpoint_stats'])
             logger.info("엔드포인트별 사용 현황 분석 완료")
-        except Exception as e:
-            logger.error(f"엔드포인트별 사용 현황 분석 오류: {str(e)}\n{traceback.format_exc()}")
-
-        # 4. 상태 코드 분포
-        try:
-            status_cat = df['status'].apply(lambda x: f'{x//100}xx')
-            df['status_cat'] = status_cat
-            status_dist = status_cat.value_counts()
+    except Exception as e:
+        logger.error(f"엔드포인트별 사용 현황 분석 오류: {str(e)}\n{traceback.format_exc()}")
 
+    # 4. 상태 코드 분포
+    try:
+        with metrics.timer('analysis.section.status'):
             print('\n[상태 코드 분포]')
-            print(status_dist)
+            print(results['status_dist'])
             logger.info("상태 코드 분포 분석 완료")
-        except Exception as e:
-            logger.error(f"상태 코드 분포 분석 오류: {str(e)}\n{traceback.format_exc()}")
+    except Exception as e:
+        logger.error(f"상태 코드 분포 분석 오류: {str(e)}\n{traceback.format_exc()}")
 
-        # 4xx, 5xx 집중 구간/엔드포인트
-        try:
-            for err_cat in ['4xx', '5xx']:
-                err_df = df[df['status_cat'] == err_cat]
-                if not err_df.empty:
-                    print(f'\n[{err_cat} 에러 집중 구간/엔드포인트]')
-                    print('시간대별:')
-                    print(err_df.groupby('hour').size())
-                    print('엔드포인트별:')
-                    print(err_df['endpoint'].value_counts())
+    # 4xx, 5xx 집중 구간/엔드포인트
+    try:
+        with metrics.timer('analysis.section.errors'):
+            for err_cat, err in results['errors'].items():
+                print(f'\n[{err_cat} 에러 집중 구간/엔드포인트]')
+                print('시간대별:')
+                print(err['hourly'])
+                print('엔드포인트별:')
+                print(err['endpoint'])
             logger.info("에러 집중 구간 분석 완료")
-        except Exception as e:
-            logger.error(f"에러 집중 구간 분석 오류: {str(e)}\n{traceback.format_exc()}")
+    except Exception as e:
+        logger.error(f"에러 집중 구간 분석 오류: {str(e)}\n{traceback.format_exc()}")
 
-        # 5. 성능 병목 분석
-        try:
-            slow_requests = df.sort_values('resp_ms', ascending=False).head(10)
+    # 5. 성능 병목 분석
+    try:
+        with metrics.timer('analysis.section.bottleneck'):
+            endpoint_stats = results['endpoint_stats']
             print('\n[응답시간 상위 10개 요청]')
-            print(slow_requests[['datetime','method','endpoint','status','resp_ms']])
+            print(results['slow_requests'][['datetime','method','endpoint','status','resp_ms']])
 
             slowest_ep = endpoint_stats['avg_resp'].idxmax()
             print(f'\n[가장 느린 엔드포인트] {slowest_ep}')
             print(endpoint_stats.loc[slowest_ep])
             logger.info("성능 병목 분석 완료")
-        except Exception as e:
-            logger.error(f"성능 병목 분석 오류: {str(e)}\n{traceback.format_exc()}")
+    except Exception as e:
+        logger.error(f"성능 병목 분석 오류: {str(e)}\n{traceback.format_exc()}")
 
-        # 6. 추가 인사이트 예시: 특정 시간대 응답시간 급증
-        try:
-            hourly_resp = df.groupby('hour')['resp_ms'].mean()
+    # 6. 추가 인사이트 예시: 특정 시간대 응답시간 급증
+    try:
+        with metrics.timer('analysis.section.insight'):
+            hourly_resp = results['hourly_resp']
             peak_hour = hourly_resp.idxmax()
             print(f'\n[추가 인사이트] 평균 응답시간이 가장 높은 시간대: {peak_hour}시, 평균 {hourly_resp[peak_hour]:.1f}ms')
+            anomalies = results.get('anomalies', [])
+            print(f'[이상 징후] 엔드포인트별 기준선 대비 급증 {len(anomalies)}건')
+            for event in anomalies[:REPORT_ANOMALY_LIMIT]:
+                print(f'  {format_anomaly(event)}')
             logger.info("추가 인사이트 분석 완료")
-        except Exception as e:
-            logger.error(f"추가 인사이트 분석 오류: {str(e)}\n{traceback.format_exc()}")
-
-        # 7. 결과 요약 리포트 저장
-        def save_report():
-            try:
-                # 1. 느린 엔드포인트
-                slow_ep = slowest_ep
-                slow_ep_stats = endpoint_stats.loc[slow_ep]
-                slow_ep_avg = slow_ep_stats['avg_resp']
-                slow_ep_p90 = slow_ep_stats['p90_resp']
-                slow_ep_count = slow_ep_stats['count']
-
-                # 2. 에러 집중 엔드포인트
-                top_4xx_ep = df[df['status_cat'] == '4xx']['endpoint'].value_counts().head(3)
-                top_5xx_ep = df[df['status_cat'] == '5xx']['endpoint'].value_counts().head(3)
-
-                # 3. 트래픽 피크 시간대
-                peak_hour = hourly_resp.idxmax()
-                peak_hour_avg = hourly_resp.max()
-
-                # 4. 에러율
-                total = len(df)
-                err_4xx = status_dist.get(4, 0) if isinstance(status_dist, dict) else status_dist.get('4xx', 0) if '4xx' in status_dist else status_dist.get(400, 0)
-                err_5xx = status_dist.get(5, 0) if isinstance(status_dist, dict) else status_dist.get('5xx', 0) if '5xx' in status_dist else status_dist.get(500, 0)
-                err_4xx_rate = (err_4xx / total * 100) if total else 0
-                err_5xx_rate = (err_5xx / total * 100) if total else 0
-
-                # 5. 인사이트 요약
-                improvement_insight = (
-                    f"- 가장 느린 엔드포인트: {slow_ep} (평균 {slow_ep_avg:.1f}ms, p90 {slow_ep_p90:.1f}ms, {slow_ep_count}건)\n"
-                    f"  → DB 인덱스 추가, 캐싱, 쿼리 최적화, 비동기화 등을 고려하세요.\n"
-                    f"- 4xx 에러 집중 엔드포인트: " + ', '.join([f"{ep}({cnt}건)" for ep, cnt in top_4xx_ep.items()]) + "\n"
-                    f"  → 입력값 검증, 인증/권한 체크, API 사용법 안내 강화 필요\n"
-                    f"- 5xx 에러 집중 엔드포인트: " + ', '.join([f"{ep}({cnt}건)" for ep, cnt in top_5xx_ep.items()]) + "\n"
-                    f"  → 서버 예외처리, DB 연결/쿼리 오류, 외부 API 오류 등 점검 필요\n"
-                    f"- 트래픽 피크 시간대: {peak_hour}시 (평균 응답 {peak_hour_avg:.1f}ms)\n"
-                    f"- 4xx 에러율: {err_4xx_rate:.2f}% / 5xx 에러율: {err_5xx_rate:.2f}%\n"
-                )
-
-                with open('analysis_report.txt', 'w', encoding='utf-8') as f:
-                    f.write('[개선 제안 및 인사이트]\n')
-                    f.write('---\n')
-                    f.write(f'{improvement_insight}\n')
-                    f.write('\n')
-                    # [LLM 활용 자연어 요약/이상탐지 프롬프트 샘플] 섹션만 기록
-                    f.write('[LLM 활용 자연어 요약/이상탐지 프롬프트 샘플]\n')
-                    f.write('---\n')
-                    f.write('1. 리포트 자연어 요약 프롬프트:\n')
-                    f.write('다음은 서버 로그 분석 결과 요약입니다.\n')
-                    f.write('---\n')
-                    f.write(f'{improvement_insight}\n')
-                    f.write('---\n')
-                    f.write('위 데이터를 바탕으로, 주요 문제점, 이상 징후, 개선 제안, 트래픽 특징을 관리자에게 보고하는 자연어 리포트를 작성해줘.\n')
-                    f.write('\n')
-                    f.write('2. 이상 패턴 탐지 프롬프트:\n')
-                    f.write('아래는 최근 서버 로그 일부입니다.\n')
-                    f.write('---\n')
-                    f.write('로그 일부 샘플...\n')
-                    f.write('---\n')
-                    f.write('이 로그에서 평소와 다른 점, 이상 징후, 에러 집중 구간, 응답시간 급증 등 특이사항을 찾아서 요약해줘.\n')
-                    f.write('\n')
-                    f.write('3. 대시보드 자연어 설명 프롬프트:\n')
-                    f.write('아래는 대시보드 주요 통계입니다.\n')
-                    f.write('---\n')
-                    f.write(f'{improvement_insight}\n')
-                    f.write('---\n')
-                    f.write('이 데이터를 바탕으로, 트래픽/에러/응답시간의 특징을 한눈에 알 수 있게 자연어로 설명해줘.\n')
-            except Exception as e:
-                logging.exception('리포트 저장 중 오류 발생: %s', e)
+    except Exception as e:
+        logger.error(f"추가 인사이트 분석 오류: {str(e)}\n{traceback.format_exc()}")
+
+# 7. 결과 요약 리포트 저장
+def save_report(results):
+    try:
+        endpoint_stats = results['endpoint_stats']
+        status_dist = results['status_dist']
+        hourly_resp = results['hourly_resp']
+
+        # 1. 느린 엔드포인트
+        slow_ep = endpoint_stats['avg_resp'].idxmax()
+        slow_ep_stats = endpoint_stats.loc[slow_ep]
+        slow_ep_avg = slow_ep_stats['avg_resp']
+        slow_ep_p90 = slow_ep_stats['p90_resp']
+        slow_ep_p99 = slow_ep_stats['p99_resp']
+        slow_ep_count = slow_ep_stats['count']
+
+        # 2. 에러 집중 엔드포인트
+        empty = pd.Series(dtype='int64')
+        top_4xx_ep = results['errors'].get('4xx', {}).get('endpoint', empty).head(3)
+        top_5xx_ep = results['errors'].get('5xx', {}).get('endpoint', empty).head(3)
+
+        # 3. 트래픽 피크 시간대
+        peak_hour = hourly_resp.idxmax()
+        peak_hour_avg = hourly_resp.max()
+
+        # 4. 에러율
+        total = results['total']
+        err_4xx = status_dist.get(4, 0) if isinstance(status_dist, dict) else status_dist.get('4xx', 0) if '4xx' in status_dist else status_dist.get(400, 0)
+        err_5xx = status_dist.get(5, 0) if isinstance(status_dist, dict) else status_dist.get('5xx', 0) if '5xx' in status_dist else status_dist.get(500, 0)
+        err_4xx_rate = (err_4xx / total * 100) if total else 0
+        err_5xx_rate = (err_5xx / total * 100) if total else 0
+
+        # 5. 이상 징후 (엔드포인트별 응답시간/에러 비율 급증, 최근 구간부터)
+        anomalies = results.get('anomalies', [])
+        anomaly_lines = ''.join(f"  · {format_anomaly(event)}\n" for event in anomalies[:REPORT_ANOMALY_LIMIT])
+
+        # 6. 인사이트 요약
+        improvement_insight = (
+            f"- 가장 느린 엔드포인트: {slow_ep} (평균 {slow_ep_avg:.1f}ms, p90 {slow_ep_p90:.1f}ms, p99 {slow_ep_p99:.1f}ms, {slow_ep_count}건)\n"
+            f"  → DB 인덱스 추가, 캐싱, 쿼리 최적화, 비동기화 등을 고려하세요.\n"
+            f"- 4xx 에러 집중 엔드포인트: " + ', '.join([f"{ep}({cnt}건)" for ep, cnt in top_4xx_ep.items()]) + "\n"
+            f"  → 입력값 검증, 인증/권한 체크, API 사용법 안내 강화 필요\n"
+            f"- 5xx 에러 집중 엔드포인트: " + ', '.join([f"{ep}({cnt}건)" for ep, cnt in top_5xx_ep.items()]) + "\n"
+            f"  → 서버 예외처리, DB 연결/쿼리 오류, 외부 API 오류 등 점검 필요\n"
+            f"- 트래픽 피크 시간대: {peak_hour}시 (평균 응답 {peak_hour_avg:.1f}ms)\n"
+            f"- 4xx 에러율: {err_4xx_rate:.2f}% / 5xx 에러율: {err_5xx_rate:.2f}%\n"
+            f"- 이상 징후: " + (f"{len(anomalies)}건\n" + anomaly_lines if anomalies else "없음\n")
+        )
+
+        with open('analysis_report.txt', 'w', encoding='utf-8') as f:
+            f.write('[개선 제안 및 인사이트]\n')
+            f.write('---\n')
+            f.write(f'{improvement_insight}\n')
+            f.write('\n')
+            # [LLM 활용 자연어 요약/이상탐지 프롬프트 샘플] 섹션만 기록
+            f.write('[LLM 활용 자연어 요약/이상탐지 프롬프트 샘플]\n')
+            f.write('---\n')
+            f.write('1. 리포트 자연어 요약 프롬프트:\n')
+            f.write('다음은 서버 로그 분석 결과 요약입니다.\n')
+            f.write('---\n')
+            f.write(f'{improvement_insight}\n')
+            f.write('---\n')
+            f.write('위 데이터를 바탕으로, 주요 문제점, 이상 징후, 개선 제안, 트래픽 특징을 관리자에게 보고하는 자연어 리포트를 작성해줘.\n')
+            f.write('\n')
+            f.write('2. 이상 패턴 탐지 프롬프트:\n')
+            f.write('아래는 최근 서버 로그 일부입니다.\n')
+            f.write('---\n')
+            f.write('로그 일부 샘플...\n')
+            f.write('---\n')
+            f.write('이 로그에서 평소와 다른 점, 이상 징후, 에러 집중 구간, 응답시간 급증 등 특이사항을 찾아서 요약해줘.\n')
+            f.write('\n')
+            f.write('3. 대시보드 자연어 설명 프롬프트:\n')
+            f.write('아래는 대시보드 주요 통계입니다.\n')
+            f.write('---\n')
+            f.write(f'{improvement_insight}\n')
+            f.write('---\n')
+            f.write('이 데이터를 바탕으로, 트래픽/에러/응답시간의 특징을 한눈에 알 수 있게 자연어로 설명해줘.\n')
+    except Exception as e:
+        logging.exception('리포트 저장 중 오류 발생: %s', e)
+
+class IncrementalAnalyzer:
+    """프로세스 안에서 계속 살아 있으며 새로 추가된 줄만 반영하는 분석기
+
+    매 tick마다 LogTailer로 새 줄만 읽어 RunningAggregates에 누적하고,
+    데이터가 바뀐 경우에만 리포트를 다시 씁니다. 로테이션/truncate가 감지되면
+    집계를 처음부터 다시 만듭니다. 각 tick의 소요 시간은 last_tick_seconds와
+    tick_history에 남습니다.
+    """
+
+    def __init__(self, log_file=LOG_FILE, cache=None, history_size=100):
+        self.log_file = log_file
+        self.cache = cache
+        self.tailer = LogTailer(log_file)
+        self.aggregates = RunningAggregates(top_k=10)
+        self.ticks = 0
+        self.last_tick_seconds = 0.0
+        self.last_added = 0
+        self.tick_history = deque(maxlen=history_size)
+        self._warm_started = False
+
+    def _warm_start(self):
+        """디스크 캐시가 있으면 집계 초기값으로 사용합니다."""
+        self._warm_started = True
+        if self.cache is None:
+            return 0
+        df, meta = self.cache.load()
+        if df is None:
+            return 0
+        self.aggregates.update(df)
+        self.tailer.offset = meta['offset']
+        self.tailer.inode = meta['inode']
+        self.tailer.head = bytes.fromhex(meta['head'])
+        logger.info(f"캐시에서 {len(df)} 개의 레코드로 집계를 시작합니다")
+        return len(df)
+
+    def tick(self):
+        """새로 추가된 줄을 반영합니다. 리포트를 다시 썼으면 True를 반환합니다."""
+        started = time.perf_counter()
+        added = 0
+        if not self._warm_started:
+            added += self._warm_start()
+
+        reset = self.tailer.poll()
+        if reset:
+            self.aggregates = RunningAggregates(top_k=10)
+        for block in self.tailer.iter_blocks():
+            df = parse_log_block(block)
+            self.aggregates.update(df)
+            added += len(df)
+
+        changed = (added > 0 or reset) and self.aggregates.rows > 0
+        if changed:
+            save_report(self.aggregates.results())
+
+        self.ticks += 1
+        self.last_added = added
+        self.last_tick_seconds = time.perf_counter() - started
+        self.tick_history.append((datetime.now(), self.last_tick_seconds, added))
+        return changed
+
+def main(streaming=None, chunk_size=STREAM_CHUNK_SIZE, log_files=None, workers=None,
+         start=None, end=None, start_offset=0, end_offset=None, metrics_file=None, sources=None, threads=None,
+         history=None):
+    """로그 분석을 실행합니다.
+
+    streaming이 True이면 파일을 chunk_size 바이트씩 읽어 누적 집계하므로
+    파일 크기와 관계없이 메모리 사용량이 일정합니다. None이면 파일 크기가
+    STREAMING_THRESHOLD 이상일 때 자동으로 스트리밍 모드를 사용합니다.
+    두 모드의 출력과 리포트는 같으며, 분위수(p50~p99.9) 응답시간은 두 모드 모두
+    스케치 기반 근사값(실제 값 대비 상대 오차 ±1% 이내)입니다.
+
+    log_files(경로/glob 패턴 목록, .gz/.bz2/.xz/.zst 포함)를 주거나 workers를 지정하면 파일을
+    줄 경계에 맞춘 구간으로 나눠 workers개의 프로세스에서 병렬로 파싱합니다.
+    압축 파일은 디스크에 풀지 않고 블록 단위로 풀면서 바로 파싱하며, threads를 주면
+    프로세스 대신 스레드 threads개로 여러 압축 파일을 동시에 풉니다.
+
+    start/end(log_query.parse_time 결과)나 start_offset/end_offset(바이트)을 주면
+    파일을 메모리 매핑하고 희소 인덱스로 해당 구간만 찾아 읽습니다.
+
+    metrics_file을 주면 단계별 소요 시간/처리 행 수/RSS를 Prometheus 텍스트
+    형식으로 저장합니다.
+
+    sources(log_partitions.parse_source_specs 형식, 생략하면 SERVER_LOG_SOURCES
+    환경 변수)를 주면 소스(호스트)마다 따로 누적 집계한 뒤 합칩니다.
+
+    history(이력 DB 경로)를 주면 파일에서 새로 추가된 부분만 DB에 넣고 보관 정책을
+    적용한 뒤, start/end 구간의 결과를 DB의 원본 행에서 계산합니다. 지난 기간을 다시
+    분석할 때 파일을 다시 파싱하지 않습니다 (원본 행 보관 기간 안의 데이터만 포함).
+    """
+    try:
+        logger.info("로그 분석 시작")
+        if sources is None and not log_files:
+            sources = parse_source_specs(os.environ.get('SERVER_LOG_SOURCES', ''))
+        if sources:
+            paths = [path for _, patterns in sources for path in expand_source(patterns)]
+        else:
+            paths = expand_log_paths(log_files) if log_files else [LOG_FILE]
+        parallel = bool(log_files) or workers is not None or threads is not None or any(is_compressed(path) for path in paths)
+        if streaming is None:
+            total_size = sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+            streaming = total_size >= STREAMING_THRESHOLD
+
+        print('로그 데이터 로드 중...')
+        # 로드/파싱과 집계를 합친 시간 (세부 단계는 ingest.*에 따로 기록됨)
+        with metrics.timer('analysis.compute') as timer:
+            if history and not start_offset and end_offset is None:
+                logger.info(f"이력 DB 모드로 분석합니다 ({history}, 시각 {start} ~ {end})")
+                results = compute_results_history(LogHistory(history), sources, paths, start, end)
+            elif start is not None or end is not None or start_offset or end_offset is not None:
+                logger.info(f"구간 읽기 모드로 분석합니다 (시각 {start} ~ {end}, 바이트 {start_offset} ~ {end_offset})")
+                results = compute_results_range(paths, start, end, start_offset, end_offset, streaming)
+            elif sources:
+                logger.info(f"소스별 모드로 분석합니다 (소스 {len(sources)}개, 파일 {len(paths)}개)")
+                results = compute_results_partitioned(sources, chunk_size, workers, threads)
+            elif parallel and streaming:
+                logger.info(f"병렬 스트리밍 모드로 분석합니다 (파일 {len(paths)}개, 청크 {chunk_size} 바이트)")
+                results = compute_results_parallel_streaming(paths, chunk_size, workers, threads)
+            elif parallel:
+                logger.info(f"병렬 모드로 분석합니다 (파일 {len(paths)}개)")
+                df = load_logs_parallel(paths, workers, threads=threads)
+                results = None if df.empty else compute_results(df)
+            elif streaming:
+                logger.info(f"스트리밍 모드로 분석합니다 (청크 {chunk_size} 바이트)")
+                results = compute_results_streaming(LOG_FILE, chunk_size)
+            else:
+                df = load_log_to_df(LOG_FILE)
+                results = None if df.empty else compute_results(df)
+            timer.rows = results['total'] if results else 0
+
+        if not results or not results['total']:
+            logger.warning("분석할 로그 데이터가 없습니다")
+            print("분석할 로그 데이터가 없습니다")
+            return
         
-        save_report()
+        print(f'총 요청 수: {results["total"]}')
+        logger.info(f"총 요청 수: {results['total']}")
+
+        with metrics.timer('analysis.print'):
+            print_results(results)
+        with metrics.timer('analysis.report'):
+            save_report(results)
 
         print('\n분석 완료!')
         logger.info("로그 분석 완료")
+        for stage, summary in metrics.stage_summary().items():
+            logger.info(f"단계별 소요 시간: {stage} {summary['total_seconds']:.3f}초, {summary['count']}회, 처리 행 {summary['rows']}")
+        if metrics_file:
+            metrics.write(metrics_file)
+            logger.info(f"성능 지표 저장 완료: {metrics_file}")
         
     except Exception as e:
         err_msg = f"[분석 오류] {e}\n" + traceback.format_exc()
@@ -252,4 +552,46 @@ def main():
             logger.error(f"오류 로그 파일 작성 실패: {str(log_err)}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='서버 로그 분석')
+    parser.add_argument('--stream', dest='streaming', action='store_true', default=None,
+                        help='파일을 청크 단위로 읽어 누적 집계 (대용량 파일용)')
+    parser.add_argument('--no-stream', dest='streaming', action='store_false',
+                        help='파일 전체를 메모리에 올려 분석')
+    parser.add_argument('--chunk-mb', type=int, default=STREAM_CHUNK_SIZE // (1024 * 1024),
+                        help='스트리밍 모드의 청크 크기(MB)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='병렬 파싱에 사용할 프로세스 수 (기본: CPU 코어 수)')
+    parser.add_argument('--threads', type=int, default=None,
+                        help='프로세스 대신 이 수의 스레드로 여러 압축 파일을 동시에 풀면서 파싱')
+    parser.add_argument('log_files', nargs='*',
+                        help='분석할 로그 파일/glob 패턴 (예: "logs/server.log*", .gz/.bz2/.xz/.zst 포함). 생략하면 server_sample.log')
+    parser.add_argument('--from', dest='start', type=parse_time, default=None,
+                        help='이 시각 이후만 분석 (ISO 8601, epoch 초, 파일 마지막 시각 기준 상대 시간 -15m)')
+    parser.add_argument('--to', dest='end', type=parse_time, default=None,
+                        help='이 시각 이전만 분석 (포함하지 않음, 형식은 --from과 같음)')
+    parser.add_argument('--start-offset', type=int, default=0,
+                        help='이 바이트 offset 이후에 시작하는 줄부터 분석')
+    parser.add_argument('--end-offset', type=int, default=None,
+                        help='이 바이트 offset 이전에 시작하는 줄까지 분석')
+    parser.add_argument('--source', dest='sources', action='append', default=None,
+                        help='호스트별로 따로 집계할 소스 (이름=패턴, 여러 번 지정 가능. 예: "web1=/var/log/web1/access.log*")')
+    parser.add_argument('--history', default=None,
+                        help='이력 DB(SQLite) 경로. 새로 추가된 로그만 넣고 --from/--to 구간을 DB에서 분석')
+    parser.add_argument('--metrics-file', default=None,
+                        help='단계별 소요 시간/처리 행 수/RSS를 Prometheus 텍스트 형식으로 저장할 경로')
+    parser.add_argument('--profile', dest='profile_file', default=None,
+                        help='cProfile로 실행하고 함수별 누적 시간 상위 목록을 저장할 경로')
+    args = parser.parse_args()
+    run = lambda: main(streaming=args.streaming, chunk_size=args.chunk_mb * 1024 * 1024,
+                       log_files=args.log_files, workers=args.workers,
+                       start=args.start, end=args.end, start_offset=args.start_offset, end_offset=args.end_offset,
+                       metrics_file=args.metrics_file,
+                       sources=parse_source_specs(args.sources) if args.sources else None,
+                       threads=args.threads, history=args.history)
+    if args.profile_file:
+        _, profile_text = profile_call(run)
+        with open(args.profile_file, 'w', encoding='utf-8') as f:
+            f.write(profile_text)
+        print(f'프로파일 저장 완료: {args.profile_file}')
+    else:
+        run()
@@ -0,0 +1,257 @@
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+
+# 엔드포인트별 지표를 모으는 구간 크기 (초)
+ANOMALY_WINDOW_SECONDS = 60
+
+# 기준선 EWMA 가중치 (0.1이면 대략 최근 10개 구간의 평균)
+EWMA_ALPHA = 0.1
+
+# 이 점수(기준선 대비 표준편차 배수) 이상이면 이상 징후로 봄
+SCORE_THRESHOLD = 3.0
+
+# 기준선이 이 구간 수 이상 쌓인 뒤부터 점수를 매김
+WARMUP_WINDOWS = 5
+
+# 구간 안의 요청이 이보다 적으면 점수를 매기지 않음 (비율이 0/1로 튀는 것 방지)
+MIN_WINDOW_COUNT = 5
+
+# 보관하는 이상 징후 최대 개수 (구간이 오래된 것부터 버림)
+MAX_EVENTS = 100
+
+METRICS = ['latency', '4xx_rate', '5xx_rate']
+
+METRIC_LABELS = {'latency': '평균 응답시간', '4xx_rate': '4xx 비율', '5xx_rate': '5xx 비율'}
+
+# 표준편차 하한. 분산이 거의 0인 지표에서 작은 변화가 큰 점수가 되지 않도록
+# 지표별 절대 하한과 기준선 평균 대비 상대 하한 중 큰 값을 씀
+MIN_STD = {'latency': 5.0, '4xx_rate': 0.05, '5xx_rate': 0.05}
+RELATIVE_MIN_STD = 0.1
+
+
+class Ewma:
+    """지수가중 이동평균/분산(EWMA/EWMV) 기준선"""
+
+    def __init__(self, alpha=EWMA_ALPHA):
+        self.alpha = alpha
+        self.mean = 0.0
+        self.var = 0.0
+        self.n = 0
+
+    def std(self, floor=0.0):
+        return max(math.sqrt(self.var), RELATIVE_MIN_STD * abs(self.mean), floor)
+
+    def score(self, value, floor=0.0):
+        """value가 기준선보다 표준편차 몇 배만큼 높은지 반환합니다."""
+        return (value - self.mean) / self.std(floor)
+
+    def update(self, value):
+        if self.n == 0:
+            self.mean = float(value)
+        else:
+            diff = value - self.mean
+            increment = self.alpha * diff
+            self.mean += increment
+            self.var = (1 - self.alpha) * (self.var + diff * increment)
+        self.n += 1
+
+
+class _EndpointWindow:
+    """엔드포인트 하나의 현재 구간 누적값과 지표별 기준선"""
+
+    def __init__(self, alpha):
+        self.start = None
+        self.count = 0
+        self.resp_sum = 0
+        self.err_4xx = 0
+        self.err_5xx = 0
+        self.baselines = {metric: Ewma(alpha) for metric in METRICS}
+
+    def add(self, count, resp_sum, err_4xx, err_5xx):
+        self.count += count
+        self.resp_sum += resp_sum
+        self.err_4xx += err_4xx
+        self.err_5xx += err_5xx
+
+    def values(self):
+        return {
+            'latency': self.resp_sum / self.count,
+            '4xx_rate': self.err_4xx / self.count,
+            '5xx_rate': self.err_5xx / self.count,
+        }
+
+
+class AnomalyDetector:
+    """엔드포인트별 응답시간/4xx/5xx 비율의 급증을 수집 시점에 찾는 LogStore consumer
+
+    요청은 엔드포인트별 window_seconds 구간에 건수/합계만 더하고(요청당 O(1)),
+    구간이 끝나면 구간 값으로 지표별 EWMA/EWMV 기준선을 갱신합니다. 구간 값이
+    갱신 전 기준선보다 threshold 표준편차 이상 높으면 이상 징후로 기록합니다.
+    아직 끝나지 않은 구간도 요청이 들어올 때마다 점수를 매겨 진행 중(ongoing)
+    이상 징후로 보여 주므로, 급증은 구간이 끝나기를 기다리지 않고 바로 보입니다.
+    진행 중이던 이상 징후는 구간이 끝날 때 최종 값으로 바뀌거나 사라집니다.
+
+    같은 엔드포인트에서 이미 지난 구간의 요청이 늦게 들어오면(시간순이 아닌 로그)
+    기준선에 반영하지 않고 late로 셉니다. 청크를 어떻게 나눠 넣어도 결과는 같습니다.
+    """
+
+    def __init__(self, window_seconds=ANOMALY_WINDOW_SECONDS, alpha=EWMA_ALPHA, threshold=SCORE_THRESHOLD,
+                 warmup=WARMUP_WINDOWS, min_count=MIN_WINDOW_COUNT, max_events=MAX_EVENTS):
+        self.window_seconds = window_seconds
+        self.alpha = alpha
+        self.threshold = threshold
+        self.warmup = warmup
+        self.min_count = min_count
+        self.max_events = max_events
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.rows = 0
+            self.late = 0
+            self.latest = None
+            self._endpoints = {}
+            self._events = {}
+
+    def update(self, df):
+        """새로 들어온 행들을 엔드포인트별 구간에 반영하고 이상 징후를 갱신합니다."""
+        if df.empty:
+            return
+        seconds = df['datetime'].dt.as_unit('s').array.asi8
+        status_class = df['status'].to_numpy() // 100
+        frame = pd.DataFrame({
+            'endpoint': df['endpoint'].to_numpy(dtype=object),
+            'window': seconds - seconds % self.window_seconds,
+            'resp_ms': df['resp_ms'].to_numpy(dtype=np.int64),
+            'err_4xx': (status_class == 4).astype(np.int64),
+            'err_5xx': (status_class == 5).astype(np.int64),
+        })
+
+        with self._lock:
+            self.rows += len(frame)
+            latest = int(seconds.max())
+            self.latest = latest if self.latest is None else max(self.latest, latest)
+
+            # 같은 엔드포인트에서 앞서 들어온 요청보다 이전 구간이면 늦게 도착한 요청
+            current = frame['endpoint'].map(
+                {endpoint: state.start for endpoint, state in self._endpoints.items()}
+            ).fillna(np.iinfo(np.int64).min).to_numpy(dtype=np.int64)
+            seen = np.maximum(frame.groupby('endpoint', sort=False)['window'].cummax().to_numpy(), current)
+            late = frame['window'].to_numpy() < seen
+            self.late += int(late.sum())
+
+            windows = frame[~late].groupby(['endpoint', 'window']).agg(
+                count=('resp_ms', 'size'),
+                resp_sum=('resp_ms', 'sum'),
+                err_4xx=('err_4xx', 'sum'),
+                err_5xx=('err_5xx', 'sum'),
+            )
+            touched = []
+            for (endpoint, window), count, resp_sum, err_4xx, err_5xx in windows.itertuples(name=None):
+                state = self._endpoints.get(endpoint)
+                if state is None:
+                    state = self._endpoints[endpoint] = _EndpointWindow(self.alpha)
+                if state.start is not None and window > state.start:
+                    self._close_window(endpoint, state)
+                if state.start is None or window > state.start:
+                    state.start = int(window)
+                state.add(int(count), int(resp_sum), int(err_4xx), int(err_5xx))
+                if not touched or touched[-1] != endpoint:
+                    touched.append(endpoint)
+
+            for endpoint in touched:
+                self._score_window(endpoint, self._endpoints[endpoint], ongoing=True)
+
+    def merge(self, other, host=None):
+        """다른 파티션(호스트)에서 찾은 이상 징후를 합칩니다.
+
+        기준선은 파티션마다 따로 학습한 것이므로 합치지 않고, 이상 징후 목록만
+        모읍니다. 조회할 때 새 AnomalyDetector에 합쳐 쓰는 용도입니다. host를 주면
+        이상 징후마다 host를 붙이며, 같은 엔드포인트/구간이라도 호스트별로 따로 남습니다.
+        """
+        with other._lock, self._lock:
+            self.rows += other.rows
+            self.late += other.late
+            if other.latest is not None:
+                self.latest = other.latest if self.latest is None else max(self.latest, other.latest)
+            for key, event in other._events.items():
+                if host is not None:
+                    key = (host,) + key
+                    event = dict(event, host=host)
+                self._events[key] = event
+        return self
+
+    def _close_window(self, endpoint, state):
+        """끝난 구간의 최종 점수를 매기고 그 값으로 기준선을 갱신합니다."""
+        values = self._score_window(endpoint, state, ongoing=False)
+        for metric, value in values.items():
+            state.baselines[metric].update(value)
+        state.start = None
+        state.count = state.resp_sum = state.err_4xx = state.err_5xx = 0
+
+    def _score_window(self, endpoint, state, ongoing):
+        values = state.values()
+        for metric, value in values.items():
+            key = (endpoint, state.start, metric)
+            baseline = state.baselines[metric]
+            score = None
+            if baseline.n >= self.warmup and state.count >= self.min_count:
+                score = baseline.score(value, MIN_STD[metric])
+            if score is None or score < self.threshold:
+                self._events.pop(key, None)
+                continue
+            self._events[key] = {
+                'endpoint': endpoint,
+                'window_start': pd.Timestamp(state.start, unit='s', tz='UTC'),
+                'window_seconds': self.window_seconds,
+                'metric': metric,
+                'value': value,
+                'baseline': baseline.mean,
+                'score': score,
+                'count': state.count,
+                'ongoing': ongoing,
+            }
+            if len(self._events) > self.max_events:
+                # 구간이 가장 오래된(같으면 점수가 낮은) 것부터 버림
+                oldest = min(self._events, key=lambda k: (self._events[k]['window_start'], self._events[k]['score']))
+                del self._events[oldest]
+        return values
+
+    def events(self, start=None, end=None, endpoints=None, limit=None):
+        """이상 징후 목록을 구간이 늦은 순서(같으면 점수가 높은 순서)로 반환합니다.
+
+        start/end는 UTC Timestamp 또는 log_query.parse_time의 상대 시간(마지막 로그
+        시각 기준)이며 구간 시작 시각으로 거릅니다.
+        """
+        with self._lock:
+            events = list(self._events.values())
+            latest = self.latest
+        if latest is not None:
+            last = pd.Timestamp(latest, unit='s', tz='UTC')
+            start = last + start if isinstance(start, pd.Timedelta) else start
+            end = last + end if isinstance(end, pd.Timedelta) else end
+        if start is not None:
+            window = pd.Timedelta(seconds=self.window_seconds)
+            events = [event for event in events if event['window_start'] + window > start]
+        if end is not None:
+            events = [event for event in events if event['window_start'] < end]
+        if endpoints:
+            events = [event for event in events if event['endpoint'] in endpoints]
+        events.sort(key=lambda event: (event['window_start'], event['score']), reverse=True)
+        return events[:limit] if limit is not None else events
+
+
+def format_anomaly(event):
+    """이상 징후 하나를 리포트용 한 줄 문자열로 만듭니다."""
+    if event['metric'] == 'latency':
+        value = f"{event['value']:.1f}ms (기준 {event['baseline']:.1f}ms)"
+    else:
+        value = f"{event['value'] * 100:.1f}% (기준 {event['baseline'] * 100:.1f}%)"
+    ongoing = ', 진행 중' if event['ongoing'] else ''
+    host = f"[{event['host']}] " if event.get('host') else ''
+    return (f"{event['window_start']:%Y-%m-%d %H:%M} {host}{event['endpoint']} {METRIC_LABELS[event['metric']]} "
+            f"{value}, 점수 {event['score']:.1f}, {event['count']}건{ongoing}")
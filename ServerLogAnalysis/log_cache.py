@@ -0,0 +1,210 @@
+import os
+import json
+import time
+import logging
+import traceback
+
+import numpy as np
+import pandas as pd
+
+from log_tailer import HEAD_SIZE
+
+# 로깅 설정
+def setup_logging():
+    """로깅 설정을 초기화합니다."""
+    log_dir = 'logs'
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    # 파싱 캐시 로거 설정
+    logger = logging.getLogger('log_cache')
+    logger.setLevel(logging.INFO)
+
+    # 파일 핸들러 설정
+    file_handler = logging.FileHandler(f'{log_dir}/log_cache.log', encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+
+    # 포맷터 설정
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    file_handler.setFormatter(formatter)
+
+    # 핸들러 추가
+    logger.addHandler(file_handler)
+
+    return logger
+
+# 로거 초기화
+logger = setup_logging()
+
+# 캐시 디렉토리 이름 (로그 파일과 같은 디렉토리 아래에 생성)
+CACHE_DIR_NAME = '.log_cache'
+
+# 캐시 형식 버전 (형식이 바뀌면 올려서 기존 캐시를 무효화)
+CACHE_FORMAT = 1
+
+# 다른 프로세스가 비정상 종료하며 남긴 잠금 파일로 보는 기준 (초)
+STALE_LOCK_SECONDS = 60
+
+# 저장하는 숫자 열과 dtype
+NUMERIC_COLUMNS = {'datetime': '<i8', 'status': '<i8', 'resp_ms': '<i8'}
+
+# 사전(dictionary) 인코딩해서 저장하는 문자열 열
+CATEGORY_COLUMNS = ['method', 'endpoint']
+
+
+class ColumnCache:
+    """파싱된 로그 열을 디스크에 저장해 두는 컬럼 캐시
+
+    열마다 원시 바이너리 파일(<열>.bin)에 이어 붙이고, meta.json에 원본 파일의
+    inode/앞부분 바이트와 파싱이 끝난 바이트 offset, 행 수, 문자열 사전을
+    기록합니다. 재시작 시에는 열 파일을 그대로 배열로 읽고 offset 이후의
+    텍스트만 파싱하면 됩니다. meta.json이 커밋 지점이므로 쓰는 도중 중단돼도
+    meta의 행 수까지만 사용해 일관성을 유지합니다.
+    """
+
+    def __init__(self, log_file, cache_dir=None):
+        self.log_file = log_file
+        if cache_dir is None:
+            base = os.path.dirname(os.path.abspath(log_file))
+            cache_dir = os.path.join(base, CACHE_DIR_NAME, os.path.basename(log_file))
+        self.cache_dir = cache_dir
+        self.meta_path = os.path.join(cache_dir, 'meta.json')
+        self.lock_path = os.path.join(cache_dir, 'lock')
+
+    def _column_path(self, column):
+        return os.path.join(self.cache_dir, f'{column}.bin')
+
+    def _read_meta(self):
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            return meta if meta.get('format') == CACHE_FORMAT else None
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write_meta(self, meta):
+        tmp_path = self.meta_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, self.meta_path)
+
+    def _acquire(self):
+        """여러 프로세스가 동시에 쓰지 않도록 잠금 파일을 만듭니다."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        try:
+            if time.time() - os.path.getmtime(self.lock_path) > STALE_LOCK_SECONDS:
+                os.remove(self.lock_path)
+        except OSError:
+            pass
+        try:
+            os.close(os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            return False
+
+    def _release(self):
+        try:
+            os.remove(self.lock_path)
+        except OSError:
+            pass
+
+    def load(self):
+        """유효한 캐시가 있으면 (DataFrame, meta)를, 없으면 (None, None)을 반환합니다."""
+        try:
+            meta = self._read_meta()
+            if meta is None:
+                return None, None
+
+            st = os.stat(self.log_file)
+            with open(self.log_file, 'rb') as f:
+                head = f.read(HEAD_SIZE)
+            if (st.st_ino != meta['inode'] or st.st_size < meta['offset']
+                    or not head.startswith(bytes.fromhex(meta['head']))):
+                logger.info(f"원본 로그가 바뀌어 캐시를 사용하지 않습니다: {self.log_file}")
+                return None, None
+
+            rows = meta['rows']
+            columns = {}
+            for column, dtype in NUMERIC_COLUMNS.items():
+                columns[column] = np.fromfile(self._column_path(column), dtype=dtype, count=rows)
+            for column in CATEGORY_COLUMNS:
+                codes = np.fromfile(self._column_path(column), dtype='<i4', count=rows)
+                columns[column] = np.asarray(meta['categories'][column], dtype=object)[codes]
+
+            df = pd.DataFrame({
+                'datetime': pd.to_datetime(columns['datetime'], unit='us', utc=True),
+                'method': columns['method'],
+                'endpoint': columns['endpoint'],
+                'status': columns['status'],
+                'resp_ms': columns['resp_ms'],
+            })
+            logger.info(f"캐시 로드 완료: {rows} 개의 레코드, offset {meta['offset']}")
+            return df, meta
+        except FileNotFoundError:
+            return None, None
+        except Exception as e:
+            logger.error(f"캐시 로드 오류: {str(e)}\n{traceback.format_exc()}")
+            return None, None
+
+    def append(self, df, start_offset, end_offset, inode, head):
+        """start_offset~end_offset 구간을 파싱한 행을 캐시에 이어 붙입니다.
+
+        캐시가 start_offset까지의 상태가 아니면(다른 프로세스가 먼저 갱신한 경우 등)
+        아무것도 하지 않고 False를 반환합니다. start_offset이 0이면 새로 만듭니다.
+        """
+        if not self._acquire():
+            return False
+        try:
+            meta = self._read_meta()
+            if start_offset == 0:
+                # 열 파일을 새로 쓰는 동안 예전 meta가 남아 있지 않도록 먼저 지움
+                if os.path.exists(self.meta_path):
+                    os.remove(self.meta_path)
+                meta = {
+                    'format': CACHE_FORMAT,
+                    'source': os.path.abspath(self.log_file),
+                    'inode': inode,
+                    'head': head.hex(),
+                    'offset': 0,
+                    'rows': 0,
+                    'categories': {column: [] for column in CATEGORY_COLUMNS},
+                }
+            elif meta is None or meta['offset'] != start_offset or meta['inode'] != inode:
+                return False
+
+            rows = meta['rows']
+            arrays = {
+                'datetime': df['datetime'].dt.as_unit('us').array.asi8.astype('<i8') if len(df) else np.zeros(0, '<i8'),
+                'status': df['status'].to_numpy(dtype='<i8'),
+                'resp_ms': df['resp_ms'].to_numpy(dtype='<i8'),
+            }
+            for column in CATEGORY_COLUMNS:
+                categories = meta['categories'][column]
+                lookup = {value: code for code, value in enumerate(categories)}
+                values = df[column].to_numpy(dtype=object)
+                uniques = pd.unique(values)
+                for value in uniques:
+                    if value not in lookup:
+                        lookup[value] = len(categories)
+                        categories.append(value)
+                codes = pd.Series(values).map(lookup).to_numpy(dtype='<i4') if len(values) else np.zeros(0, '<i4')
+                arrays[column] = codes
+
+            for column, array in arrays.items():
+                path = self._column_path(column)
+                with open(path, 'r+b' if rows else 'wb') as f:
+                    # 이전에 커밋되지 않은 꼬리가 있으면 잘라내고 이어 씀
+                    f.truncate(rows * array.dtype.itemsize)
+                    f.seek(0, os.SEEK_END)
+                    f.write(np.ascontiguousarray(array).tobytes())
+
+            meta['rows'] = rows + len(df)
+            meta['offset'] = end_offset
+            meta['head'] = head.hex()
+            self._write_meta(meta)
+            return True
+        except Exception as e:
+            logger.error(f"캐시 저장 오류: {str(e)}\n{traceback.format_exc()}")
+            return False
+        finally:
+            self._release()
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+from perf_metrics import metrics
+
+# 열별 저장 dtype (행당 8 + 2 + 4 + 2 + 4 = 20바이트)
+#  - epoch_us: UTC 기준 마이크로초 (parse_log_block의 datetime64[us]와 같은 단위)
+#  - method/endpoint: 문자열 사전(dictionary)의 코드
+COLUMN_DTYPES = {
+    'epoch_us': np.int64,
+    'status': np.uint16,
+    'resp_ms': np.uint32,
+    'method': np.uint16,
+    'endpoint': np.uint32,
+}
+
+CATEGORY_COLUMNS = ['method', 'endpoint']
+
+# resp_ms 열에 저장할 수 있는 최대 응답 시간 (밀리초). 파서도 이 값을 넘는 줄은 건너뜀
+RESP_MS_MAX = int(np.iinfo(COLUMN_DTYPES['resp_ms']).max)
+
+# 처음 할당하는 행 수 (이후 부족할 때마다 두 배씩 늘림)
+INITIAL_CAPACITY = 1024
+
+
+class ColumnBuffer:
+    """파싱된 로그를 행당 약 20바이트로 보관하는 추가 전용 컬럼 버퍼
+
+    열마다 연속된 numpy 배열 하나를 두고, 용량이 부족하면 두 배로 늘려 복사하므로
+    append는 분할 상환 O(추가한 행 수)입니다. method/endpoint 문자열은 사전에 한 번만
+    저장하고 행에는 코드만 둡니다. to_frame()이 돌려주는 DataFrame은 버퍼 배열을
+    복사하지 않고 참조하므로 읽기 전용으로 다뤄야 합니다.
+    """
+
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.size = 0
+        self._arrays = {column: np.zeros(capacity, dtype=dtype) for column, dtype in COLUMN_DTYPES.items()}
+        self.categories = {column: [] for column in CATEGORY_COLUMNS}
+        self._lookup = {column: {} for column in CATEGORY_COLUMNS}
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def capacity(self):
+        return len(self._arrays['epoch_us'])
+
+    @property
+    def nbytes(self):
+        """현재 행들이 차지하는 바이트 수 (사전 문자열 제외)"""
+        return sum(np.dtype(dtype).itemsize for dtype in COLUMN_DTYPES.values()) * self.size
+
+    def clear(self):
+        # 기존 배열을 참조하는 DataFrame이 남아 있을 수 있으므로 덮어쓰지 않고 새로 할당
+        self._allocate(INITIAL_CAPACITY)
+
+    def _reserve(self, rows):
+        needed = self.size + rows
+        if needed <= self.capacity:
+            return
+        capacity = max(needed, self.capacity * 2)
+        for column, array in self._arrays.items():
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[:self.size] = array[:self.size]
+            self._arrays[column] = grown
+
+    def _encode(self, column, values):
+        """문자열 배열을 사전 코드 배열로 바꿉니다 (처음 보는 값은 사전에 추가)."""
+        codes, uniques = pd.factorize(values)
+        categories = self.categories[column]
+        lookup = self._lookup[column]
+        remap = np.empty(len(uniques), dtype=COLUMN_DTYPES[column])
+        for i, value in enumerate(uniques):
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(categories)
+                categories.append(value)
+            remap[i] = code
+        return remap[codes]
+
+    def append(self, df):
+        """parse_log_block 형식의 DataFrame을 버퍼 끝에 추가합니다.
+
+        resp_ms가 저장 범위(0 ~ RESP_MS_MAX)를 벗어난 행은 값을 바꿔 넣지 않고 건너뛰며
+        ingest_dropped_rows_total로 셉니다.
+        """
+        resp_ms = df['resp_ms'].to_numpy()
+        out_of_range = (resp_ms < 0) | (resp_ms > RESP_MS_MAX)
+        if out_of_range.any():
+            metrics.inc('ingest_dropped_rows_total', int(out_of_range.sum()), help_text='저장하지 못해 건너뛴 로그 줄 수',
+                        reason='resp_ms_range')
+            df = df[~out_of_range]
+        rows = len(df)
+        if rows == 0:
+            return
+        self._reserve(rows)
+        start, end = self.size, self.size + rows
+        arrays = self._arrays
+        arrays['epoch_us'][start:end] = df['datetime'].dt.as_unit('us').array.asi8
+        arrays['status'][start:end] = df['status'].to_numpy()
+        arrays['resp_ms'][start:end] = df['resp_ms'].to_numpy()
+        for column in CATEGORY_COLUMNS:
+            arrays[column][start:end] = self._encode(column, df[column].to_numpy(dtype=object))
+        self.size = end
+
+    def array(self, column):
+        """열 배열의 사용 중인 부분(복사 없는 뷰)을 반환합니다."""
+        return self._arrays[column][:self.size]
+
+    def to_frame(self, start=0, stop=None):
+        """행 [start, stop) 구간을 복사 없이 DataFrame으로 보여 줍니다.
+
+        datetime은 datetime64[us, UTC], method/endpoint는 Categorical,
+        status/resp_ms는 저장 dtype(uint16/uint32) 그대로입니다.
+        """
+        stop = self.size if stop is None else min(stop, self.size)
+        arrays = {column: array[start:stop] for column, array in self._arrays.items()}
+        data = {'datetime': pd.DatetimeIndex(arrays['epoch_us'], dtype='datetime64[us, UTC]', copy=False)}
+        for column in CATEGORY_COLUMNS:
+            categories = pd.Index(self.categories[column], dtype=object)
+            data[column] = pd.Categorical.from_codes(arrays[column].astype(np.int32, copy=False), categories=categories)
+        data['status'] = arrays['status']
+        data['resp_ms'] = arrays['resp_ms']
+        return pd.DataFrame(data, copy=False)
+
+    def to_wide_frame(self, start=0, stop=None):
+        """parse_log_block과 같은 dtype(문자열 object, int64)의 DataFrame으로 복사해 반환합니다."""
+        stop = self.size if stop is None else min(stop, self.size)
+        data = {'datetime': pd.to_datetime(self._arrays['epoch_us'][start:stop], unit='us', utc=True)}
+        for column in CATEGORY_COLUMNS:
+            data[column] = np.asarray(self.categories[column], dtype=object)[self._arrays[column][start:stop]]
+        data['status'] = self._arrays['status'][start:stop].astype(np.int64)
+        data['resp_ms'] = self._arrays['resp_ms'][start:stop].astype(np.int64)
+        return pd.DataFrame(data)
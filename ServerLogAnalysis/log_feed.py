@@ -0,0 +1,219 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+import traceback
+
+# 로깅 설정
+def setup_logging():
+    """로깅 설정을 초기화합니다."""
+    log_dir = 'logs'
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    # 실시간 피드 로거 설정
+    logger = logging.getLogger('log_feed')
+    logger.setLevel(logging.INFO)
+
+    # 파일 핸들러 설정
+    file_handler = logging.FileHandler(f'{log_dir}/log_feed.log', encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+
+    # 포맷터 설정
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    file_handler.setFormatter(formatter)
+
+    # 핸들러 추가
+    logger.addHandler(file_handler)
+
+    return logger
+
+# 로거 초기화
+logger = setup_logging()
+
+# 변경 여부를 확인하는 주기 (초). 이보다 자주 바뀌어도 스냅샷은 주기당 한 번만 만듦
+FEED_INTERVAL = 1.0
+
+# 보낼 내용이 없을 때 연결 유지용 주석을 보내는 주기 (초)
+KEEPALIVE_SECONDS = 15
+
+# 연결 하나를 유지하는 최대 시간 (초). 지나면 스트림을 끝내고 브라우저(EventSource)가 다시 연결함.
+# 끊긴 클라이언트를 알려 주지 않는 서버(ASGI 변환 등)에서도 구독과 스레드가 계속 남지 않도록
+STREAM_MAX_SECONDS = 300
+
+
+class FeedSubscription:
+    """클라이언트 하나에 보낼 변경분을 모아 두는 구독
+
+    아직 보내지 못한 변경분은 섹션 이름별로 덮어쓰며 합치므로, 느린 클라이언트도
+    밀린 메시지를 하나씩 받는 대신 최신 상태가 담긴 메시지 하나만 받습니다.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending = {}
+        self.closed = False
+        # next_async로 기다리는 이벤트 루프의 (루프, asyncio Future)
+        self._waiter = None
+
+    def push(self, sections):
+        with self._cond:
+            self._pending.update(sections)
+            self._wake()
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._wake()
+
+    def _wake(self):
+        self._cond.notify()
+        if self._waiter is not None:
+            loop, future = self._waiter
+            self._waiter = None
+            loop.call_soon_threadsafe(_resolve, future)
+
+    def next(self, timeout=KEEPALIVE_SECONDS):
+        """보낼 변경분을 기다려 반환합니다. timeout 동안 없으면 None을 반환합니다."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending or self.closed, timeout)
+            sections, self._pending = self._pending, {}
+            return sections or None
+
+    async def next_async(self, timeout=KEEPALIVE_SECONDS):
+        """next의 asyncio 버전입니다. 기다리는 동안 스레드를 쓰지 않습니다."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._cond:
+            ready = bool(self._pending or self.closed)
+            if not ready:
+                self._waiter = (loop, future)
+        if not ready:
+            try:
+                await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                pass
+        with self._cond:
+            self._waiter = None
+            sections, self._pending = self._pending, {}
+            return sections or None
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class LiveFeed:
+    """대시보드에 변경분을 밀어 주는 Server-Sent Events 피드
+
+    백그라운드 스레드 하나가 interval마다 get_version()으로 변경 여부만 확인하고,
+    바뀐 경우에만 build_snapshot()으로 스냅샷을 한 번 만들어 이전 스냅샷과
+    달라진 섹션만 모든 구독자에게 보냅니다. 접속자 수와 관계없이 스냅샷 계산은
+    변경당 한 번입니다. 구독자가 없으면 스레드는 종료됩니다.
+    """
+
+    def __init__(self, build_snapshot, get_version, interval=FEED_INTERVAL):
+        self.build_snapshot = build_snapshot
+        self.get_version = get_version
+        self.interval = interval
+        self._lock = threading.Lock()
+        # 동시에 여러 요청이 변경을 감지해도 스냅샷은 한 번만 만들도록 하는 잠금
+        self._build_lock = threading.Lock()
+        self._subscribers = set()
+        self._thread = None
+        self.version = None
+        self.snapshot = {}
+
+    def subscribe(self):
+        """새 구독을 만들고 현재 전체 스냅샷을 첫 메시지로 넣어 둡니다."""
+        self.poll()
+        subscription = FeedSubscription()
+        with self._lock:
+            subscription.push(self.snapshot)
+            self._subscribers.add(subscription)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='live-feed', daemon=True)
+                self._thread.start()
+        logger.info(f"피드 구독 시작 (구독자 {len(self._subscribers)}명)")
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscription.close()
+        with self._lock:
+            self._subscribers.discard(subscription)
+        logger.info(f"피드 구독 종료 (구독자 {len(self._subscribers)}명)")
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+            self.poll()
+
+    def poll(self, raise_errors=False):
+        """데이터가 바뀌었으면 스냅샷을 새로 만들고 변경된 섹션을 구독자들에게 보냅니다.
+
+        raise_errors면 스냅샷을 만들지 못했을 때(집계 풀이 가득 찬 경우 등) 예외를 그대로 냅니다.
+        """
+        try:
+            version = self.get_version()
+            if version == self.version:
+                return
+            with self._build_lock:
+                # 잠금을 기다리는 동안 다른 스레드가 이미 만들었을 수 있음
+                if version == self.version:
+                    return
+                snapshot = self.build_snapshot()
+                with self._lock:
+                    delta = {name: value for name, value in snapshot.items() if self.snapshot.get(name) != value}
+                    self.snapshot = snapshot
+                    self.version = version
+                    subscribers = list(self._subscribers)
+            if delta:
+                for subscription in subscribers:
+                    subscription.push(delta)
+        except Exception as e:
+            logger.error(f"피드 스냅샷 생성 오류: {str(e)}\n{traceback.format_exc()}")
+            if raise_errors:
+                raise
+
+    def current(self):
+        """변경 여부를 확인한 뒤 (버전, 전체 스냅샷)을 반환합니다. 스냅샷을 만들지 못하면 예외를 냅니다."""
+        self.poll(raise_errors=True)
+        with self._lock:
+            return self.version, self.snapshot
+
+    def stream(self, subscription):
+        """구독의 변경분을 SSE 형식 문자열로 돌려줍니다. STREAM_MAX_SECONDS가 지나면 끝냅니다."""
+        deadline = time.monotonic() + STREAM_MAX_SECONDS
+        try:
+            while not subscription.closed and time.monotonic() < deadline:
+                sections = subscription.next(min(KEEPALIVE_SECONDS, max(deadline - time.monotonic(), 0)))
+                if sections is None:
+                    yield ': keepalive\n\n'
+                    continue
+                yield f"event: update\ndata: {json.dumps(sections, ensure_ascii=False)}\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+    async def stream_async(self, subscription):
+        """stream의 asyncio 버전입니다 (ASGI 서버에서 연결마다 스레드를 쓰지 않음)."""
+        deadline = time.monotonic() + STREAM_MAX_SECONDS
+        try:
+            while not subscription.closed and time.monotonic() < deadline:
+                sections = await subscription.next_async(min(KEEPALIVE_SECONDS, max(deadline - time.monotonic(), 0)))
+                if sections is None:
+                    yield ': keepalive\n\n'
+                    continue
+                yield f"event: update\ndata: {json.dumps(sections, ensure_ascii=False)}\n\n"
+        finally:
+            self.unsubscribe(subscription)
@@ -0,0 +1,668 @@
+import os
+import sys
+import time
+import socket
+import sqlite3
+import logging
+import argparse
+import threading
+import traceback
+
+import numpy as np
+import pandas as pd
+
+from latency_sketch import REPORT_QUANTILES, LatencySketch, sketches_by_group
+from log_ingest import expand_log_paths, is_compressed, open_compressed
+from log_parser import empty_frame, parse_log_block
+from log_partitions import expand_source, parse_source_specs
+from log_query import parse_time
+from log_tailer import HEAD_SIZE
+from perf_metrics import metrics
+
+# 로깅 설정
+def setup_logging():
+    """로깅 설정을 초기화합니다."""
+    log_dir = 'logs'
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    # 로그 이력 DB 로거 설정
+    logger = logging.getLogger('log_history')
+    logger.setLevel(logging.INFO)
+
+    # 파일 핸들러 설정
+    file_handler = logging.FileHandler(f'{log_dir}/log_history.log', encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+
+    # 포맷터 설정
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    file_handler.setFormatter(formatter)
+
+    # 핸들러 추가
+    logger.addHandler(file_handler)
+
+    return logger
+
+# 로거 초기화
+logger = setup_logging()
+
+# 한 트랜잭션에 넣는 원본 행 수 (행 INSERT와 롤업/파일 offset 갱신을 함께 커밋)
+INSERT_BATCH_ROWS = 50000
+
+# 파일을 읽는 블록 크기 (압축 파일도 이 크기씩 풀면서 읽음)
+READ_BLOCK_SIZE = 4 * 1024 * 1024
+
+# 보관 정책 기본값 (DB에 있는 마지막 로그 시각 기준 일 수, None이면 지우지 않음)
+# - 원본 행: 지나면 지우고 롤업만 남김
+# - 분 단위 롤업: 지나면 시간 단위 롤업으로 합침
+# - 롤업: 지나면 지움
+RAW_RETENTION_DAYS = 14
+MINUTE_ROLLUP_DAYS = 31
+ROLLUP_RETENTION_DAYS = 400
+
+# 다른 프로세스가 쓰는 중일 때 기다리는 최대 시간 (초)
+BUSY_TIMEOUT = 30
+
+# 백그라운드 수집 주기와 보관 정책 적용 주기 (초)
+INGEST_INTERVAL = 30
+COMPACT_INTERVAL = 3600
+
+MINUTE = 60
+HOUR = 3600
+MICROSECONDS = 1000000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS requests (
+    ts INTEGER NOT NULL,
+    host TEXT NOT NULL,
+    method TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    resp_ms INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS requests_ts ON requests (ts);
+CREATE INDEX IF NOT EXISTS requests_endpoint_ts ON requests (endpoint, ts);
+
+CREATE TABLE IF NOT EXISTS rollups (
+    bucket INTEGER NOT NULL,
+    width INTEGER NOT NULL,
+    host TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    method TEXT NOT NULL,
+    requests INTEGER NOT NULL,
+    errors_4xx INTEGER NOT NULL,
+    errors_5xx INTEGER NOT NULL,
+    resp_sum REAL NOT NULL,
+    resp_min REAL NOT NULL,
+    resp_max REAL NOT NULL,
+    zero_count INTEGER NOT NULL,
+    key_offset INTEGER NOT NULL,
+    counts BLOB NOT NULL,
+    PRIMARY KEY (bucket, width, host, endpoint, method)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS rollups_endpoint_bucket ON rollups (endpoint, bucket);
+
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    head BLOB NOT NULL,
+    offset INTEGER NOT NULL,
+    path TEXT,
+    updated REAL
+);
+
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+"""
+
+# 롤업 행에서 스케치를 만드는 데 쓰는 열 (순서 고정)
+ROLLUP_VALUE_COLUMNS = 'requests, errors_4xx, errors_5xx, resp_sum, resp_min, resp_max, zero_count, key_offset, counts'
+
+
+def _encode_counts(sketch):
+    """스케치 버킷 카운트를 0이 아닌 (버킷 번호, 개수)만 담은 바이트로 바꿉니다."""
+    nonzero = np.flatnonzero(sketch.counts)
+    return np.concatenate([nonzero, sketch.counts[nonzero]]).astype('<u4').tobytes()
+
+
+def _rows_to_sketch(rows):
+    """롤업 행들(ROLLUP_VALUE_COLUMNS 순서)을 하나의 (스케치, 4xx 수, 5xx 수)로 합칩니다."""
+    sketch = LatencySketch()
+    errors_4xx = errors_5xx = 0
+    keys = []
+    counts = []
+    for requests, e4, e5, resp_sum, resp_min, resp_max, zero_count, key_offset, blob in rows:
+        errors_4xx += e4
+        errors_5xx += e5
+        sketch.count += requests
+        sketch.total += resp_sum
+        sketch.min = min(sketch.min, resp_min)
+        sketch.max = max(sketch.max, resp_max)
+        sketch.zero_count += zero_count
+        data = np.frombuffer(blob, dtype='<u4')
+        half = len(data) // 2
+        if half:
+            keys.append(data[:half].astype(np.int64) + key_offset)
+            counts.append(data[half:])
+    if keys:
+        keys = np.concatenate(keys)
+        low = int(keys.min())
+        sketch.counts = np.bincount(keys - low, weights=np.concatenate(counts)).astype(np.int64)
+        sketch.key_offset = low
+    return sketch, errors_4xx, errors_5xx
+
+
+def _rows_to_frame(rows):
+    """(ts, method, endpoint, status, resp_ms) 행들을 parse_log_block과 같은 형태의 DataFrame으로 바꿉니다."""
+    if not rows:
+        return empty_frame()
+    ts, method, endpoint, status, resp = zip(*rows)
+    return pd.DataFrame({
+        'datetime': pd.to_datetime(np.array(ts, dtype=np.int64), unit='us', utc=True),
+        'method': method,
+        'endpoint': endpoint,
+        'status': np.array(status, dtype=np.int64),
+        'resp_ms': np.array(resp, dtype=np.int64),
+    })
+
+
+def _in_clause(column, values, clauses, params):
+    clauses.append(f"{column} IN ({','.join('?' * len(values))})")
+    params.extend(values)
+
+
+class LogHistory:
+    """지난 로그를 로컬 SQLite DB에 쌓아 두고 다시 파싱하지 않고 조회하는 이력 저장소
+
+    원본 행(requests)은 시각과 (엔드포인트, 시각) 인덱스로, 분 단위 롤업(rollups)은
+    구간별 건수/에러 수/응답시간 스케치로 저장합니다. 스케치는 버킷을 더하는 것만으로
+    합쳐지므로 원본 행이 보관 기간을 지나 지워진 뒤에도 임의 구간의 분위수(p90 등)를
+    롤업만으로 구할 수 있습니다.
+
+    파일마다 앞부분 바이트(압축 파일은 푼 내용)와 넣은 바이트 offset을 기록해 두므로
+    같은 파일을 여러 번 넣어도, 로테이션으로 이름이 바뀌거나 압축돼도 새로 추가된
+    부분만 들어갑니다. 행 INSERT, 롤업 갱신, offset 기록은 INSERT_BATCH_ROWS행마다
+    한 트랜잭션으로 커밋되므로 중간에 중단돼도 중복되거나 빠지는 행이 없습니다.
+
+    연결은 스레드마다 따로 열며 WAL 모드라 조회는 수집을 기다리지 않습니다.
+    """
+
+    def __init__(self, path, raw_retention_days=RAW_RETENTION_DAYS, minute_rollup_days=MINUTE_ROLLUP_DAYS,
+                 rollup_retention_days=ROLLUP_RETENTION_DAYS):
+        self.path = path
+        self.raw_retention_days = raw_retention_days
+        self.minute_rollup_days = minute_rollup_days
+        self.rollup_retention_days = rollup_retention_days
+        self._local = threading.local()
+        conn = self._connection()
+        # 새 DB에서만 적용됨 (지운 페이지를 compact()에서 조금씩 반환)
+        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.executescript(SCHEMA)
+
+    def _connection(self):
+        """현재 스레드의 연결을 반환합니다 (없으면 엶)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # isolation_level=None: 트랜잭션은 BEGIN IMMEDIATE로 직접 시작
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+            conn.execute('PRAGMA synchronous = NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def ingest(self, paths, host=''):
+        """파일들에서 아직 넣지 않은 부분을 넣고 넣은 행 수를 반환합니다."""
+        added = 0
+        for path in paths:
+            try:
+                added += self.ingest_file(path, host)
+            except FileNotFoundError:
+                # 목록을 만든 뒤 로테이션/삭제된 파일 (다음 수집 때 새 이름으로 들어감)
+                continue
+        return added
+
+    def ingest_file(self, path, host=''):
+        """파일 하나에서 기록된 offset 이후의 완전한 줄들을 넣고 넣은 행 수를 반환합니다.
+
+        압축 파일은 더 추가되지 않으므로 줄바꿈이 없는 마지막 줄까지 넣습니다.
+        다른 프로세스가 같은 파일을 먼저 넣고 있으면 그만 읽습니다.
+        """
+        compressed = is_compressed(path)
+        added = 0
+        with (open_compressed(path) if compressed else open(path, 'rb')) as f:
+            head = f.read(HEAD_SIZE)
+            if not head:
+                return 0
+            _, offset = self._find_file(self._connection(), head)
+            pending = b''
+            if offset < len(head):
+                pending = head[offset:]
+            elif compressed:
+                # 압축 파일은 이동할 수 없으므로 이미 넣은 부분을 풀면서 건너뜀
+                remaining = offset - len(head)
+                while remaining > 0:
+                    skipped = f.read(min(READ_BLOCK_SIZE, remaining))
+                    if not skipped:
+                        return 0
+                    remaining -= len(skipped)
+            else:
+                f.seek(offset)
+
+            frames = []
+            batch_rows = 0
+            batch_start = consumed = offset
+            while True:
+                chunk = f.read(READ_BLOCK_SIZE)
+                if not chunk:
+                    break
+                data = pending + chunk
+                cut = data.rfind(b'\n')
+                if cut < 0:
+                    pending = data
+                    continue
+                pending = data[cut + 1:]
+                df = parse_log_block(data[:cut + 1].decode('utf-8', errors='replace'))
+                consumed += cut + 1
+                if not df.empty:
+                    frames.append(df)
+                    batch_rows += len(df)
+                if batch_rows >= INSERT_BATCH_ROWS:
+                    if not self._write_batch(head, batch_start, consumed, frames, host, path):
+                        return added
+                    added += batch_rows
+                    frames, batch_rows, batch_start = [], 0, consumed
+            if compressed and pending:
+                df = parse_log_block(pending.decode('utf-8', errors='replace'))
+                consumed += len(pending)
+                if not df.empty:
+                    frames.append(df)
+                    batch_rows += len(df)
+            if consumed > batch_start and self._write_batch(head, batch_start, consumed, frames, host, path):
+                added += batch_rows
+        if added:
+            logger.info(f"이력 DB 수집: {path}, {added} 개의 레코드 (offset {consumed})")
+        return added
+
+    def _find_file(self, conn, head):
+        """앞부분이 head로 시작하는 파일 기록의 (id, offset)을 반환합니다. 없으면 (None, 0).
+
+        파일이 작을 때 기록한 앞부분은 짧으므로, 기록된 앞부분이 head의 접두어이면 같은 파일로 봅니다.
+        """
+        row = conn.execute(
+            'SELECT id, offset FROM files WHERE substr(?, 1, length(head)) = head ORDER BY length(head) DESC LIMIT 1',
+            (head,)
+        ).fetchone()
+        return row if row else (None, 0)
+
+    def _write_batch(self, head, start, end, frames, host, path):
+        """파싱한 행을 넣고 롤업과 파일 offset을 한 트랜잭션으로 갱신합니다.
+
+        파일 offset이 start와 다르면(다른 프로세스가 먼저 넣음) 아무것도 하지 않고 False를 반환합니다.
+        """
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else (frames[0] if frames else empty_frame())
+        conn = self._connection()
+        with metrics.timer('history.insert', rows=len(df)):
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                file_id, offset = self._find_file(conn, head)
+                if offset != start:
+                    conn.execute('ROLLBACK')
+                    logger.info(f"다른 프로세스가 먼저 넣은 파일이라 건너뜁니다: {path} (offset {offset})")
+                    return False
+                if not df.empty:
+                    self._insert_rows(conn, df, host)
+                    self._update_rollups(conn, df, host)
+                if file_id is None:
+                    conn.execute('INSERT INTO files (head, offset, path, updated) VALUES (?, ?, ?, ?)',
+                                 (head, end, path, time.time()))
+                else:
+                    conn.execute('UPDATE files SET head = ?, offset = ?, path = ?, updated = ? WHERE id = ?',
+                                 (head, end, path, time.time(), file_id))
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        return True
+
+    def _insert_rows(self, conn, df, host):
+        ts = df['datetime'].dt.as_unit('us').array.asi8.tolist()
+        conn.executemany(
+            'INSERT INTO requests (ts, host, method, endpoint, status, resp_ms) VALUES (?, ?, ?, ?, ?, ?)',
+            zip(ts, [host] * len(ts), df['method'].tolist(), df['endpoint'].tolist(),
+                df['status'].tolist(), df['resp_ms'].tolist())
+        )
+
+    def _update_rollups(self, conn, df, host):
+        """행들을 (분, 엔드포인트, 메소드)별로 모아 분 단위 롤업에 더합니다."""
+        buckets = df['datetime'].dt.as_unit('us').array.asi8 // (MINUTE * MICROSECONDS) * MINUTE
+        codes, uniques = pd.MultiIndex.from_arrays([
+            buckets, df['endpoint'].to_numpy(dtype=object), df['method'].to_numpy(dtype=object)
+        ]).factorize()
+        sketches = sketches_by_group(codes, df['resp_ms'].to_numpy())
+        classes = df['status'].to_numpy() // 100
+        errors_4xx = np.bincount(codes, weights=classes == 4, minlength=len(uniques))
+        errors_5xx = np.bincount(codes, weights=classes == 5, minlength=len(uniques))
+        self._add_rollups(conn, {
+            (int(bucket), MINUTE, host, endpoint, method): (sketches[i], int(errors_4xx[i]), int(errors_5xx[i]))
+            for i, (bucket, endpoint, method) in enumerate(uniques)
+        })
+
+    def _add_rollups(self, conn, updates):
+        """{(bucket, width, host, endpoint, method): (스케치, 4xx 수, 5xx 수)}를 기존 롤업 행에 더합니다."""
+        rows = []
+        for key, (sketch, errors_4xx, errors_5xx) in updates.items():
+            existing = conn.execute(
+                f'SELECT {ROLLUP_VALUE_COLUMNS} FROM rollups '
+                'WHERE bucket = ? AND width = ? AND host = ? AND endpoint = ? AND method = ?',
+                key
+            ).fetchone()
+            if existing is not None:
+                old_sketch, old_4xx, old_5xx = _rows_to_sketch([existing])
+                sketch = old_sketch.merge(sketch)
+                errors_4xx += old_4xx
+                errors_5xx += old_5xx
+            rows.append(key + (sketch.count, errors_4xx, errors_5xx, sketch.total, sketch.min, sketch.max,
+                               sketch.zero_count, sketch.key_offset, _encode_counts(sketch)))
+        conn.executemany(
+            f'INSERT OR REPLACE INTO rollups (bucket, width, host, endpoint, method, {ROLLUP_VALUE_COLUMNS}) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            rows
+        )
+
+    def compact(self):
+        """보관 정책을 적용하고 지운 행 수를 반환합니다.
+
+        기준 시각은 DB에 있는 마지막 로그 시각입니다. 원본 행은 raw_retention_days,
+        분 단위 롤업은 minute_rollup_days가 지나면 시간 단위 롤업으로 합치고,
+        롤업은 rollup_retention_days가 지나면 지웁니다.
+        """
+        latest = self.latest()
+        if latest is None:
+            return {}
+        now = latest.value // 1000 // MICROSECONDS
+        removed = {}
+        conn = self._connection()
+        with metrics.timer('history.compact'):
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if self.raw_retention_days is not None:
+                    cutoff = (now - int(self.raw_retention_days * 86400)) * MICROSECONDS
+                    removed['requests'] = conn.execute('DELETE FROM requests WHERE ts < ?', (cutoff,)).rowcount
+                if self.minute_rollup_days is not None:
+                    cutoff = (now - int(self.minute_rollup_days * 86400)) // HOUR * HOUR
+                    removed['minute_rollups'] = self._compact_minutes(conn, cutoff)
+                if self.rollup_retention_days is not None:
+                    cutoff = now - int(self.rollup_retention_days * 86400)
+                    removed['rollups'] = conn.execute('DELETE FROM rollups WHERE bucket < ?', (cutoff,)).rowcount
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('PRAGMA incremental_vacuum')
+        logger.info(f"이력 DB 보관 정책 적용: {removed}")
+        return removed
+
+    def _compact_minutes(self, conn, cutoff):
+        """cutoff(초) 이전의 분 단위 롤업을 시간 단위로 합치고 지운 분 단위 행 수를 반환합니다."""
+        hours = [row[0] for row in conn.execute(
+            'SELECT DISTINCT bucket / ? * ? FROM rollups WHERE width = ? AND bucket < ?', (HOUR, HOUR, MINUTE, cutoff)
+        )]
+        removed = 0
+        for hour in hours:
+            groups = {}
+            for row in conn.execute(
+                f'SELECT host, endpoint, method, {ROLLUP_VALUE_COLUMNS} FROM rollups '
+                'WHERE width = ? AND bucket >= ? AND bucket < ?', (MINUTE, hour, hour + HOUR)
+            ):
+                groups.setdefault(row[:3], []).append(row[3:])
+            self._add_rollups(conn, {
+                (hour, HOUR) + key: _rows_to_sketch(rows) for key, rows in groups.items()
+            })
+            removed += conn.execute('DELETE FROM rollups WHERE width = ? AND bucket >= ? AND bucket < ?',
+                                    (MINUTE, hour, hour + HOUR)).rowcount
+        return removed
+
+    def acquire_lease(self, name, owner, seconds):
+        """여러 프로세스 중 하나만 주기 작업을 하도록 name 임대를 얻습니다 (이미 가진 경우 연장).
+
+        가진 프로세스가 비정상 종료해도 seconds가 지나면 다른 프로세스가 가져갑니다.
+        """
+        conn = self._connection()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT owner, expires FROM leases WHERE name = ?', (name,)).fetchone()
+            acquired = row is None or row[0] == owner or row[1] < now
+            if acquired:
+                conn.execute('INSERT OR REPLACE INTO leases (name, owner, expires) VALUES (?, ?, ?)',
+                             (name, owner, now + seconds))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return acquired
+
+    def latest(self):
+        """DB에 있는 가장 늦은 로그 시각(UTC pd.Timestamp)을 반환합니다. 비어 있으면 None."""
+        conn = self._connection()
+        ts = conn.execute('SELECT MAX(ts) FROM requests').fetchone()[0]
+        if ts is not None:
+            return pd.Timestamp(ts, unit='us', tz='UTC')
+        end = conn.execute('SELECT MAX(bucket + width) FROM rollups').fetchone()[0]
+        return None if end is None else pd.Timestamp(end - 1, unit='s', tz='UTC')
+
+    def _bounds(self, start, end):
+        """start/end(pd.Timestamp 또는 마지막 로그 시각 기준 음수 pd.Timedelta)를 epoch 마이크로초로 바꿉니다."""
+        latest = None
+        bounds = []
+        for bound in (start, end):
+            if isinstance(bound, pd.Timedelta):
+                if latest is None:
+                    latest = self.latest()
+                bound = None if latest is None else latest + bound
+            bounds.append(None if bound is None else pd.Timestamp(bound).value // 1000)
+        return bounds
+
+    def iter_frames(self, start=None, end=None, endpoint=None, method=None, status=None, host=None,
+                    chunk_rows=INSERT_BATCH_ROWS):
+        """조건에 맞는 원본 행을 시간순으로 chunk_rows행씩 DataFrame으로 돌려줍니다.
+
+        조건 형식은 LogStore.query와 같고(end는 포함하지 않음) host는 호스트 이름 목록입니다.
+        보관 기간이 지나 지워진 원본 행은 나오지 않습니다.
+        """
+        start_us, end_us = self._bounds(start, end)
+        clauses, params = [], []
+        if start_us is not None:
+            clauses.append('ts >= ?')
+            params.append(start_us)
+        if end_us is not None:
+            clauses.append('ts < ?')
+            params.append(end_us)
+        if endpoint is not None:
+            _in_clause('endpoint', endpoint, clauses, params)
+        if method is not None:
+            _in_clause('method', method, clauses, params)
+        if host is not None:
+            _in_clause('host', host, clauses, params)
+        if status is not None:
+            clauses.append('(' + ' OR '.join('(status >= ? AND status < ?)' for _ in status) + ')')
+            params.extend(value for bounds in status for value in bounds)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        cursor = self._connection().execute(
+            f'SELECT ts, method, endpoint, status, resp_ms FROM requests {where} ORDER BY ts, rowid', params
+        )
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                return
+            yield _rows_to_frame(rows)
+
+    def query(self, start=None, end=None, endpoint=None, method=None, status=None, host=None):
+        """조건에 맞는 원본 행을 시간순 DataFrame 하나로 반환합니다 (iter_frames와 같은 조건)."""
+        frames = list(self.iter_frames(start, end, endpoint, method, status, host))
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else (frames[0] if frames else empty_frame())
+
+    def _rollup_rows(self, columns, start, end, endpoint, method, host, select_params=(), suffix=''):
+        """구간에 걸친 롤업 행들을 조회합니다 (분/시간 버킷 단위로 맞춰짐)."""
+        start_us, end_us = self._bounds(start, end)
+        clauses, params = [], list(select_params)
+        if start_us is not None:
+            clauses.append('bucket + width > ?')
+            params.append(start_us // MICROSECONDS)
+        if end_us is not None:
+            clauses.append('bucket < ?')
+            params.append(-(-end_us // MICROSECONDS))
+        if endpoint is not None:
+            _in_clause('endpoint', endpoint, clauses, params)
+        if method is not None:
+            _in_clause('method', method, clauses, params)
+        if host is not None:
+            _in_clause('host', host, clauses, params)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        return self._connection().execute(f'SELECT {columns} FROM rollups {where} {suffix}', params)
+
+    def summary(self, start=None, end=None, endpoint=None, method=None, host=None):
+        """엔드포인트별 건수/에러 수/평균·분위수 응답시간을 롤업에서 계산해 목록으로 반환합니다.
+
+        원본 행이 지워진 기간도 조회할 수 있으며, 구간은 롤업 버킷(분, 오래된 기간은 시간)
+        단위로 맞춰집니다. 건수가 많은 엔드포인트부터 정렬합니다.
+        """
+        groups = {}
+        with metrics.timer('history.summary') as timer:
+            for row in self._rollup_rows(f'endpoint, {ROLLUP_VALUE_COLUMNS}', start, end, endpoint, method, host):
+                groups.setdefault(row[0], []).append(row[1:])
+            summary = []
+            for name, rows in groups.items():
+                sketch, errors_4xx, errors_5xx = _rows_to_sketch(rows)
+                item = {
+                    'endpoint': name,
+                    'requests': sketch.count,
+                    'errors_4xx': errors_4xx,
+                    'errors_5xx': errors_5xx,
+                    'avg_resp': sketch.mean(),
+                    'max_resp': sketch.max,
+                }
+                for quantile_name, value in zip(REPORT_QUANTILES, sketch.quantiles(REPORT_QUANTILES.values())):
+                    item[f'{quantile_name}_resp'] = value
+                summary.append(item)
+            timer.rows = len(summary)
+        return sorted(summary, key=lambda item: (-item['requests'], item['endpoint']))
+
+    def series(self, start=None, end=None, endpoint=None, method=None, host=None, width=HOUR):
+        """width초 구간별 {'bucket', 'requests', 'errors_4xx', 'errors_5xx', 'avg_resp'} 목록을 롤업에서 계산합니다.
+
+        시간 단위로 합쳐진 오래된 기간은 width가 더 작아도 시간 구간으로 나옵니다.
+        """
+        width = max(int(width), MINUTE)
+        rows = self._rollup_rows(
+            'bucket / ? * ? AS slot, SUM(requests), SUM(errors_4xx), SUM(errors_5xx), SUM(resp_sum)',
+            start, end, endpoint, method, host, select_params=[width, width], suffix='GROUP BY slot ORDER BY slot'
+        )
+        return [{
+            'bucket': pd.Timestamp(slot, unit='s', tz='UTC'),
+            'requests': requests,
+            'errors_4xx': errors_4xx,
+            'errors_5xx': errors_5xx,
+            'avg_resp': resp_sum / requests if requests else 0.0,
+        } for slot, requests, errors_4xx, errors_5xx, resp_sum in rows]
+
+
+class HistoryIngester:
+    """소스들의 새로 추가된 로그를 주기적으로 LogHistory에 넣는 백그라운드 스레드
+
+    여러 작업자 프로세스가 같은 DB를 쓰면 임대(lease)를 가진 프로세스 하나만 수집합니다.
+    보관 정책(compact)은 compact_interval마다 적용합니다.
+    """
+
+    def __init__(self, history, sources, interval=INGEST_INTERVAL, compact_interval=COMPACT_INTERVAL):
+        # sources: [(호스트 이름, [패턴])] (호스트를 나누지 않으면 이름은 '')
+        self.history = history
+        self.sources = sources
+        self.interval = interval
+        self.compact_interval = compact_interval
+        self.owner = None
+        self._thread = None
+        self._next_compact = 0.0
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            # fork된 작업자마다 다른 소유자가 되도록 시작할 때 정함
+            self.owner = f'{socket.gethostname()}:{os.getpid()}'
+            self._thread = threading.Thread(target=self._run, name='history-ingest', daemon=True)
+            self._thread.start()
+
+    def run_once(self):
+        """소스마다 새로 추가된 부분을 넣고, 주기가 됐으면 보관 정책을 적용합니다. 넣은 행 수를 반환합니다."""
+        added = 0
+        for host, patterns in self.sources:
+            # 소스마다 임대를 연장 (처음 채울 때처럼 오래 걸려도 다른 프로세스가 가져가지 않도록)
+            if not self.history.acquire_lease('ingest', self.owner, self.interval * 3):
+                return added
+            added += self.history.ingest(expand_source(patterns), host)
+        if time.monotonic() >= self._next_compact:
+            self.history.compact()
+            self._next_compact = time.monotonic() + self.compact_interval
+        return added
+
+    def _run(self):
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"이력 DB 수집 오류: {str(e)}\n{traceback.format_exc()}")
+            time.sleep(self.interval)
+
+
+def main(db_path, log_files=None, sources=None, summary=False, start=None, end=None, endpoint=None, **retention):
+    """로그 파일(또는 소스)을 이력 DB에 넣고 보관 정책을 적용합니다. summary면 엔드포인트별 요약을 출력합니다."""
+    try:
+        history = LogHistory(db_path, **retention)
+        added = 0
+        for host, patterns in sources or []:
+            added += history.ingest(expand_source(patterns), host)
+        if log_files:
+            added += history.ingest(expand_log_paths(log_files))
+        removed = history.compact()
+        print(f'이력 DB 수집 완료: {added} 개의 레코드 추가, 보관 정책으로 삭제 {removed}')
+
+        if summary:
+            print(f"\n엔드포인트별 요약 ({start or '처음'} ~ {end or '끝'}):")
+            for item in history.summary(start, end, endpoint):
+                print(f"  {item['endpoint']}: {item['requests']}건, 4xx {item['errors_4xx']}건, 5xx {item['errors_5xx']}건, "
+                      f"평균 {item['avg_resp']:.1f}ms, p50 {item['p50_resp']:.1f}ms, p90 {item['p90_resp']:.1f}ms, "
+                      f"p99 {item['p99_resp']:.1f}ms")
+        return 0
+    except Exception as e:
+        logger.error(f"이력 DB 오류: {str(e)}\n{traceback.format_exc()}")
+        print(f'이력 DB 처리 중 오류가 발생했습니다: {e}')
+        return 1
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='로그 이력 DB 수집/보관 정책 적용/요약')
+    parser.add_argument('db_path', help='이력 DB 파일 경로 (없으면 새로 만듦)')
+    parser.add_argument('log_files', nargs='*', help='넣을 로그 파일/glob 패턴 (압축 파일 포함)')
+    parser.add_argument('--source', dest='sources', action='append', default=None,
+                        help='호스트 이름을 붙여 넣을 소스 (이름=패턴, 여러 번 지정 가능)')
+    parser.add_argument('--raw-days', type=float, default=RAW_RETENTION_DAYS, help='원본 행 보관 기간(일)')
+    parser.add_argument('--minute-days', type=float, default=MINUTE_ROLLUP_DAYS,
+                        help='분 단위 롤업 보관 기간(일). 지나면 시간 단위로 합침')
+    parser.add_argument('--rollup-days', type=float, default=ROLLUP_RETENTION_DAYS, help='롤업 보관 기간(일)')
+    parser.add_argument('--summary', action='store_true', help='엔드포인트별 건수/에러/응답시간 분위수 출력')
+    parser.add_argument('--from', dest='start', type=parse_time, default=None,
+                        help='요약 시작 시각 (ISO 8601, epoch 초, DB 마지막 시각 기준 상대 시간 -1d)')
+    parser.add_argument('--to', dest='end', type=parse_time, default=None, help='요약 끝 시각 (포함하지 않음)')
+    parser.add_argument('--endpoint', action='append', default=None, help='요약할 엔드포인트 (여러 번 지정 가능)')
+    args = parser.parse_args()
+    sys.exit(main(args.db_path, args.log_files, parse_source_specs(args.sources) if args.sources else None,
+                  args.summary, args.start, args.end, args.endpoint,
+                  raw_retention_days=args.raw_days, minute_rollup_days=args.minute_days,
+                  rollup_retention_days=args.rollup_days))
@@ -0,0 +1,426 @@
+import os
+import re
+import bz2
+import glob
+import gzip
+import lzma
+import queue
+import logging
+import threading
+import traceback
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from itertools import chain, islice
+
+import numpy as np
+import pandas as pd
+
+from log_parser import parse_log_block
+
+# 로깅 설정
+def setup_logging():
+    """로깅 설정을 초기화합니다."""
+    log_dir = 'logs'
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    # 병렬 수집 로거 설정
+    logger = logging.getLogger('log_ingest')
+    logger.setLevel(logging.INFO)
+
+    # 파일 핸들러 설정
+    file_handler = logging.FileHandler(f'{log_dir}/log_ingest.log', encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+
+    # 포맷터 설정
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    file_handler.setFormatter(formatter)
+
+    # 핸들러 추가
+    logger.addHandler(file_handler)
+
+    return logger
+
+# 로거 초기화
+logger = setup_logging()
+
+# 작업 하나가 맡는 바이트 구간 크기 (압축 파일은 블록 읽기 크기)
+DEFAULT_RANGE_SIZE = 32 * 1024 * 1024
+
+# 압축을 풀면서 읽을 수 있는 확장자 (.zst는 zstandard 패키지가 있어야 함)
+COMPRESSED_SUFFIXES = ('.gz', '.bz2', '.xz', '.zst')
+
+# 압축 파일 여러 개를 스레드로 동시에 풀 때의 기본 스레드 수
+DECOMPRESS_THREADS = 4
+
+# 작업자마다 미리 제출해 두는 작업 수 (결과를 순서대로 모으는 동안 메모리를 제한)
+PREFETCH_PER_WORKER = 2
+
+# 압축 파일 작업 하나가 아직 가져가지 않은 블록 결과를 쌓아 둘 수 있는 개수
+ARCHIVE_QUEUE_SIZE = 2
+
+# 큐가 가득 찼을 때 취소 여부를 다시 확인하는 주기 (초)
+QUEUE_POLL_SECONDS = 0.5
+
+# 숫자 열 (datetime은 UTC 기준 마이크로초 정수로 주고받음)
+NUMERIC_COLUMNS = ['datetime', 'status', 'resp_ms']
+
+# 사전(dictionary) 인코딩해서 주고받는 문자열 열
+CATEGORY_COLUMNS = ['method', 'endpoint']
+
+# 로테이션 번호 형식: server.log.1, server.log.2.gz (번호가 클수록 오래된 파일)
+ROTATION_RE = re.compile(r"\.(\d+)$")
+
+
+def expand_log_paths(patterns):
+    """파일 경로/glob 패턴 목록을 실제 파일 목록으로 펼칩니다.
+
+    로테이션된 파일(server.log.2, server.log.1, server.log)이 시간순이 되도록
+    수정 시각이 오래된 파일부터 정렬합니다. 수정 시각이 같으면 로테이션 번호가
+    큰 파일부터, 번호가 없는 현재 파일은 마지막에 둡니다.
+    """
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    paths = []
+    for pattern in patterns:
+        matches = glob.glob(pattern) or ([pattern] if os.path.exists(pattern) else [])
+        if not matches:
+            logger.warning(f"일치하는 로그 파일이 없습니다: {pattern}")
+        for path in matches:
+            if os.path.isfile(path) and path not in paths:
+                paths.append(path)
+    return sorted(paths, key=lambda path: (os.path.getmtime(path), rotation_order(path), path))
+
+
+def rotation_order(path):
+    """같은 수정 시각의 파일들을 오래된 순서로 놓기 위한 정렬 키 (번호가 클수록 앞)."""
+    name = os.path.basename(path)
+    for suffix in COMPRESSED_SUFFIXES:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+            break
+    match = ROTATION_RE.search(name)
+    return (0, -int(match.group(1))) if match else (1, 0)
+
+
+def is_compressed(path):
+    return path.endswith(COMPRESSED_SUFFIXES)
+
+
+def open_compressed(path):
+    """압축 파일을 풀면서 읽는 바이너리 파일 객체를 엽니다 (전체를 디스크나 메모리에 풀지 않음)."""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    if path.endswith('.bz2'):
+        return bz2.open(path, 'rb')
+    if path.endswith('.xz'):
+        return lzma.open(path, 'rb')
+    if path.endswith('.zst'):
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError(f'zstd 압축 파일({path})을 읽으려면 zstandard가 필요합니다: pip install zstandard') from e
+        # 여러 프레임으로 된 파일(이어 붙인 .zst 등)도 끝까지 읽음
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True, closefd=True)
+    raise ValueError(f'지원하지 않는 압축 형식입니다: {path}')
+
+
+def check_decompressors(paths):
+    """압축을 푸는 데 필요한 패키지가 없으면 작업을 나누기 전에 ImportError를 냅니다."""
+    for path in paths:
+        if path.endswith('.zst'):
+            open_compressed(path).close()
+
+
+def split_file_ranges(path, range_size=DEFAULT_RANGE_SIZE):
+    """파일을 줄바꿈 경계에 맞춘 [(시작, 끝)] 바이트 구간들로 나눕니다."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    ranges = []
+    start = 0
+    with open(path, 'rb') as f:
+        while start < size:
+            end = start + range_size
+            if end >= size:
+                end = size
+            else:
+                # 구간 끝을 다음 줄바꿈 바로 뒤로 옮김
+                f.seek(end)
+                while True:
+                    chunk = f.read(64 * 1024)
+                    if not chunk:
+                        end = size
+                        break
+                    cut = chunk.find(b'\n')
+                    if cut >= 0:
+                        end += cut + 1
+                        break
+                    end += len(chunk)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def plan_pieces(paths, range_size=DEFAULT_RANGE_SIZE):
+    """파일 목록을 작업 단위 (경로, 시작, 끝) 목록으로 나눕니다.
+
+    압축 파일은 중간부터 읽을 수 없으므로 파일 하나를 통째로 한 작업(끝=None)으로 둡니다.
+    """
+    check_decompressors(paths)
+    pieces = []
+    for path in paths:
+        if is_compressed(path):
+            pieces.append((path, 0, None))
+        else:
+            pieces.extend((path, start, end) for start, end in split_file_ranges(path, range_size))
+    return pieces
+
+
+def frame_to_columns(df):
+    """파싱된 DataFrame을 프로세스 간에 주고받기 좋은 타입 있는 배열들로 바꿉니다."""
+    columns = {
+        'datetime': df['datetime'].dt.as_unit('us').array.asi8 if len(df) else np.zeros(0, np.int64),
+        'status': df['status'].to_numpy(dtype=np.int64),
+        'resp_ms': df['resp_ms'].to_numpy(dtype=np.int64),
+    }
+    for column in CATEGORY_COLUMNS:
+        codes, uniques = pd.factorize(df[column].to_numpy(dtype=object)) if len(df) else (np.zeros(0, np.int64), [])
+        columns[column] = (codes.astype(np.int32), list(uniques))
+    return columns
+
+
+def merge_columns(parts):
+    """여러 작업의 열 배열을 순서대로 이어 붙입니다 (문자열 사전은 하나로 합침)."""
+    merged = {column: np.concatenate([part[column] for part in parts]) for column in NUMERIC_COLUMNS}
+    for column in CATEGORY_COLUMNS:
+        categories = []
+        lookup = {}
+        all_codes = []
+        for part in parts:
+            codes, uniques = part[column]
+            remap = np.empty(len(uniques), dtype=np.int32)
+            for i, value in enumerate(uniques):
+                if value not in lookup:
+                    lookup[value] = len(categories)
+                    categories.append(value)
+                remap[i] = lookup[value]
+            all_codes.append(remap[codes])
+        merged[column] = (np.concatenate(all_codes), categories)
+    return merged
+
+
+def columns_to_frame(columns):
+    """열 배열을 parse_log_block과 같은 형태의 DataFrame으로 되돌립니다."""
+    data = {'datetime': pd.to_datetime(columns['datetime'], unit='us', utc=True)}
+    for column in CATEGORY_COLUMNS:
+        codes, categories = columns[column]
+        data[column] = np.asarray(categories, dtype=object)[codes]
+    data['status'] = columns['status']
+    data['resp_ms'] = columns['resp_ms']
+    return pd.DataFrame(data)
+
+
+def iter_compressed_blocks(path, block_size=DEFAULT_RANGE_SIZE):
+    """압축 파일을 풀면서 완전한 줄 단위 블록으로 돌려줍니다.
+
+    한 번에 block_size 바이트씩만 풀어서 파서에 넘기므로 메모리 사용량은 압축을 푼
+    전체 크기가 아니라 블록 크기에 비례합니다.
+    """
+    with open_compressed(path) as f:
+        pending = b''
+        while True:
+            chunk = f.read(block_size)
+            if not chunk:
+                break
+            data = pending + chunk
+            cut = data.rfind(b'\n')
+            if cut < 0:
+                pending = data
+                continue
+            pending = data[cut + 1:]
+            yield data[:cut + 1].decode('utf-8', errors='replace')
+        if pending:
+            yield pending.decode('utf-8', errors='replace')
+
+
+def parse_piece(piece):
+    """작업 하나(압축되지 않은 파일의 바이트 구간)를 파싱해 열 배열로 반환합니다.
+
+    작업자 프로세스에서 실행되므로 모듈 최상위 함수로 둡니다.
+    """
+    path, start, end = piece
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return parse_text(data.decode('utf-8', errors='replace'))
+
+
+def parse_text(text):
+    """압축을 푼 줄 단위 블록 하나를 파싱해 열 배열로 반환합니다 (작업자 프로세스용)."""
+    return frame_to_columns(parse_log_block(text))
+
+
+def stream_archive(path, block_size, out, cancel):
+    """압축 파일 하나를 풀면서 블록마다 파싱한 열 배열을 out 큐에 차례로 넣습니다.
+
+    작업자(프로세스/스레드)에서 실행되므로 여러 압축 파일을 동시에 풉니다. out은
+    크기가 제한된 큐라서 결과를 가져가지 않으면 더 풀지 않고 기다립니다. 끝나면
+    (오류가 나도) None을 넣어 알리고, 오류는 작업 결과로 전달됩니다. cancel이
+    설정되면(결과를 더 받지 않음) 바로 멈춥니다.
+    """
+    try:
+        for block in iter_compressed_blocks(path, block_size):
+            if cancel.is_set() or not _put(out, parse_text(block), cancel):
+                return
+    finally:
+        _put(out, None, cancel)
+
+
+def _put(out, item, cancel):
+    """큐에 자리가 날 때까지 기다려 넣습니다. 그동안 cancel이 설정되면 False를 반환합니다."""
+    while True:
+        try:
+            out.put(item, timeout=QUEUE_POLL_SECONDS)
+            return True
+        except queue.Full:
+            if cancel.is_set():
+                return False
+
+
+def iter_tasks(pieces, block_size=DEFAULT_RANGE_SIZE, split_archives=False):
+    """작업 단위 목록을 (종류, 인자) 파싱 작업으로 바꿔 순서대로 돌려줍니다.
+
+    종류는 'piece'(파일 구간), 'archive'(압축 파일 하나, 작업자가 풀면서 파싱),
+    'block'(여기서 푼 압축 파일 블록)입니다. split_archives면 압축 파일을 여기서
+    block_size씩 풀어 블록마다 작업을 하나씩 만듭니다. 압축 파일 하나는 한 흐름으로만
+    풀 수 있으므로, 파일이 하나뿐일 때 블록 파싱을 여러 작업자가 나눠 맡게 할 때 씁니다.
+    """
+    for piece in pieces:
+        path, _, end = piece
+        if end is not None:
+            yield 'piece', piece
+        elif split_archives:
+            for block in iter_compressed_blocks(path, block_size):
+                yield 'block', block
+        else:
+            yield 'archive', path
+
+
+def iter_parsed_columns(paths, workers=None, range_size=DEFAULT_RANGE_SIZE, threads=None):
+    """파일들을 작업 단위로 나눠 병렬로 파싱하고, 결과 열 배열을 원래 순서대로 돌려줍니다.
+
+    workers가 None이면 CPU 코어 수만큼 작업자 프로세스를 씁니다. 작업자마다
+    PREFETCH_PER_WORKER개까지만 미리 제출하므로 결과를 천천히 소비해도(스트리밍 집계)
+    메모리는 일정합니다. 작업이 하나뿐이거나 workers가 1이면 현재 프로세스에서 파싱합니다.
+
+    threads를 주면 작업자 프로세스 대신 현재 프로세스의 스레드 threads개를 씁니다.
+    압축을 푸는 동안(zlib/bz2/lzma/zstd)은 GIL을 놓으므로, 프로세스를 띄우기
+    어려운 곳(서버 안)에서 압축 파일 여러 개를 동시에 풀 때 씁니다.
+
+    압축 파일은 작업자마다 하나씩 맡아 range_size씩 풀면서 블록마다 결과를 돌려주므로,
+    압축 파일 크기와 관계없이 메모리는 일정합니다. 압축 파일이 하나뿐이면 현재
+    프로세스에서 풀고 블록 파싱을 작업자들이 나눠 맡습니다.
+    """
+    pieces = plan_pieces(paths, range_size)
+    split_archives = len(pieces) == 1
+    tasks = iter_tasks(pieces, range_size, split_archives)
+    # 작업이 둘 이상인지만 확인 (압축 파일 하나는 풀어 봐야 블록 수를 알 수 있음)
+    head = list(islice(tasks, 2))
+    tasks = chain(head, tasks)
+    # 압축 파일 하나를 블록으로 나눴으면 작업 수가 파일 수보다 많음
+    slots = None if split_archives else len(pieces)
+    if threads and threads > 1 and len(head) > 1:
+        logger.info(f"스레드 파싱 시작: 파일 {len(paths)}개, 작업 {len(pieces)}개, 스레드 {threads}개")
+        with ThreadPoolExecutor(max_workers=min(threads, slots or threads), thread_name_prefix='decompress') as pool:
+            yield from _iter_pool_results(pool, tasks, range_size, threads * PREFETCH_PER_WORKER)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    logger.info(f"병렬 파싱 시작: 파일 {len(paths)}개, 작업 {len(pieces)}개, 작업자 {workers}개")
+    if workers == 1 or len(head) <= 1:
+        for kind, arg in tasks:
+            if kind == 'archive':
+                for block in iter_compressed_blocks(arg, range_size):
+                    yield parse_text(block)
+            else:
+                yield parse_piece(arg) if kind == 'piece' else parse_text(arg)
+        return
+
+    # 작업자 프로세스가 압축 파일 결과를 넣을 큐는 프로세스 사이에서 공유해야 하므로 Manager로 만듦
+    archives = not split_archives and any(end is None for _, _, end in pieces)
+    with (multiprocessing.Manager() if archives else nullcontext()) as manager:
+        with ProcessPoolExecutor(max_workers=min(workers, slots or workers)) as pool:
+            yield from _iter_pool_results(pool, tasks, range_size, workers * PREFETCH_PER_WORKER, manager)
+
+
+def _iter_pool_results(pool, tasks, block_size, prefetch, manager=None):
+    """작업을 prefetch개까지 미리 제출해 두고 결과를 제출한 순서대로 돌려줍니다.
+
+    tasks는 필요할 때마다 하나씩 꺼내므로 (압축 파일 블록처럼) 만드는 데 메모리가
+    드는 작업도 prefetch개 넘게 쌓이지 않습니다. 압축 파일 작업은 크기가
+    ARCHIVE_QUEUE_SIZE인 큐로 블록 결과를 넘기며, 앞선 작업의 결과를 다 돌려준 뒤에
+    그 큐를 비웁니다. manager가 있으면(프로세스 풀) 큐와 취소 이벤트를 manager로 만듭니다.
+    """
+    cancel = manager.Event() if manager is not None else threading.Event()
+
+    def submit(kind, arg):
+        if kind == 'archive':
+            out = manager.Queue(ARCHIVE_QUEUE_SIZE) if manager is not None else queue.Queue(ARCHIVE_QUEUE_SIZE)
+            return pool.submit(stream_archive, arg, block_size, out, cancel), out
+        return pool.submit(parse_piece if kind == 'piece' else parse_text, arg), None
+
+    pending = deque()
+    try:
+        for kind, arg in tasks:
+            pending.append(submit(kind, arg))
+            if len(pending) >= prefetch:
+                break
+        while pending:
+            future, out = pending.popleft()
+            for kind, arg in tasks:
+                pending.append(submit(kind, arg))
+                break
+            if out is None:
+                yield future.result()
+                continue
+            while True:
+                try:
+                    columns = out.get(timeout=QUEUE_POLL_SECONDS)
+                except queue.Empty:
+                    # 작업자가 끝을 알리지 못하고 죽었으면(프로세스 강제 종료 등) 그 오류를 냄
+                    if future.done() and future.exception() is not None:
+                        future.result()
+                    continue
+                if columns is None:
+                    break
+                yield columns
+            # 압축 파일을 읽다 난 오류는 여기서 다시 발생
+            future.result()
+    finally:
+        # 결과를 끝까지 받지 않고 멈춘 경우 남은 작업과 큐를 기다리는 작업자를 정리
+        cancel.set()
+        for future, _ in pending:
+            future.cancel()
+
+
+def load_logs_parallel(paths, workers=None, range_size=DEFAULT_RANGE_SIZE, threads=None):
+    """여러 로그 파일(압축 포함)을 병렬로 파싱해 하나의 DataFrame으로 반환합니다.
+
+    파일 순서, 파일 안의 줄 순서는 순차로 읽은 결과와 같습니다.
+    """
+    try:
+        parts = list(iter_parsed_columns(paths, workers, range_size, threads))
+        if not parts:
+            return pd.DataFrame()
+        df = columns_to_frame(merge_columns(parts))
+        logger.info(f"병렬 파싱 완료: {len(df)} 개의 레코드")
+        return df
+    except ImportError:
+        # 압축 해제 패키지가 없는 것은 데이터 문제가 아니므로 호출한 쪽에 알림
+        raise
+    except Exception as e:
+        logger.error(f"병렬 파싱 오류: {str(e)}\n{traceback.format_exc()}")
+        return pd.DataFrame()
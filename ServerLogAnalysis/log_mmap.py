@@ -0,0 +1,273 @@
+import os
+import re
+import mmap
+import logging
+import traceback
+
+import numpy as np
+import pandas as pd
+
+from log_parser import COLUMNS, LOG_PATTERN, empty_frame
+
+# 로깅 설정
+def setup_logging():
+    """로깅 설정을 초기화합니다."""
+    log_dir = 'logs'
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    # 메모리 매핑 리더 로거 설정
+    logger = logging.getLogger('log_mmap')
+    logger.setLevel(logging.INFO)
+
+    # 파일 핸들러 설정
+    file_handler = logging.FileHandler(f'{log_dir}/log_mmap.log', encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+
+    # 포맷터 설정
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    file_handler.setFormatter(formatter)
+
+    # 핸들러 추가
+    logger.addHandler(file_handler)
+
+    return logger
+
+# 로거 초기화
+logger = setup_logging()
+
+# 바이트 블록 파싱용 (LOG_BLOCK_RE와 같은 패턴을 bytes로 컴파일)
+LOG_BYTES_RE = re.compile((r"^" + LOG_PATTERN).encode('ascii'), re.MULTILINE)
+
+# 희소 인덱스의 체크포인트 간격 (바이트). 20GB 파일이면 약 2만 개
+DEFAULT_INDEX_STRIDE = 1024 * 1024
+
+# 한 번에 파싱하는 바이트 블록 크기
+DEFAULT_BLOCK_SIZE = 16 * 1024 * 1024
+
+# 체크포인트나 파일 끝에서 타임스탬프가 있는 줄을 찾을 때 살펴보는 최대 바이트 수
+TIMESTAMP_SCAN_BYTES = 64 * 1024
+
+# 타임스탬프 'YYYY-MM-DDTHH:MM:SSZ'에서 'Z'를 뺀 길이
+TIMESTAMP_WIDTH = 19
+
+
+def _to_epoch_seconds(raw):
+    """bytes 타임스탬프 하나를 UTC epoch 초로 바꿉니다. 잘못된 날짜면 None을 반환합니다."""
+    try:
+        return int(np.datetime64(raw[:TIMESTAMP_WIDTH].decode('ascii'), 's').astype(np.int64))
+    except ValueError:
+        return None
+
+
+def _decode_category(values):
+    """bytes 값 목록을 고유값만 디코딩해 문자열 배열로 만듭니다."""
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    decoded = np.asarray([value.decode('utf-8', errors='replace') for value in uniques], dtype=object)
+    return decoded[codes]
+
+
+def parse_mapped_block(buffer, start=0, end=None, columns=None):
+    """메모리 매핑된 버퍼의 [start, end) 구간을 파싱해 DataFrame으로 반환합니다.
+
+    줄 단위 문자열을 만들거나 블록 전체를 디코딩하지 않고, bytes 정규식으로 버퍼에서
+    바로 필드만 뽑습니다. 타임스탬프는 numpy 고정 폭 변환으로 한 번에 바꾸고,
+    method/endpoint는 고유값만 디코딩합니다. columns를 주면 datetime과 그 열들만
+    변환합니다. 결과는 parse_log_block과 같은 형태이며 잘못된 날짜의 줄은 건너뜁니다.
+    """
+    end = len(buffer) if end is None else end
+    matches = LOG_BYTES_RE.findall(buffer, start, end)
+    if not matches:
+        return empty_frame()
+    columns = COLUMNS if columns is None else ['datetime'] + [column for column in columns if column != 'datetime']
+
+    dt, method, endpoint, status, resp = zip(*matches)
+    stamps = np.array(dt, dtype=f'S{TIMESTAMP_WIDTH}')
+    try:
+        datetimes = pd.DatetimeIndex(stamps.astype('datetime64[s]').astype('datetime64[us]')).tz_localize('UTC')
+    except ValueError:
+        # 존재하지 않는 날짜(예: 2025-13-40)가 섞인 블록만 느린 경로로 변환
+        datetimes = pd.to_datetime(np.char.decode(stamps, 'ascii'), format='%Y-%m-%dT%H:%M:%S',
+                                   utc=True, errors='coerce').as_unit('us')
+
+    fields = {'method': method, 'endpoint': endpoint, 'status': status, 'resp_ms': resp}
+    data = {'datetime': datetimes}
+    for column in columns[1:]:
+        if column in ('method', 'endpoint'):
+            data[column] = _decode_category(fields[column])
+        else:
+            data[column] = np.array(fields[column]).astype(np.int64)
+    df = pd.DataFrame(data)
+
+    invalid = df['datetime'].isna()
+    if invalid.any():
+        df = df[~invalid].reset_index(drop=True)
+    return df
+
+
+class MappedLog:
+    """로그 파일을 메모리 매핑해 바이트 구간/시간 구간만 골라 읽는 리더
+
+    파일을 읽어 들이지 않고 mmap으로 연결해 두므로, 구간을 읽을 때도 운영체제가
+    필요한 페이지만 올립니다. build_index()는 index_stride 바이트마다 그 다음 줄의
+    시작 offset과 시각을 기록하는 희소 인덱스를 만듭니다(체크포인트마다 한 줄만
+    읽으므로 파일 크기에 비해 매우 빠름). 시간 구간 조회는 이 인덱스를 이진 탐색해
+    읽을 바이트 구간을 정하므로, 20GB 파일에서 한 시간치만 볼 때도 그 부분만 파싱합니다.
+
+    시간 구간으로 건너뛰는 것은 파일이 시간순이라고 가정합니다. 인덱스 시각이
+    시간순이 아니면(과거 로그를 뒤에 붙인 파일 등) 전체를 읽으면서 시각으로 거릅니다.
+    열 때의 파일 크기까지만 보며, 이후에 추가된 줄은 다시 열어야 보입니다.
+    """
+
+    def __init__(self, path, index_stride=DEFAULT_INDEX_STRIDE):
+        self.path = path
+        self.index_stride = index_stride
+        self._file = open(path, 'rb')
+        self.size = os.fstat(self._file.fileno()).st_size
+        # 빈 파일은 매핑할 수 없음
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+        self.index_offsets = None
+        self.index_times = None
+        self.ordered = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def line_start(self, offset):
+        """offset에서 시작하는 줄(offset이 줄 중간이면 다음 줄)의 시작 offset을 반환합니다."""
+        if offset <= 0:
+            return 0
+        if offset >= self.size:
+            return self.size
+        cut = self._map.find(b'\n', offset - 1)
+        return self.size if cut < 0 else cut + 1
+
+    def _first_time(self, offset):
+        """offset 이후 처음으로 파싱되는 줄의 epoch 초를 반환합니다."""
+        end = min(offset + TIMESTAMP_SCAN_BYTES, self.size)
+        for match in LOG_BYTES_RE.finditer(self._map, offset, end):
+            seconds = _to_epoch_seconds(match.group(1))
+            if seconds is not None:
+                return seconds
+        return None
+
+    def build_index(self):
+        """index_stride 바이트마다 (줄 시작 offset, epoch 초) 체크포인트를 기록합니다."""
+        offsets = []
+        times = []
+        for checkpoint in range(0, self.size, self.index_stride):
+            offset = self.line_start(checkpoint)
+            if offset >= self.size or (offsets and offset <= offsets[-1]):
+                continue
+            seconds = self._first_time(offset)
+            if seconds is None:
+                continue
+            offsets.append(offset)
+            times.append(seconds)
+        self.index_offsets = np.asarray(offsets, dtype=np.int64)
+        self.index_times = np.asarray(times, dtype=np.int64)
+        self.ordered = bool(np.all(np.diff(self.index_times) >= 0))
+        logger.info(f"희소 인덱스 생성: {self.path}, 체크포인트 {len(offsets)}개, 시간순 {self.ordered}")
+        if not self.ordered:
+            logger.warning(f"로그가 시간순이 아니어서 시간 구간 조회 시 전체를 읽습니다: {self.path}")
+        return self
+
+    def last_time(self):
+        """파일 끝에서 가장 가까운 줄의 시각(UTC Timestamp)을 반환합니다."""
+        if not self.size:
+            return None
+        start = self.line_start(max(self.size - TIMESTAMP_SCAN_BYTES, 0))
+        for match in reversed(list(LOG_BYTES_RE.finditer(self._map, start, self.size))):
+            seconds = _to_epoch_seconds(match.group(1))
+            if seconds is not None:
+                return pd.Timestamp(seconds, unit='s', tz='UTC')
+        return None
+
+    def _resolve_time(self, value):
+        # log_query.parse_time의 상대 시간(음수 Timedelta)은 파일 마지막 시각 기준
+        if isinstance(value, pd.Timedelta):
+            last = self.last_time()
+            return None if last is None else last + value
+        return value
+
+    def byte_range(self, start_offset=0, end_offset=None, start=None, end=None):
+        """조건에 맞는 줄들이 들어 있는 줄 경계 기준 [시작, 끝) 바이트 구간을 반환합니다."""
+        lo = self.line_start(start_offset)
+        hi = self.size if end_offset is None else self.line_start(min(end_offset, self.size))
+        if (start is None and end is None) or not self.ordered:
+            return lo, hi
+        if self.index_offsets is None:
+            self.build_index()
+            if not self.ordered:
+                return lo, hi
+        times = self.index_times
+        if start is not None:
+            # start 이전 체크포인트부터 읽어야 그 사이의 줄을 놓치지 않음
+            i = int(np.searchsorted(times, start.value // 10**9, side='left')) - 1
+            if i > 0:
+                lo = max(lo, int(self.index_offsets[i]))
+        if end is not None:
+            # end 이상인 첫 체크포인트부터는 모두 end 이후 (to는 포함하지 않음)
+            j = int(np.searchsorted(times, -(-end.value // 10**9), side='left'))
+            if j < len(times):
+                hi = min(hi, int(self.index_offsets[j]))
+        return lo, max(lo, hi)
+
+    def iter_frames(self, start_offset=0, end_offset=None, start=None, end=None,
+                    columns=None, block_size=DEFAULT_BLOCK_SIZE):
+        """구간 안의 줄들을 block_size 바이트씩 파싱한 DataFrame으로 차례로 돌려줍니다.
+
+        start_offset/end_offset은 그 구간 안에서 시작하는 줄만 고르고, start/end
+        (UTC Timestamp 또는 log_query.parse_time의 상대 시간)는 start <= 시각 < end인
+        행만 남깁니다.
+        """
+        if not self.size:
+            return
+        start = self._resolve_time(start)
+        end = self._resolve_time(end)
+        lo, hi = self.byte_range(start_offset, end_offset, start, end)
+        logger.info(f"구간 읽기: {self.path} [{lo}, {hi}) / {self.size} 바이트")
+
+        pos = lo
+        while pos < hi:
+            stop = min(pos + block_size, hi)
+            if stop < hi:
+                cut = self._map.rfind(b'\n', pos, stop)
+                # 블록보다 긴 줄이면 그 줄 끝까지 한 블록으로 읽음
+                stop = self.line_start(stop) if cut < 0 else cut + 1
+            df = parse_mapped_block(self._map, pos, stop, columns)
+            pos = stop
+            if start is not None and not df.empty:
+                df = df[df['datetime'] >= start]
+            if end is not None and not df.empty:
+                df = df[df['datetime'] < end]
+            if not df.empty:
+                yield df.reset_index(drop=True)
+
+    def read_frame(self, start_offset=0, end_offset=None, start=None, end=None, columns=None):
+        """iter_frames의 결과를 하나의 DataFrame으로 합쳐 반환합니다."""
+        frames = list(self.iter_frames(start_offset, end_offset, start, end, columns))
+        if not frames:
+            return empty_frame()
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+
+def read_log_range(path, start_offset=0, end_offset=None, start=None, end=None, columns=None):
+    """로그 파일의 바이트/시간 구간만 메모리 매핑으로 읽어 DataFrame으로 반환합니다."""
+    try:
+        with MappedLog(path) as log:
+            df = log.read_frame(start_offset, end_offset, start, end, columns)
+        logger.info(f"구간 읽기 완료: {path}, {len(df)} 개의 레코드")
+        return df
+    except Exception as e:
+        logger.error(f"구간 읽기 오류: {path}, {str(e)}\n{traceback.format_exc()}")
+        return empty_frame()
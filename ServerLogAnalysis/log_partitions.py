@@ -0,0 +1,370 @@
+import os
+import time
+import shutil
+import logging
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from log_cache import CACHE_DIR_NAME, ColumnCache
+from log_ingest import DECOMPRESS_THREADS, columns_to_frame, expand_log_paths, is_compressed, iter_parsed_columns, merge_columns
+from log_query import QueryError
+from log_store import LogStore
+from log_tailer import HEAD_SIZE, LogTailer
+
+# 로깅 설정
+def setup_logging():
+    """로깅 설정을 초기화합니다."""
+    log_dir = 'logs'
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    # 파티션 저장소 로거 설정
+    logger = logging.getLogger('log_partitions')
+    logger.setLevel(logging.INFO)
+
+    # 파일 핸들러 설정
+    file_handler = logging.FileHandler(f'{log_dir}/log_partitions.log', encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+
+    # 포맷터 설정
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    file_handler.setFormatter(formatter)
+
+    # 핸들러 추가
+    logger.addHandler(file_handler)
+
+    return logger
+
+# 로거 초기화
+logger = setup_logging()
+
+# 파티션의 파일 목록(새로 로테이션된 파일, 이름이 바뀐 현재 파일 등)을 다시 확인하는 주기 (초)
+RESOLVE_INTERVAL = 5.0
+
+# 백그라운드 수집 스레드가 새로 추가된 줄을 확인하는 주기 (초)
+REFRESH_INTERVAL = 1.0
+
+# SERVER_LOG_SOURCES 환경 변수에서 소스를 구분하는 문자 (소스 안의 여러 패턴은 쉼표로 구분)
+SOURCE_SEPARATOR = ';'
+
+
+def source_name(pattern, by_directory=False):
+    """패턴에서 기본 소스 이름을 만듭니다.
+
+    디렉토리는 디렉토리 이름, 파일/glob은 파일 이름의 첫 '.' 앞부분입니다.
+    by_directory가 True이면 파일/glob도 상위 디렉토리 이름을 씁니다
+    (호스트별 디렉토리에 같은 이름의 파일이 있는 경우: web1/access.log, web2/access.log).
+    """
+    pattern = pattern.rstrip('/\\')
+    if os.path.isdir(pattern):
+        return os.path.basename(pattern)
+    if by_directory:
+        return os.path.basename(os.path.dirname(os.path.abspath(pattern)))
+    return os.path.basename(pattern).split('.')[0]
+
+
+def parse_source_specs(specs):
+    """'web1=/var/log/web1/access.log*;/var/log/web2' 같은 소스 목록을 [(이름, [패턴])]으로 바꿉니다.
+
+    specs는 문자열(SOURCE_SEPARATOR로 구분) 또는 문자열 목록입니다. 소스마다
+    '이름=패턴1,패턴2' 또는 '패턴' 형식이며, 이름을 생략하면 source_name()으로 정합니다.
+    패턴은 파일, 디렉토리(안의 모든 파일), glob(로테이션/압축된 파일 포함)입니다.
+    """
+    if isinstance(specs, str):
+        specs = specs.split(SOURCE_SEPARATOR)
+    sources = []
+    for spec in specs:
+        spec = spec.strip()
+        if not spec:
+            continue
+        name, sep, patterns = spec.partition('=')
+        if not sep:
+            name, patterns = '', spec
+        patterns = [pattern.strip() for pattern in patterns.split(',') if pattern.strip()]
+        sources.append((name.strip(), patterns))
+
+    # 이름을 생략한 소스는 파일 이름으로, 파일 이름이 겹치면 상위 디렉토리 이름으로 정함
+    stems = [source_name(patterns[0]) for name, patterns in sources if not name]
+    named = []
+    for name, patterns in sources:
+        if not name:
+            name = source_name(patterns[0])
+            if stems.count(name) > 1:
+                name = source_name(patterns[0], by_directory=True)
+        if name in [other for other, _ in named]:
+            raise ValueError(f"소스 이름이 겹칩니다: {name} ('이름=패턴' 형식으로 이름을 지정하세요)")
+        named.append((name, patterns))
+    return named
+
+
+def expand_source(patterns):
+    """소스 하나의 패턴들을 실제 파일 목록으로 펼칩니다 (수정 시각이 오래된 파일부터)."""
+    return expand_log_paths([os.path.join(pattern, '*') if os.path.isdir(pattern) else pattern
+                             for pattern in patterns])
+
+
+def merge_sorted_frames(frames):
+    """각각 시간순으로 정렬된 DataFrame들을 시간순 하나로 합칩니다 (k-way 병합).
+
+    이어 붙인 뒤 안정 정렬하면 numpy의 timsort가 이미 정렬된 구간(파티션별 결과)을
+    찾아 병합만 하므로 O(n log k)입니다. 시각이 같으면 앞 파티션의 행이 먼저 옵니다.
+    method/endpoint는 파티션마다 문자열 사전이 다르므로 사전을 합친 Categorical로 둡니다.
+    """
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+    columns = {}
+    for column in frames[0].columns:
+        parts = [frame[column] for frame in frames]
+        if isinstance(parts[0].dtype, pd.CategoricalDtype):
+            columns[column] = pd.Series(union_categoricals(parts, ignore_order=True))
+        else:
+            columns[column] = pd.concat(parts, ignore_index=True)
+    merged = pd.DataFrame(columns)
+    order = np.argsort(merged['datetime'].array.asi8, kind='stable')
+    return merged.take(order).reset_index(drop=True)
+
+
+class LogPartition(LogStore):
+    """소스(호스트) 하나의 로그 파일들을 모아 담는 LogStore
+
+    패턴에 맞는 파일 중 가장 최근에 수정된 압축되지 않은 파일을 현재 파일로 보고
+    이어서 읽습니다. 나머지(로테이션된 이전 파일, .gz 등)는 처음에 한 번만 읽어
+    현재 파일보다 앞에 둡니다. 이전 파일의 파싱 결과는 inode별 컬럼 캐시에 저장하므로
+    로테이션으로 이름만 바뀌면(server.log.1 -> server.log.2) 다시 파싱하지 않습니다.
+
+    현재 파일이 로테이션/truncate되거나, RESOLVE_INTERVAL마다 다시 확인한 파일 목록이
+    바뀌면 이전 파일부터 다시 채웁니다(대부분 캐시에서 읽음).
+    """
+
+    def __init__(self, name, patterns, parser, consumers=(), columns=None):
+        self.name = name
+        self.patterns = list(patterns)
+        self.archives, live = self._resolve()
+        self._current_layout = self._layout(self.archives, live)
+        self._next_resolve = time.monotonic() + RESOLVE_INTERVAL
+        super().__init__(live, parser, cache=ColumnCache(live) if live else None, consumers=consumers,
+                         columns=columns)
+
+    def _resolve(self):
+        """(이전 파일 목록, 현재 파일)을 반환합니다. 압축되지 않은 파일이 없으면 현재 파일은 None."""
+        paths = expand_source(self.patterns)
+        plain = [path for path in paths if not is_compressed(path)]
+        live = plain[-1] if plain else None
+        return [path for path in paths if path != live], live
+
+    def _layout(self, archives, live):
+        """파일 구성 비교용 값. 로테이션 직후 아직 쓰이던 이전 파일이 더 커져도 다시 채우도록 크기를 포함합니다."""
+        sizes = []
+        for path in archives:
+            try:
+                sizes.append((path, os.path.getsize(path)))
+            except FileNotFoundError:
+                sizes.append((path, None))
+        return tuple(sizes), live
+
+    def _archive_cache(self, path, inode):
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR_NAME, f'archive-{self.name}-{inode}')
+        return ColumnCache(path, cache_dir=cache_dir)
+
+    def _read_archive(self, path):
+        """이전 파일 하나를 읽습니다. 같은 inode의 캐시가 파일 끝까지 있으면 캐시를 씁니다."""
+        st = os.stat(path)
+        cache = self._archive_cache(path, st.st_ino)
+        df, meta = cache.load()
+        if df is not None and meta['offset'] == st.st_size:
+            return df
+        parts = list(iter_parsed_columns([path], workers=1))
+        df = columns_to_frame(merge_columns(parts)) if parts else self.parser('')
+        with open(path, 'rb') as f:
+            head = f.read(HEAD_SIZE)
+        try:
+            cache.append(df, 0, st.st_size, st.st_ino, head)
+        except OSError as e:
+            # 로그 디렉토리에 쓸 수 없어도 수집은 계속함 (다음에 다시 파싱)
+            logger.warning(f"[{self.name}] 이전 파일 캐시를 저장하지 못했습니다 ({path}): {str(e)}")
+        logger.info(f"[{self.name}] 이전 파일 파싱 완료: {path}, {len(df)} 개의 레코드")
+        return df
+
+    def _prune_archive_caches(self):
+        """더 이상 없는 이전 파일(보관 기간이 지나 지워진 파일 등)의 캐시를 지웁니다."""
+        keep = set()
+        directories = set()
+        for path in self.archives:
+            try:
+                keep.add(f'archive-{self.name}-{os.stat(path).st_ino}')
+            except FileNotFoundError:
+                continue
+            directories.add(os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR_NAME))
+        prefix = f'archive-{self.name}-'
+        for directory in directories:
+            for entry in os.listdir(directory) if os.path.isdir(directory) else []:
+                if entry.startswith(prefix) and entry not in keep:
+                    shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+
+    def _warm_start(self):
+        """이전 파일들을 먼저 채운 뒤 현재 파일의 캐시를 읽습니다.
+
+        캐시에 없는 압축 파일 여러 개는 스레드로 동시에 풀고, 채우는 순서는 파일 순서를 따릅니다.
+        """
+        loaded = 0
+        with ThreadPoolExecutor(max_workers=min(DECOMPRESS_THREADS, len(self.archives)) or 1,
+                                thread_name_prefix=f'archive-{self.name}') as pool:
+            futures = [(path, pool.submit(self._read_archive, path)) for path in self.archives]
+            for path, future in futures:
+                try:
+                    df = future.result()
+                except FileNotFoundError:
+                    # 목록을 만든 뒤 지워진 파일 (다음 확인 때 목록에서 빠짐)
+                    continue
+                except Exception as e:
+                    logger.error(f"[{self.name}] 이전 파일 읽기 오류 ({path}): {str(e)}\n{traceback.format_exc()}")
+                    continue
+                if not df.empty:
+                    self.columns.append(df)
+                    self._notify(df)
+                    loaded += len(df)
+        if loaded:
+            self.version += 1
+        self._prune_archive_caches()
+        super()._warm_start()
+
+    def _stat_signature(self):
+        if self.log_file is None:
+            return None
+        return super()._stat_signature()
+
+    def _rebuild(self, archives, live):
+        """파일 구성이 바뀌었을 때 이전 파일부터 다시 채우고 현재 파일을 새로 읽습니다."""
+        logger.info(f"[{self.name}] 파일 구성 변경 감지, 파티션을 다시 채웁니다: 이전 파일 {len(archives)}개, 현재 파일 {live}")
+        LogStore._reset(self)
+        self.archives = archives
+        self._current_layout = self._layout(archives, live)
+        self.log_file = live
+        self.cache = ColumnCache(live) if live else None
+        self.tailer = LogTailer(live)
+        if live is not None:
+            self.tailer.poll()
+        self._warm_start()
+
+    def _reset(self):
+        # 현재 파일이 로테이션/truncate됨: 이전 내용은 로테이션된 파일로 옮겨졌으므로 파일 목록부터 다시 확인
+        self._rebuild(*self._resolve())
+
+    def refresh(self):
+        rebuilt = False
+        now = time.monotonic()
+        if now >= self._next_resolve:
+            self._next_resolve = now + RESOLVE_INTERVAL
+            with self._lock:
+                files = self._resolve()
+                if self._layout(*files) != self._current_layout:
+                    self._rebuild(*files)
+                    self._signature = None
+                    self.version += 1
+                    rebuilt = True
+        return super().refresh() or rebuilt
+
+
+class PartitionedLogStore:
+    """여러 소스(호스트)의 로그를 파티션별로 따로 수집하고 조회할 때 합치는 저장소
+
+    파티션마다 자기 파일/offset/캐시와 증분 집계(consumer)를 가지므로 한 호스트의
+    로그가 추가되거나 로테이션돼도 다른 파티션은 다시 읽지 않습니다. 조회할 때
+    hosts로 파티션을 고르면 고른 파티션만 갱신/조회하므로, 호스트를 추가해도 다른
+    호스트만 조회하는 비용은 그대로입니다. 행 조회는 파티션별 시간순 결과를 k-way
+    병합하고, 집계는 파티션별 consumer의 결과를 합쳐서 씁니다.
+    """
+
+    def __init__(self, partitions):
+        # partitions: {이름: LogStore} (LogPartition, 공유 열을 읽는 SharedLogStore 등)
+        self.partitions = dict(partitions)
+
+    def select(self, hosts=None):
+        """hosts(이름 목록, None이면 전체)에 해당하는 [(이름, LogStore)]를 설정 순서대로 반환합니다."""
+        if hosts is None:
+            return list(self.partitions.items())
+        unknown = [host for host in hosts if host not in self.partitions]
+        if unknown:
+            raise QueryError(f"알 수 없는 호스트입니다: {', '.join(unknown)} (가능: {', '.join(self.partitions)})")
+        return [(name, store) for name, store in self.partitions.items() if name in hosts]
+
+    def refresh(self, hosts=None):
+        """고른 파티션들에 새로 추가된 줄을 반영합니다. 하나라도 바뀌었으면 True를 반환합니다."""
+        changed = False
+        for _, store in self.select(hosts):
+            changed = store.refresh() or changed
+        return changed
+
+    def versions(self, hosts=None):
+        """고른 파티션별 (이름, inode, offset, 버전) 튜플을 반환합니다 (응답 캐시 키/ETag용)."""
+        return tuple((name,) + tuple(store.position()) + (store.version,) for name, store in self.select(hosts))
+
+    def consumers(self, kind, hosts=None):
+        """고른 파티션들의 consumer 중 kind 타입인 것을 [(이름, consumer)]로 반환합니다."""
+        return [(name, consumer) for name, store in self.select(hosts)
+                for consumer in store.consumers if isinstance(consumer, kind)]
+
+    def _absolute(self, partitions, conditions):
+        """상대 시간(-15m 등)을 고른 파티션 전체의 마지막 로그 시각 기준 절대 시각으로 바꿉니다."""
+        relative = [name for name in ('start', 'end') if isinstance(conditions.get(name), pd.Timedelta)]
+        if not relative:
+            return conditions
+        latest = [store.latest() for _, store in partitions]
+        latest = [ts for ts in latest if ts is not None]
+        if not latest:
+            return conditions
+        return dict(conditions, **{name: max(latest) + conditions[name] for name in relative})
+
+    def query_partitions(self, hosts=None, **conditions):
+        """조건에 맞는 행을 파티션별 [(이름, DataFrame)]으로 반환합니다 (순서가 필요 없는 집계용)."""
+        partitions = self.select(hosts)
+        conditions = self._absolute(partitions, conditions)
+        return [(name, store.query(**conditions)) for name, store in partitions]
+
+    def query(self, hosts=None, **conditions):
+        """조건(LogStore.query와 같음)에 맞는 행을 모든 파티션에서 찾아 시간순으로 반환합니다.
+
+        반환된 DataFrame의 index는 합친 결과 안에서의 순서입니다.
+        """
+        return merge_sorted_frames([df for _, df in self.query_partitions(hosts, **conditions)])
+
+
+class BackgroundRefresher:
+    """저장소에 새로 추가된 줄을 interval마다 반영하는 백그라운드 수집 스레드
+
+    요청 스레드는 refresh()를 부르지 않고 마지막으로 게시된 versions()만 읽으므로,
+    파일 읽기와 파싱이 응답 캐시 키를 만드는 시간에 끼어들지 않습니다.
+    """
+
+    def __init__(self, store, interval=REFRESH_INTERVAL):
+        # store: refresh()가 있는 저장소 (PartitionedLogStore 등)
+        self.store = store
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='log-ingest', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while True:
+            try:
+                self.store.refresh()
+            except Exception as e:
+                logger.error(f"백그라운드 수집 오류: {str(e)}\n{traceback.format_exc()}")
+            if self._stop.wait(self.interval):
+                break
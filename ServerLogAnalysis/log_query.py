@@ -0,0 +1,109 @@
+import re
+
+import pandas as pd
+from pandas.errors import OutOfBoundsDatetime, OutOfBoundsTimedelta
+
+# 상대 시간 형식: -15m, -2h, -1d, -30s (마지막 로그 시각 기준)
+RELATIVE_TIME_RE = re.compile(r"^-(\d+)([smhd])$")
+
+RELATIVE_UNITS = {'s': 'seconds', 'm': 'minutes', 'h': 'hours', 'd': 'days'}
+
+# 상태 코드 조건 형식: 404 또는 5xx
+STATUS_RE = re.compile(r"^([1-5])(?:xx|(\d{2}))$", re.IGNORECASE)
+
+
+class QueryError(ValueError):
+    """조회 조건 형식이 잘못됐을 때 발생하는 예외"""
+
+
+def _split(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def parse_time(value):
+    """시각 파라미터를 pd.Timestamp(UTC) 또는 상대 시간 pd.Timedelta로 변환합니다.
+
+    ISO 8601 문자열(2025-07-04T13:52:10Z), epoch 초(1751637130),
+    마지막 로그 시각 기준 상대 시간(-15m)을 받습니다.
+    """
+    value = value.strip()
+    match = RELATIVE_TIME_RE.match(value)
+    try:
+        if match:
+            amount, unit = match.groups()
+            return -pd.Timedelta(**{RELATIVE_UNITS[unit]: int(amount)})
+        if value.isdigit():
+            return pd.Timestamp(int(value), unit='s', tz='UTC')
+    except (OutOfBoundsDatetime, OutOfBoundsTimedelta, OverflowError):
+        raise QueryError(f"표현할 수 있는 시각 범위를 벗어났습니다: {value}")
+    try:
+        ts = pd.Timestamp(value)
+    except (ValueError, OverflowError):
+        # OutOfBoundsDatetime(예: 99999-01-01)도 ValueError의 하위 클래스
+        raise QueryError(f"시각 형식을 알 수 없습니다: {value}")
+    return ts.tz_localize('UTC') if ts.tzinfo is None else ts.tz_convert('UTC')
+
+
+def parse_duration(value):
+    """'15m', '1h' 같은 기간 파라미터를 초 단위 정수로 변환합니다."""
+    match = RELATIVE_TIME_RE.match('-' + value.strip().lstrip('-'))
+    if not match:
+        raise QueryError(f"기간 형식을 알 수 없습니다: {value}")
+    amount, unit = match.groups()
+    try:
+        return int(pd.Timedelta(**{RELATIVE_UNITS[unit]: int(amount)}).total_seconds())
+    except (OutOfBoundsTimedelta, OverflowError):
+        raise QueryError(f"표현할 수 있는 기간 범위를 벗어났습니다: {value}")
+
+
+def parse_status(value):
+    """'404,5xx' 같은 상태 코드 조건을 [(시작, 끝)] 반열린 구간 목록으로 변환합니다."""
+    ranges = []
+    for item in _split(value):
+        match = STATUS_RE.match(item)
+        if not match:
+            raise QueryError(f"상태 코드 형식을 알 수 없습니다: {item}")
+        if match.group(2) is None:
+            low = int(match.group(1)) * 100
+            ranges.append((low, low + 100))
+        else:
+            code = int(item)
+            ranges.append((code, code + 1))
+    return ranges
+
+
+def parse_query_args(args):
+    """요청 파라미터(dict 형태)에서 LogStore.query에 넘길 조건을 만듭니다.
+
+    host(여러 소스를 수집할 때 조회할 호스트 목록)는 조건이 아니라 파티션을 고르는
+    데 쓰이며, PartitionedLogStore의 hosts로 따로 넘깁니다.
+    지정하지 않은 조건은 빠지므로, 조건이 없으면 빈 dict를 반환합니다.
+    형식이 잘못되면 QueryError를 발생시킵니다.
+    """
+    query = {}
+    if args.get('from'):
+        query['start'] = parse_time(args['from'])
+    if args.get('to'):
+        query['end'] = parse_time(args['to'])
+    if args.get('endpoint'):
+        query['endpoint'] = _split(args['endpoint'])
+    if args.get('method'):
+        query['method'] = [method.upper() for method in _split(args['method'])]
+    if args.get('status'):
+        query['status'] = parse_status(args['status'])
+    if args.get('host'):
+        query['host'] = _split(args['host'])
+    return query
+
+
+def normalize_query(query):
+    """parse_query_args 결과를 캐시 키로 쓸 수 있는 정렬된 튜플로 바꿉니다.
+
+    쉼표 목록은 순서와 관계없이 같은 키가 되도록 정렬합니다.
+    """
+    items = []
+    for name, value in sorted(query.items()):
+        if isinstance(value, list):
+            value = tuple(sorted(value))
+        items.append((name, value))
+    return tuple(items)
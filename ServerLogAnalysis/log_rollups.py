@@ -0,0 +1,219 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from latency_sketch import LatencySketch, sketches_by_group
+
+# 집계 단위(초)와 보관 기간(초). 보관 기간이 None이면 계속 보관
+# 모든 단위를 수집 시점에 함께 갱신하므로, 오래된 분 단위 버킷을 지워도
+# 같은 구간이 시간/일 단위 버킷에 그대로 남아 있습니다.
+TIERS = {
+    'minute': (60, 6 * 3600),
+    'hour': (3600, 7 * 86400),
+    'day': (86400, None),
+}
+
+# 상태 코드 클래스 (1xx~5xx, 그 외는 0)
+STATUS_CLASSES = ['1xx', '2xx', '3xx', '4xx', '5xx']
+
+
+class RollupBucket:
+    """한 시간 구간 x 엔드포인트 x 메소드의 집계값"""
+
+    __slots__ = ('count', 'status_counts', 'latency_sum', 'sketch')
+
+    def __init__(self):
+        self.count = 0
+        self.status_counts = np.zeros(len(STATUS_CLASSES) + 1, dtype=np.int64)
+        self.latency_sum = 0
+        self.sketch = LatencySketch()
+
+    def merge(self, other):
+        self.count += other.count
+        self.status_counts += other.status_counts
+        self.latency_sum += other.latency_sum
+        self.sketch.merge(other.sketch)
+        return self
+
+    def status_count(self, status_class):
+        """'2xx' 같은 상태 코드 클래스의 건수를 반환합니다."""
+        return int(self.status_counts[STATUS_CLASSES.index(status_class) + 1])
+
+    def avg_latency(self):
+        return self.latency_sum / self.count if self.count else 0
+
+
+class RollupStore:
+    """분/시간/일 단위로 미리 집계해 둔 롤업 저장소
+
+    원본 행 대신 (구간 시작 시각, 엔드포인트, 메소드)별 버킷에 건수,
+    상태 코드 클래스별 건수, 응답시간 합계와 스케치를 유지합니다. 차트/통계
+    조회는 수백만 행 대신 수천 개의 버킷만 읽습니다. 보관 기간은 로그의
+    마지막 시각을 기준으로 하므로 과거 로그를 다시 읽어도 그대로 동작합니다.
+    """
+
+    def __init__(self, tiers=None):
+        self.tiers = dict(TIERS if tiers is None else tiers)
+        self._buckets = {tier: {} for tier in self.tiers}
+        self._lock = threading.RLock()
+        self.earliest = None
+        self.latest = None
+
+    def update(self, df):
+        """파싱된 행들을 모든 단위의 버킷에 반영합니다."""
+        if df.empty:
+            return
+        seconds = df['datetime'].dt.as_unit('s').array.asi8
+        status_class = df['status'].to_numpy() // 100
+        status_class[(status_class < 1) | (status_class > len(STATUS_CLASSES))] = 0
+        resp = df['resp_ms'].to_numpy()
+        endpoint = df['endpoint'].to_numpy(dtype=object)
+        method = df['method'].to_numpy(dtype=object)
+
+        with self._lock:
+            for tier, (width, _) in self.tiers.items():
+                keys = pd.DataFrame({'start': seconds - seconds % width, 'endpoint': endpoint, 'method': method})
+                grouped = keys.groupby(['start', 'endpoint', 'method'], sort=True)
+                codes = grouped.ngroup().to_numpy()
+                group_keys = grouped.size().index
+                n_groups = len(group_keys)
+
+                counts = np.bincount(codes, minlength=n_groups)
+                latency = np.bincount(codes, weights=resp, minlength=n_groups)
+                status_counts = np.zeros((n_groups, len(STATUS_CLASSES) + 1), dtype=np.int64)
+                np.add.at(status_counts, (codes, status_class), 1)
+                sketches = sketches_by_group(codes, resp)
+
+                buckets = self._buckets[tier]
+                for i, key in enumerate(group_keys):
+                    bucket = buckets.get(key)
+                    if bucket is None:
+                        bucket = buckets[key] = RollupBucket()
+                    bucket.count += int(counts[i])
+                    bucket.status_counts += status_counts[i]
+                    bucket.latency_sum += int(latency[i])
+                    bucket.sketch.merge(sketches[i])
+
+            earliest = int(seconds.min())
+            latest = int(seconds.max())
+            self.earliest = earliest if self.earliest is None else min(self.earliest, earliest)
+            self.latest = latest if self.latest is None else max(self.latest, latest)
+            self.compact()
+
+    def compact(self):
+        """보관 기간이 지난 버킷을 지웁니다 (더 큰 단위 버킷에는 남아 있음)."""
+        if self.latest is None:
+            return
+        with self._lock:
+            for tier, (width, retention) in self.tiers.items():
+                if retention is None:
+                    continue
+                cutoff = self.latest - retention
+                buckets = self._buckets[tier]
+                expired = [key for key in buckets if key[0] + width <= cutoff]
+                for key in expired:
+                    del buckets[key]
+
+    def clear(self):
+        with self._lock:
+            self._buckets = {tier: {} for tier in self.tiers}
+            self.earliest = None
+            self.latest = None
+
+    def time_range(self):
+        """가장 이른/늦은 로그 시각(epoch 초)을 (earliest, latest)로 반환합니다. 비어 있으면 None."""
+        with self._lock:
+            return None if self.latest is None else (self.earliest, self.latest)
+
+    def bucket_count(self):
+        return sum(len(buckets) for buckets in self._buckets.values())
+
+    def _select(self, tier, start=None, end=None, endpoint=None, method=None):
+        """조건에 맞는 (키, 버킷) 목록을 반환합니다. start/end는 epoch 초입니다."""
+        with self._lock:
+            items = list(self._buckets[tier].items())
+        width = self.tiers[tier][0]
+        return [
+            (key, bucket) for key, bucket in items
+            if (start is None or key[0] + width > start)
+            and (end is None or key[0] < end)
+            and (endpoint is None or key[1] == endpoint)
+            and (method is None or key[2] == method)
+        ]
+
+    def totals(self, tier='day', **filters):
+        """조건에 맞는 버킷을 모두 합친 RollupBucket을 반환합니다."""
+        total = RollupBucket()
+        for _, bucket in self._select(tier, **filters):
+            total.merge(bucket)
+        return total
+
+    def by_endpoint(self, tier='day', **filters):
+        """엔드포인트별로 합친 {엔드포인트: RollupBucket}을 반환합니다."""
+        result = {}
+        for key, bucket in self._select(tier, **filters):
+            result.setdefault(key[1], RollupBucket()).merge(bucket)
+        return dict(sorted(result.items()))
+
+    def series(self, tier='hour', **filters):
+        """구간 시작 시각(epoch 초)별로 합친 {시각: RollupBucket}을 시간순으로 반환합니다."""
+        result = {}
+        for key, bucket in self._select(tier, **filters):
+            result.setdefault(key[0], RollupBucket()).merge(bucket)
+        return dict(sorted(result.items()))
+
+    def hour_of_day(self, **filters):
+        """시간 단위 버킷을 하루 중 시각(0~23시)별 건수로 합칩니다.
+
+        시간 단위 버킷의 보관 기간(기본 7일) 안의 데이터만 반영됩니다.
+        """
+        result = {}
+        for key, bucket in self._select('hour', **filters):
+            hour = (key[0] // 3600) % 24
+            result[hour] = result.get(hour, 0) + bucket.count
+        return dict(sorted(result.items()))
+
+
+class CombinedRollups:
+    """여러 RollupStore(파티션별 롤업)를 하나처럼 조회하는 읽기 전용 보기
+
+    버킷을 미리 합쳐 두지 않고, 조회할 때마다 파티션별로 같은 조회를 한 뒤 결과만
+    합칩니다. 그래서 비용은 조회한 파티션들의 버킷 수에만 비례하고, 다른 파티션에
+    로그가 추가돼도 다시 합칠 것이 없습니다.
+    """
+
+    def __init__(self, stores):
+        self.stores = list(stores)
+
+    def totals(self, tier='day', **filters):
+        total = RollupBucket()
+        for store in self.stores:
+            total.merge(store.totals(tier, **filters))
+        return total
+
+    def time_range(self):
+        ranges = [r for r in (store.time_range() for store in self.stores) if r is not None]
+        if not ranges:
+            return None
+        return min(r[0] for r in ranges), max(r[1] for r in ranges)
+
+    def _merge_groups(self, method, *args, **filters):
+        result = {}
+        for store in self.stores:
+            for key, bucket in getattr(store, method)(*args, **filters).items():
+                result.setdefault(key, RollupBucket()).merge(bucket)
+        return dict(sorted(result.items()))
+
+    def by_endpoint(self, tier='day', **filters):
+        return self._merge_groups('by_endpoint', tier, **filters)
+
+    def series(self, tier='hour', **filters):
+        return self._merge_groups('series', tier, **filters)
+
+    def hour_of_day(self, **filters):
+        result = {}
+        for store in self.stores:
+            for hour, count in store.hour_of_day(**filters).items():
+                result[hour] = result.get(hour, 0) + count
+        return dict(sorted(result.items()))
@@ -0,0 +1,291 @@
+import os
+import json
+import signal
+import shutil
+import argparse
+import logging
+import tempfile
+import threading
+import traceback
+
+import numpy as np
+
+from log_cache import ColumnCache
+from log_columns import CATEGORY_COLUMNS, COLUMN_DTYPES, INITIAL_CAPACITY, ColumnBuffer
+from log_parser import parse_log_block
+from log_partitions import LogPartition, parse_source_specs
+from log_store import LogStore
+
+# 로깅 설정
+def setup_logging():
+    """로깅 설정을 초기화합니다."""
+    log_dir = 'logs'
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    # 공유 열 저장소 로거 설정
+    logger = logging.getLogger('log_shared')
+    logger.setLevel(logging.INFO)
+
+    # 파일 핸들러 설정
+    file_handler = logging.FileHandler(f'{log_dir}/log_shared.log', encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+
+    # 포맷터 설정
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    file_handler.setFormatter(formatter)
+
+    # 핸들러 추가
+    logger.addHandler(file_handler)
+
+    return logger
+
+# 로거 초기화
+logger = setup_logging()
+
+# 수집 담당 프로세스가 로그 파일 변경을 확인하는 주기 (초)
+INGEST_INTERVAL = 1.0
+
+# 게시 상태 파일 이름 (이 파일이 바뀌어야 작업자들이 새 행을 봄)
+STATE_FILE = 'state.json'
+
+# 작업자가 새로 게시된 행을 consumer들에게 나눠 전달하는 단위 (행)
+NOTIFY_CHUNK_ROWS = 100000
+
+# 공유 열 파일을 둘 디렉토리 (tmpfs인 /dev/shm이 있으면 그 아래, 없으면 임시 디렉토리)
+SHARED_MEMORY_ROOT = '/dev/shm'
+
+
+def create_shared_directory():
+    """공유 열 파일을 둘 새 디렉토리를 만들어 경로를 반환합니다."""
+    root = SHARED_MEMORY_ROOT if os.path.isdir(SHARED_MEMORY_ROOT) else None
+    return tempfile.mkdtemp(prefix='loganalysis-', dir=root)
+
+
+def source_directory(root, index):
+    """여러 소스를 수집할 때 index번째 소스의 공유 열 디렉토리 (root 아래, 소스마다 하나)"""
+    return os.path.join(root, f'source-{index}')
+
+
+def _generation_dir(directory, generation):
+    return os.path.join(directory, f'gen-{generation}')
+
+
+def _column_path(directory, generation, column):
+    return os.path.join(_generation_dir(directory, generation), f'{column}.bin')
+
+
+class SharedColumnBuffer(ColumnBuffer):
+    """열 배열을 공유 메모리 파일에 두는 ColumnBuffer (수집 담당 프로세스용)
+
+    열마다 directory/gen-<세대>/<열>.bin 파일을 MAP_SHARED로 매핑해 행을 씁니다.
+    용량이 부족하면 파일을 늘려 다시 매핑할 뿐 기존 행을 복사하지 않으므로, 이미
+    매핑한 쪽(이전 DataFrame, 다른 프로세스)도 그대로 유효합니다. 로그 파일이
+    교체돼 clear()되면 새 세대 디렉토리에 씁니다.
+
+    작업자들은 publish()가 state.json을 바꿔 쓴 뒤에야 새 행을 보므로, 쓰는 중인
+    행을 읽는 일은 없습니다.
+    """
+
+    def __init__(self, directory, capacity=INITIAL_CAPACITY):
+        self.directory = directory
+        self.generation = 0
+        self._stale = []
+        super().__init__(capacity)
+
+    def _map(self, column, capacity):
+        path = _column_path(self.directory, self.generation, column)
+        dtype = np.dtype(COLUMN_DTYPES[column])
+        with open(path, 'ab'):
+            pass
+        os.truncate(path, capacity * dtype.itemsize)
+        return np.memmap(path, dtype=dtype, mode='r+', shape=(capacity,))
+
+    def _allocate(self, capacity):
+        if self.generation:
+            # 작업자가 아직 이전 세대를 보고 있을 수 있으므로 다음 게시 후에 지움
+            self._stale.append(self.generation)
+        self.generation += 1
+        os.makedirs(_generation_dir(self.directory, self.generation), exist_ok=True)
+        self.size = 0
+        self._arrays = {column: self._map(column, capacity) for column in COLUMN_DTYPES}
+        self.categories = {column: [] for column in CATEGORY_COLUMNS}
+        self._lookup = {column: {} for column in CATEGORY_COLUMNS}
+
+    def _reserve(self, rows):
+        needed = self.size + rows
+        if needed <= self.capacity:
+            return
+        capacity = max(needed, self.capacity * 2)
+        for column in self._arrays:
+            self._arrays[column] = self._map(column, capacity)
+
+    def publish(self, **info):
+        """현재 행 수/문자열 사전과 info(원본 위치, 버전 등)를 작업자들에게 게시합니다."""
+        state = dict(info, generation=self.generation, rows=self.size, categories=self.categories)
+        path = os.path.join(self.directory, STATE_FILE)
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+        for generation in self._stale:
+            shutil.rmtree(_generation_dir(self.directory, generation), ignore_errors=True)
+        self._stale = []
+
+
+class SharedColumnView(ColumnBuffer):
+    """SharedColumnBuffer가 게시한 열을 읽기 전용으로 매핑해 보여 주는 ColumnBuffer
+
+    열 파일을 매핑만 하므로 작업자 수와 관계없이 행 데이터는 메모리에 한 벌만
+    있습니다. refresh()로 게시 상태를 다시 읽기 전까지는 같은 행만 보입니다.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.generation = None
+        self.state = {}
+        self._signature = None
+        super().__init__(0)
+
+    def append(self, df):
+        raise TypeError('공유 열 보기는 읽기 전용입니다')
+
+    def refresh(self):
+        """게시 상태가 바뀌었으면 다시 매핑합니다.
+
+        (바뀌었는지, 세대가 바뀌어 처음부터 다시 읽어야 하는지)를 반환합니다.
+        """
+        path = os.path.join(self.directory, STATE_FILE)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return False, False
+        signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if signature == self._signature:
+            return False, False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            rows = state['rows']
+            arrays = {}
+            for column, dtype in COLUMN_DTYPES.items():
+                if rows:
+                    arrays[column] = np.memmap(_column_path(self.directory, state['generation'], column),
+                                               dtype=dtype, mode='r', shape=(rows,))
+                else:
+                    arrays[column] = np.zeros(0, dtype=dtype)
+        except (FileNotFoundError, ValueError):
+            # 게시 도중(이전 세대가 지워지는 중 등)이면 다음 호출에서 다시 시도
+            return False, False
+
+        reset = state['generation'] != self.generation
+        self._arrays = arrays
+        self.size = rows
+        self.categories = state['categories']
+        self.generation = state['generation']
+        self.state = state
+        self._signature = signature
+        return True, reset
+
+
+class SharedLogStore(LogStore):
+    """수집 담당 프로세스가 게시한 공유 열을 읽기만 하는 LogStore (서빙 작업자용)
+
+    로그 파일을 직접 읽거나 파싱하지 않습니다. refresh()는 게시 상태를 확인해
+    새로 게시된 행만 consumer들에게 전달하며, 버전과 원본 위치는 수집 담당
+    프로세스의 값을 그대로 쓰므로 모든 작업자의 데이터 버전(ETag 등)이 같습니다.
+    """
+
+    def __init__(self, log_file, directory, consumers=()):
+        super().__init__(log_file, None, consumers=consumers, columns=SharedColumnView(directory))
+        self.refresh()
+
+    def _warm_start(self):
+        pass
+
+    def refresh(self):
+        with self._lock:
+            try:
+                old_rows = len(self.columns)
+                changed, reset = self.columns.refresh()
+                if not changed:
+                    return False
+                if reset:
+                    old_rows = 0
+                    self._times = np.zeros(0, dtype=np.int64)
+                    self._order = None
+                    for consumer in self.consumers:
+                        consumer.clear()
+                # 시작 직후에는 수백만 행이 한꺼번에 들어오므로 나눠서 전달 (집계 중 임시 메모리 제한)
+                for start in range(old_rows, len(self.columns), NOTIFY_CHUNK_ROWS):
+                    self._notify(self.columns.to_wide_frame(start, start + NOTIFY_CHUNK_ROWS))
+                self.version = self.columns.state.get('version', self.version + 1)
+                return True
+            except Exception as e:
+                logger.error(f"공유 열 갱신 오류: {str(e)}\n{traceback.format_exc()}")
+                return False
+
+    def position(self):
+        state = self.columns.state
+        return state.get('inode'), state.get('offset', 0)
+
+
+def run_ingest_owner(log_file, directory, interval=INGEST_INTERVAL, stop=None, source=None):
+    """로그 파일을 수집해 공유 열로 게시하는 루프 (수집 담당 프로세스 하나에서만 실행)
+
+    stop(threading/multiprocessing Event)이 설정될 때까지 interval마다 새로 추가된
+    줄을 파싱해 디스크 캐시와 공유 열에 반영합니다. source((이름, [패턴]))를 주면
+    log_file 대신 그 소스의 파일들(로테이션/압축된 파일 포함)을 LogPartition으로 수집합니다.
+    """
+    stop = stop or threading.Event()
+    try:
+        columns = SharedColumnBuffer(directory)
+        if source is not None:
+            name, patterns = source
+            store = LogPartition(name, patterns, parse_log_block, columns=columns)
+            published_source = name
+        else:
+            store = LogStore(log_file, parse_log_block, cache=ColumnCache(log_file), columns=columns)
+            published_source = os.path.abspath(log_file)
+        changed = True
+        while True:
+            changed = store.refresh() or changed
+            if changed:
+                inode, offset = store.position()
+                store.columns.publish(source=published_source, inode=inode, offset=offset,
+                                      version=store.version)
+                logger.info(f"공유 열 게시 ({published_source}): {len(store.columns)} 개의 레코드 (버전 {store.version})")
+                changed = False
+            if stop.wait(interval):
+                break
+    except Exception as e:
+        logger.error(f"수집 담당 프로세스 오류: {str(e)}\n{traceback.format_exc()}")
+        raise
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='로그 파일을 수집해 공유 열로 게시 (serve.py가 실행)')
+    parser.add_argument('directory', help='공유 열 파일을 둘 디렉토리')
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--log-file', help='수집할 로그 파일')
+    target.add_argument('--source', help='수집할 소스 하나 (이름=패턴1,패턴2, serve.py --source와 같은 형식)')
+    parser.add_argument('--interval', type=float, default=INGEST_INTERVAL, help='변경 확인 주기(초)')
+    args = parser.parse_args()
+    stop_event = threading.Event()
+    # 종료 요청을 받으면 진행 중인 갱신을 마치고 끝냄
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+
+    # 서버 프로세스가 강제 종료돼 정리하지 못했으면 스스로 끝냄
+    parent_pid = os.getppid()
+
+    def watch_parent():
+        while not stop_event.wait(args.interval):
+            if os.getppid() != parent_pid:
+                logger.warning("서버 프로세스가 종료되어 수집을 멈춥니다")
+                stop_event.set()
+    threading.Thread(target=watch_parent, daemon=True).start()
+    try:
+        source = parse_source_specs([args.source])[0] if args.source else None
+        run_ingest_owner(args.log_file, args.directory, args.interval, stop_event, source=source)
+    except KeyboardInterrupt:
+        pass
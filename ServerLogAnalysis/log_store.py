@@ -0,0 +1,281 @@
+import os
+import time
+import logging
+import threading
+import traceback
+
+import numpy as np
+import pandas as pd
+
+from log_columns import ColumnBuffer
+from log_tailer import LogTailer
+from perf_metrics import metrics
+
+# 로깅 설정
+def setup_logging():
+    """로깅 설정을 초기화합니다."""
+    log_dir = 'logs'
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    # 로그 저장소 로거 설정
+    logger = logging.getLogger('log_store')
+    logger.setLevel(logging.INFO)
+
+    # 파일 핸들러 설정
+    file_handler = logging.FileHandler(f'{log_dir}/log_store.log', encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+
+    # 포맷터 설정
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    file_handler.setFormatter(formatter)
+
+    # 핸들러 추가
+    logger.addHandler(file_handler)
+
+    return logger
+
+# 로거 초기화
+logger = setup_logging()
+
+
+class LogStore:
+    """프로세스 전역에서 공유하는 로그 데이터 저장소
+
+    LogTailer로 새로 추가된 줄만 읽어 파싱한 뒤 기존 데이터 뒤에 붙입니다.
+    파일의 크기/수정시각/inode가 그대로면 파일을 열지 않고 메모리에 있는
+    DataFrame을 그대로 돌려줍니다. 행은 ColumnBuffer에 행당 약 20바이트로
+    보관하고, get_df()는 버퍼를 복사 없이 보여 주는 DataFrame(method/endpoint는
+    Categorical, status는 uint16, resp_ms는 uint32)을 돌려줍니다. 반환된
+    DataFrame은 여러 스레드가 함께 쓰므로 읽기 전용으로 다뤄야 합니다.
+    """
+
+    def __init__(self, log_file, parser, cache=None, consumers=(), columns=None):
+        # parser: 여러 줄로 된 텍스트 블록을 받아 DataFrame을 반환하는 함수
+        # cache: 파싱 결과를 디스크에 저장해 두는 ColumnCache (없으면 사용 안 함)
+        # consumers: 새로 들어온 행을 update(df)로, 초기화를 clear()로 전달받는 객체들
+        #            (롤업 등 증분 집계를 저장소와 함께 유지하는 용도)
+        # columns: 행을 보관할 ColumnBuffer (없으면 새로 만듦. 공유 메모리 버퍼 등)
+        self.log_file = log_file
+        self.parser = parser
+        self.cache = cache
+        self.consumers = list(consumers)
+        self.tailer = LogTailer(log_file)
+        self._lock = threading.Lock()
+        self.columns = ColumnBuffer() if columns is None else columns
+        self._df = pd.DataFrame()
+        self._df_version = 0
+        # 시각 인덱스: 시간순으로 정렬된 datetime 값과, 행이 시간순이 아닐 때의 정렬 순서
+        self._times = np.zeros(0, dtype=np.int64)
+        self._time_unit = 'us'
+        self._order = None
+        self._signature = None
+        self.version = 0
+        # 응답 캐시 키에 쓰는 원본 위치. 갱신이 끝나 버전과 함께 게시될 때만 바꿈
+        # (tailer.offset은 읽는 도중에도 전진하므로 그대로 보여 주지 않음)
+        self._position = (None, 0)
+        self._warm_start()
+
+    def _warm_start(self):
+        """캐시가 있으면 읽어 두고, 캐시된 offset 이후부터 이어서 파싱합니다."""
+        if self.cache is None:
+            return
+        with metrics.timer('ingest.cache_load') as timer:
+            df, meta = self.cache.load()
+            timer.rows = 0 if df is None else len(df)
+        metrics.inc('column_cache_loads_total', help_text='디스크 캐시 로드 시도 횟수', result='miss' if df is None else 'hit')
+        if df is None:
+            return
+        self.columns.append(df)
+        self._notify(df)
+        self.tailer.offset = meta['offset']
+        self.tailer.inode = meta['inode']
+        self.tailer.head = bytes.fromhex(meta['head'])
+        self._position = (self.tailer.inode, self.tailer.offset)
+        self.version += 1
+        logger.info(f"캐시에서 {len(df)} 개의 레코드를 불러왔습니다 (offset {meta['offset']})")
+
+    def _notify(self, df):
+        """새로 추가된 행을 consumer들에게 전달합니다."""
+        if df.empty:
+            return
+        for consumer in self.consumers:
+            try:
+                with metrics.timer(f'ingest.consumer.{type(consumer).__name__}', rows=len(df)):
+                    consumer.update(df)
+            except Exception as e:
+                logger.error(f"증분 집계 갱신 오류 ({type(consumer).__name__}): {str(e)}\n{traceback.format_exc()}")
+
+    def _reset(self):
+        """원본 파일이 교체돼 처음부터 다시 읽기 전에 기존 행과 증분 집계를 비웁니다."""
+        self.columns.clear()
+        self._times = np.zeros(0, dtype=np.int64)
+        self._order = None
+        for consumer in self.consumers:
+            consumer.clear()
+
+    def _stat_signature(self):
+        """파일 크기/수정시각/inode로 변경 여부 판단용 시그니처를 만듭니다."""
+        try:
+            st = os.stat(self.log_file)
+            return (st.st_size, st.st_mtime_ns, st.st_ino)
+        except FileNotFoundError:
+            return None
+
+    def refresh(self):
+        """새로 추가된 줄을 반영합니다. 데이터가 바뀌었으면 True를 반환합니다."""
+        signature = self._stat_signature()
+        if signature == self._signature:
+            return False
+
+        with self._lock:
+            # 락을 기다리는 동안 다른 스레드가 이미 갱신했을 수 있음
+            signature = self._stat_signature()
+            if signature == self._signature:
+                return False
+            try:
+                rotated = self.tailer.poll()
+                if rotated:
+                    self._reset()
+                    # 행을 이미 비웠으므로 바로 버전을 올려 게시함. 이어지는 읽기가 실패해도
+                    # 교체 전 행으로 만든 스냅샷/응답 캐시를 계속 내보내지 않음
+                    self.version += 1
+                    self._position = (self.tailer.inode, self.tailer.offset)
+
+                start_offset = self.tailer.offset
+                position = (self.tailer.offset, self.tailer.inode, self.tailer.head)
+                new_frames = []
+                # 블록 읽기와 파싱이 번갈아 일어나므로 전체 시간에서 파싱 시간을 빼 읽기 시간으로 봄
+                started = time.perf_counter()
+                parse_seconds = 0.0
+                try:
+                    for block in self.tailer.iter_blocks():
+                        parse_started = time.perf_counter()
+                        df = self.parser(block)
+                        parse_seconds += time.perf_counter() - parse_started
+                        if not df.empty:
+                            new_frames.append(df)
+                    read_seconds = time.perf_counter() - started - parse_seconds
+                    new_df = pd.concat(new_frames, ignore_index=True) if new_frames else self.parser('')
+                    added = len(new_df)
+                    if added:
+                        # 한 번에 붙여야 중간에 실패해도 일부 행만 들어가는 일이 없음
+                        with metrics.timer('ingest.append', rows=added):
+                            self.columns.append(new_df)
+                except Exception:
+                    # iter_blocks가 이미 offset을 전진시켰으므로 되돌려 다음 갱신에서 같은 구간을 다시 읽게 함
+                    self.tailer.offset, self.tailer.inode, self.tailer.head = position
+                    raise
+                changed = rotated or added > 0
+
+                if self.tailer.offset != start_offset:
+                    metrics.observe('ingest.read', read_seconds)
+                    metrics.observe('ingest.parse', parse_seconds, added)
+                    metrics.inc('ingest_bytes_total', self.tailer.offset - start_offset, help_text='수집한 로그 바이트 수')
+                    self._notify(new_df)
+                    if self.cache is not None:
+                        with metrics.timer('ingest.cache_write', rows=len(new_df)):
+                            self.cache.append(new_df, start_offset, self.tailer.offset, self.tailer.inode, self.tailer.head)
+
+                self._signature = signature
+                self._position = (self.tailer.inode, self.tailer.offset)
+                if added:
+                    self.version += 1
+                if changed:
+                    logger.info(f"로그 저장소 갱신: {added} 개의 레코드 추가 (버전 {self.version})")
+                return changed
+            except Exception as e:
+                logger.error(f"로그 저장소 갱신 오류: {str(e)}\n{traceback.format_exc()}")
+                return False
+
+    def position(self):
+        """마지막으로 게시한 원본 파일의 (inode, 읽은 바이트 offset)을 반환합니다."""
+        return self._position
+
+    def latest(self):
+        """가장 늦은 로그 시각(UTC pd.Timestamp)을 반환합니다. 행이 없으면 None을 반환합니다."""
+        _, times, _ = self._snapshot()
+        if not len(times):
+            return None
+        return pd.Timestamp(int(times[-1]), unit=self._time_unit, tz='UTC')
+
+    def get_df(self):
+        """마지막으로 갱신한 상태의 로그 DataFrame을 반환합니다."""
+        return self._snapshot()[0]
+
+    def _snapshot(self):
+        """마지막으로 갱신한 상태의 (DataFrame, 정렬된 시각 배열, 정렬 순서)를 함께 반환합니다.
+
+        파일을 다시 확인하지 않으므로, 새로 추가된 줄을 보려면 먼저 refresh()를 불러야 합니다.
+        """
+        with self._lock:
+            if self._df_version != self.version:
+                # 버퍼를 복사 없이 보여 주는 DataFrame을 만들어 두고 다음 호출부터는 재사용
+                df = self.columns.to_frame() if len(self.columns) else pd.DataFrame()
+                self._update_index(df)
+                self._df = df
+                self._df_version = self.version
+            return self._df, self._times, self._order
+
+    def _update_index(self, df):
+        """datetime 열의 정렬 인덱스를 갱신합니다.
+
+        로그는 보통 시간순으로 덧붙여지므로, 이전까지 정렬돼 있었고 새로 붙은
+        행들도 순서가 맞으면 새 행만 확인하고 넘어갑니다. 순서가 어긋난 경우에만
+        전체를 (안정) 정렬한 순서를 만들어 둡니다.
+        """
+        if df.empty or 'datetime' not in df:
+            self._times = np.zeros(0, dtype=np.int64)
+            self._order = None
+            return
+        times = df['datetime'].array.asi8
+        self._time_unit = df['datetime'].dt.unit
+        old_rows = len(self._times)
+        if self._order is None and 0 < old_rows <= len(times):
+            # 이전 행들은 이미 정렬돼 있으므로 마지막 이전 행부터만 확인
+            tail = times[old_rows - 1:]
+        else:
+            tail = times
+        if np.all(tail[1:] >= tail[:-1]):
+            self._times = times
+            self._order = None
+        else:
+            self._order = np.argsort(times, kind='stable')
+            self._times = times[self._order]
+
+    def query(self, start=None, end=None, endpoint=None, method=None, status=None):
+        """조건에 맞는 행을 시간순으로 반환합니다.
+
+        start/end는 pd.Timestamp(end는 포함하지 않음) 또는 마지막 로그 시각 기준의
+        음수 pd.Timedelta입니다. 시간 구간은 정렬된 시각 배열에서 이진 탐색으로
+        찾으므로, 나머지 조건은 구간에 속한 행에만 적용됩니다.
+        endpoint/method는 값 목록, status는 [(시작, 끝)] 구간 목록입니다.
+        반환된 DataFrame의 index는 전체 DataFrame에서의 행 번호입니다.
+        """
+        df, times, order = self._snapshot()
+        if df.empty:
+            return df
+
+        bounds = []
+        for bound, default in ((start, 0), (end, len(times))):
+            if bound is None:
+                bounds.append(default)
+                continue
+            if isinstance(bound, pd.Timedelta):
+                bound = pd.Timestamp(int(times[-1]), unit=self._time_unit, tz='UTC') + bound
+            value = pd.DatetimeIndex([bound]).as_unit(self._time_unit).asi8[0]
+            bounds.append(int(np.searchsorted(times, value, side='left')))
+        lo, hi = bounds[0], max(bounds)
+
+        result = df.iloc[lo:hi] if order is None else df.take(order[lo:hi])
+        if endpoint is not None:
+            result = result[result['endpoint'].isin(endpoint)]
+        if method is not None:
+            result = result[result['method'].isin(method)]
+        if status is not None:
+            codes = result['status'].to_numpy()
+            mask = np.zeros(len(result), dtype=bool)
+            for low, high in status:
+                mask |= (codes >= low) & (codes < high)
+            result = result[mask]
+        return result
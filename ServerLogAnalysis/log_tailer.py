@@ -0,0 +1,118 @@
+import os
+import logging
+
+# 로깅 설정
+def setup_logging():
+    """로깅 설정을 초기화합니다."""
+    log_dir = 'logs'
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    # 로그 테일러 로거 설정
+    logger = logging.getLogger('log_tailer')
+    logger.setLevel(logging.INFO)
+
+    # 파일 핸들러 설정
+    file_handler = logging.FileHandler(f'{log_dir}/log_tailer.log', encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+
+    # 포맷터 설정
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    file_handler.setFormatter(formatter)
+
+    # 핸들러 추가
+    logger.addHandler(file_handler)
+
+    return logger
+
+# 로거 초기화
+logger = setup_logging()
+
+# 한 번에 읽어들이는 최대 바이트 수
+DEFAULT_BLOCK_SIZE = 16 * 1024 * 1024
+
+# 같은 inode에서 파일을 새로 쓴 경우를 구분하기 위해 비교하는 앞부분 바이트 수
+HEAD_SIZE = 256
+
+
+class LogTailer:
+    """추가(append)만 되는 로그 파일을 이어서 읽는 테일러
+
+    마지막으로 읽은 완전한 줄의 끝 위치(offset)를 기억하고, 다음 호출에서는
+    그 이후에 추가된 바이트만 읽습니다. 줄바꿈으로 끝나지 않은 마지막 줄은
+    아직 쓰는 중인 것으로 보고 다음 호출로 미룹니다.
+    inode가 바뀌었거나(로테이션) 파일 크기가 offset보다 작아지거나 앞부분 내용이
+    달라지면(truncate 후 재작성) 처음부터 다시 읽습니다.
+    """
+
+    def __init__(self, log_file, block_size=DEFAULT_BLOCK_SIZE):
+        self.log_file = log_file
+        self.block_size = block_size
+        self.offset = 0
+        self.inode = None
+        self.head = b''
+
+    def _reset(self, inode, reason):
+        logger.info(f"로그 파일 {reason} 감지, 처음부터 다시 읽습니다: {self.log_file}")
+        self.offset = 0
+        self.inode = inode
+        self.head = b''
+
+    def _read_head(self):
+        with open(self.log_file, 'rb') as f:
+            return f.read(HEAD_SIZE)
+
+    def poll(self):
+        """파일 상태를 확인해 로테이션/truncate 여부를 처리합니다.
+
+        기존에 읽은 데이터를 버리고 처음부터 다시 채워야 하면 True를 반환합니다.
+        """
+        try:
+            st = os.stat(self.log_file)
+        except FileNotFoundError:
+            if self.offset > 0 or self.inode is not None:
+                self._reset(None, '삭제')
+                return True
+            return False
+
+        reset = False
+        if self.inode is not None and st.st_ino != self.inode:
+            self._reset(st.st_ino, '로테이션')
+            reset = True
+        elif st.st_size < self.offset:
+            self._reset(st.st_ino, 'truncate')
+            reset = True
+        elif self.offset > 0 and not self._read_head().startswith(self.head):
+            self._reset(st.st_ino, '재작성')
+            reset = True
+        self.inode = st.st_ino
+        return reset
+
+    def iter_blocks(self, final=False):
+        """offset 이후에 추가된 완전한 줄들을 블록 단위 문자열로 돌려줍니다.
+
+        final이 True이면 줄바꿈으로 끝나지 않은 마지막 줄도 함께 돌려줍니다.
+        (더 이상 추가되지 않는 파일을 한 번에 읽을 때 사용)
+        """
+        if not os.path.exists(self.log_file):
+            return
+        with open(self.log_file, 'rb') as f:
+            if self.offset == 0:
+                self.head = f.read(HEAD_SIZE)
+            f.seek(self.offset)
+            pending = b''
+            while True:
+                chunk = f.read(self.block_size)
+                if not chunk:
+                    break
+                data = pending + chunk
+                cut = data.rfind(b'\n')
+                if cut < 0:
+                    pending = data
+                    continue
+                self.offset += cut + 1
+                pending = data[cut + 1:]
+                yield data[:cut + 1].decode('utf-8', errors='replace')
+            if final and pending:
+                self.offset += len(pending)
+                yield pending.decode('utf-8', errors='replace')
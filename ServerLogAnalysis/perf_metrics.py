@@ -0,0 +1,294 @@
+import io
+import os
+import sys
+import time
+import pstats
+import cProfile
+import threading
+from collections import Counter, defaultdict
+
+# Prometheus 지표 이름 접두사
+METRIC_PREFIX = 'loganalysis'
+
+# 소요 시간 히스토그램 구간 경계 (초)
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# 샘플링 프로파일러 기본값 (초)
+DEFAULT_SAMPLE_SECONDS = 5.0
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+
+class _Histogram:
+    """구간별 누적 건수와 합계를 유지하는 Prometheus 히스토그램 하나"""
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+
+class StageTimer:
+    """with 블록의 소요 시간을 단계 이름으로 기록하는 타이머
+
+    처리한 행 수는 생성 시 rows로 주거나 블록 안에서 timer.rows에 넣습니다.
+    블록에서 예외가 나도 소요 시간은 기록합니다.
+    """
+
+    def __init__(self, registry, stage, rows=None):
+        self.registry = registry
+        self.stage = stage
+        self.rows = rows
+        self.seconds = None
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self._started
+        self.registry.observe(self.stage, self.seconds, self.rows)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def current_rss_bytes():
+    """현재 RSS(바이트)를 반환합니다. /proc이 없는 환경이면 None."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss_bytes():
+    """프로세스 시작 후 최대 RSS(바이트)를 반환합니다. 측정할 수 없는 환경이면 None."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class MetricsRegistry:
+    """단계별 소요 시간/처리 행 수, HTTP 요청, 카운터, 게이지를 모아 두는 저장소
+
+    단계 이름은 'ingest.parse', 'analysis.compute'처럼 점으로 구분합니다.
+    render()는 전체를 Prometheus 텍스트 형식으로 돌려줍니다. 모든 기록은 잠금
+    하나로 보호되며 호출당 비용은 마이크로초 수준입니다.
+    """
+
+    def __init__(self, prefix=METRIC_PREFIX):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._stages = {}
+            self._stage_rows = Counter()
+            self._last_rows_per_second = {}
+            self._requests = {}
+            self._counters = defaultdict(Counter)
+            self._counter_help = {}
+            self._gauges = {}
+
+    def timer(self, stage, rows=None):
+        return StageTimer(self, stage, rows)
+
+    def observe(self, stage, seconds, rows=None):
+        """단계 하나의 소요 시간(초)과 처리한 행 수를 기록합니다."""
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = _Histogram()
+            histogram.observe(seconds)
+            if rows is not None:
+                self._stage_rows[stage] += rows
+                if seconds > 0:
+                    self._last_rows_per_second[stage] = rows / seconds
+
+    def observe_request(self, route, method, status, seconds):
+        """HTTP 요청 하나의 소요 시간을 경로/메서드/상태 코드별로 기록합니다."""
+        key = (route, method, str(status))
+        with self._lock:
+            histogram = self._requests.get(key)
+            if histogram is None:
+                histogram = self._requests[key] = _Histogram()
+            histogram.observe(seconds)
+
+    def inc(self, name, value=1, help_text=None, **labels):
+        """카운터를 value만큼 늘립니다."""
+        with self._lock:
+            self._counters[name][tuple(sorted(labels.items()))] += value
+            if help_text:
+                self._counter_help[name] = help_text
+
+    def register_gauge(self, name, help_text, collect, kind='gauge'):
+        """render() 때마다 collect()를 불러 값을 읽는 게이지를 등록합니다.
+
+        collect()는 숫자 하나 또는 {라벨 dict의 튜플: 값} dict를 반환합니다.
+        값이 None이면 그 게이지는 출력하지 않습니다. 다른 객체가 이미 세고 있는
+        누적 값(캐시 적중 횟수 등)은 kind='counter'로 등록합니다.
+        """
+        with self._lock:
+            self._gauges[name] = (help_text, collect, kind)
+
+    def stage_summary(self):
+        """단계별 {count, total_seconds, max_seconds, rows, rows_per_second}를 반환합니다."""
+        with self._lock:
+            summary = {}
+            for stage, histogram in sorted(self._stages.items()):
+                rows = self._stage_rows.get(stage)
+                summary[stage] = {
+                    'count': histogram.count,
+                    'total_seconds': histogram.sum,
+                    'max_seconds': histogram.max,
+                    'rows': rows,
+                    'rows_per_second': rows / histogram.sum if rows and histogram.sum else None,
+                }
+            return summary
+
+    def _render_histogram(self, lines, name, histograms):
+        for labels, histogram in histograms:
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                lines.append(f'{name}_bucket{_labels(labels + (("le", _number(bound)),))} {count}')
+            lines.append(f'{name}_bucket{_labels(labels + (("le", "+Inf"),))} {histogram.count}')
+            lines.append(f'{name}_sum{_labels(labels)} {_number(histogram.sum)}')
+            lines.append(f'{name}_count{_labels(labels)} {histogram.count}')
+
+    def render(self):
+        """모든 지표를 Prometheus 텍스트 형식(0.0.4)으로 반환합니다."""
+        prefix = self.prefix
+        lines = []
+        with self._lock:
+            stages = sorted(self._stages.items())
+            stage_rows = dict(self._stage_rows)
+            rows_per_second = dict(self._last_rows_per_second)
+            requests = sorted(self._requests.items())
+            counters = {name: dict(values) for name, values in self._counters.items()}
+            counter_help = dict(self._counter_help)
+            gauges = dict(self._gauges)
+
+        name = f'{prefix}_stage_duration_seconds'
+        lines.append(f'# HELP {name} 단계별 소요 시간(초)')
+        lines.append(f'# TYPE {name} histogram')
+        self._render_histogram(lines, name, [((('stage', stage),), histogram) for stage, histogram in stages])
+
+        name = f'{prefix}_stage_rows_total'
+        lines.append(f'# HELP {name} 단계별 처리한 행 수')
+        lines.append(f'# TYPE {name} counter')
+        for stage, rows in sorted(stage_rows.items()):
+            lines.append(f'{name}{_labels((("stage", stage),))} {rows}')
+
+        name = f'{prefix}_stage_rows_per_second'
+        lines.append(f'# HELP {name} 단계별 마지막 실행의 초당 처리 행 수')
+        lines.append(f'# TYPE {name} gauge')
+        for stage, value in sorted(rows_per_second.items()):
+            lines.append(f'{name}{_labels((("stage", stage),))} {_number(value)}')
+
+        name = f'{prefix}_http_request_duration_seconds'
+        lines.append(f'# HELP {name} API 경로별 응답 시간(초)')
+        lines.append(f'# TYPE {name} histogram')
+        self._render_histogram(lines, name, [
+            ((('route', route), ('method', method), ('status', status)), histogram)
+            for (route, method, status), histogram in requests
+        ])
+
+        for counter, values in sorted(counters.items()):
+            name = f'{prefix}_{counter}'
+            if counter in counter_help:
+                lines.append(f'# HELP {name} {counter_help[counter]}')
+            lines.append(f'# TYPE {name} counter')
+            for labels, value in sorted(values.items()):
+                lines.append(f'{name}{_labels(labels)} {_number(value)}')
+
+        gauges.setdefault('process_resident_memory_bytes', ('현재 RSS(바이트)', current_rss_bytes, 'gauge'))
+        gauges.setdefault('process_peak_resident_memory_bytes', ('최대 RSS(바이트)', peak_rss_bytes, 'gauge'))
+        for gauge, (help_text, collect, kind) in sorted(gauges.items()):
+            name = gauge if gauge.startswith('process_') else f'{prefix}_{gauge}'
+            try:
+                value = collect()
+            except Exception:
+                continue
+            if value is None:
+                continue
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            if isinstance(value, dict):
+                for labels, item in sorted(value.items()):
+                    lines.append(f'{name}{_labels(labels)} {_number(item)}')
+            else:
+                lines.append(f'{name} {_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """render() 결과를 파일로 저장합니다 (node_exporter textfile 수집기 등에서 읽도록)."""
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(temp_path, path)
+
+
+# 프로세스 전역 지표 저장소
+metrics = MetricsRegistry()
+
+
+def profile_call(function, sort='cumulative', limit=40):
+    """function()을 cProfile로 실행하고 (결과, pstats 텍스트)를 반환합니다."""
+    profiler = cProfile.Profile()
+    result = profiler.runcall(function)
+    output = io.StringIO()
+    pstats.Stats(profiler, stream=output).sort_stats(sort).print_stats(limit)
+    return result, output.getvalue()
+
+
+def sample_stacks(seconds=DEFAULT_SAMPLE_SECONDS, interval=DEFAULT_SAMPLE_INTERVAL):
+    """seconds 동안 interval마다 모든 스레드의 호출 스택을 샘플링합니다.
+
+    결과는 flamegraph.pl/speedscope가 읽는 접힌 스택 형식
+    ('스레드;파일:함수;... 횟수')이며, 많이 잡힌 스택부터 정렬합니다.
+    cProfile과 달리 다른 스레드(요청 처리, 실시간 피드 등)도 함께 보이고
+    실행 중인 코드를 느리게 만들지 않습니다.
+    """
+    own = threading.get_ident()
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    stacks = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            calls = []
+            while frame is not None:
+                code = frame.f_code
+                calls.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+                frame = frame.f_back
+            stacks[';'.join([names.get(ident, str(ident))] + calls[::-1])] += 1
+        time.sleep(interval)
+    return ''.join(f'{stack} {count}\n' for stack, count in stacks.most_common())
@@ -0,0 +1,165 @@
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+
+# 기본 최대 항목 수 (넘으면 가장 오래 쓰지 않은 항목부터 버림)
+DEFAULT_MAX_ENTRIES = 256
+
+# 기본 유지 시간 (초)
+DEFAULT_TTL = 5.0
+
+
+class _Flight:
+    """계산 중인 키 하나의 결과를 기다리는 요청들이 공유하는 자리"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+        self._lock = threading.Lock()
+        # 이벤트 루프에서 기다리는 요청들의 (루프, asyncio Future)
+        self._waiters = []
+
+    def finish(self):
+        with self._lock:
+            self.event.set()
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+
+    async def wait_async(self):
+        """스레드를 쓰지 않고 계산이 끝나기를 기다립니다."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            if self.event.is_set():
+                return
+            self._waiters.append((loop, future))
+        await future
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class ResponseCache:
+    """API 응답 데이터를 키별로 보관하는 LRU + TTL 캐시
+
+    키에 데이터 버전을 넣어 두면 로그가 바뀐 뒤에는 자연히 새 키로 계산되고,
+    예전 버전 항목은 TTL이 지나거나 LRU로 밀려나 사라집니다. 같은 키를 동시에
+    요청하면 첫 요청만 계산하고 나머지는 그 결과를 기다려 함께 씁니다
+    (single-flight). 계산 중 예외가 나면 기다리던 요청들도 같은 예외를 받고,
+    결과는 캐시하지 않습니다.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, default_ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_compute(self, key, compute, ttl=None):
+        """캐시된 값이 있으면 돌려주고, 없으면 compute()로 계산해 저장합니다."""
+        hit, value, flight, leader = self._lookup(key)
+        if hit:
+            return value
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        done = False
+        try:
+            flight.value = compute()
+            done = True
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            self._land(key, flight, done, ttl)
+
+    async def get_or_compute_async(self, key, compute, ttl=None):
+        """get_or_compute의 asyncio 버전입니다. compute는 코루틴 함수이며,
+        다른 요청의 계산을 기다리는 동안 이벤트 루프를 막지 않습니다."""
+        hit, value, flight, leader = self._lookup(key)
+        if hit:
+            return value
+
+        if not leader:
+            await flight.wait_async()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        done = False
+        try:
+            flight.value = await compute()
+            done = True
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            self._land(key, flight, done, ttl)
+
+    def _lookup(self, key):
+        """(적중 여부, 캐시된 값, 계산 자리, 직접 계산할지 여부)를 반환합니다."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, entry[1], None, False
+                del self._entries[key]
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.misses += 1
+            else:
+                self.waits += 1
+            return False, None, flight, leader
+
+    def _land(self, key, flight, done, ttl):
+        """계산을 마친 자리를 치우고, 성공했으면 결과를 저장한 뒤 기다리던 요청들을 깨웁니다."""
+        with self._lock:
+            del self._flights[key]
+            if done:
+                expires_at = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+                self._entries[key] = (expires_at, flight.value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        flight.finish()
+
+    def put(self, key, value, ttl=None):
+        """값을 직접 저장합니다 (요청이 포기한 뒤 늦게 끝난 계산 결과 등)."""
+        expires_at = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """캐시 적중/실패/대기 횟수와 현재 항목 수를 반환합니다."""
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses, 'waits': self.waits}
@@ -15,6 +15,9 @@ import logging
 import traceback
 from pathlib import Path
 
+from log_analysis import IncrementalAnalyzer
+from log_cache import ColumnCache
+
 # 로깅 설정
 def setup_logging():
     """로깅 설정을 초기화합니다."""
@@ -45,6 +48,10 @@ logger = setup_logging()
 # 전역 변수로 분석 중단 플래그 추가
 analysis_running = True
 
+# 분석 대상 로그 파일과 분석 주기(초)
+LOG_FILE = 'server_sample.log'
+ANALYSIS_INTERVAL = 5
+
 def run_log_generator():
     """로그 파일 자동 생성 프로세스 실행"""
     try:
@@ -68,36 +75,27 @@ def run_log_generator():
         print(f"❌ 로그 생성 오류: {e}")
 
 def run_continuous_analysis():
-    """5초마다 지속적으로 로그 분석을 실행하는 함수"""
+    """프로세스 안에서 5초마다 새로 추가된 로그만 반영해 분석하는 함수"""
     global analysis_running
     try:
-        logger.info("지속적 로그 분석 시작 (5초 간격)")
-        print("�� 지속적 로그 분석 시작 (5초 간격)...")
+        logger.info(f"지속적 로그 분석 시작 ({ANALYSIS_INTERVAL}초 간격)")
+        print(f"🔍 지속적 로그 분석 시작 ({ANALYSIS_INTERVAL}초 간격)...")
+        
+        # 매번 새 파이썬 프로세스를 띄우지 않고, 집계를 메모리에 유지하며 증분 반영
+        analyzer = IncrementalAnalyzer(LOG_FILE, cache=ColumnCache(LOG_FILE))
         
         while analysis_running:
             try:
-                logger.info("주기적 로그 분석 실행")
-                subprocess.run([
-                    sys.executable, 
-                    "ServerLogAnalysis/log_analysis.py"
-                ], check=True, timeout=10)  # 10초 타임아웃
-                
-                logger.info("주기적 로그 분석 완료")
-                
-                # 5초 대기
-                time.sleep(5)
-                
-            except subprocess.TimeoutExpired:
-                logger.warning("로그 분석 시간 초과, 다음 주기에서 재시도")
-                continue
-            except subprocess.CalledProcessError as e:
-                logger.error(f"주기적 로그 분석 프로세스 오류: {str(e)}")
-                time.sleep(5)  # 오류 발생 시에도 5초 대기
-                continue
+                changed = analyzer.tick()
+                tick_ms = analyzer.last_tick_seconds * 1000
+                if changed:
+                    logger.info(f"주기적 로그 분석 완료: {analyzer.last_added}건 반영, 리포트 갱신 ({tick_ms:.1f}ms)")
+                else:
+                    logger.info(f"주기적 로그 분석: 변경 없음 ({tick_ms:.1f}ms)")
             except Exception as e:
-                logger.error(f"주기적 로그 분석 중 예상치 못한 오류: {str(e)}")
-                time.sleep(5)
-                continue
+                logger.error(f"주기적 로그 분석 중 예상치 못한 오류: {str(e)}\n{traceback.format_exc()}")
+            
+            time.sleep(ANALYSIS_INTERVAL)
                 
     except KeyboardInterrupt:
         logger.info("사용자에 의해 지속적 로그 분석이 중단되었습니다")
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+서버 로그 분석 대시보드 운영 서버 실행 스크립트
+- 수집 담당 프로세스 하나가 로그를 파싱해 공유 메모리에 열 단위로 게시
+- gunicorn(작업자 프로세스 x 스레드) 또는 waitress(스레드)로 app.py 서빙
+- 모든 작업자는 게시된 열을 매핑해 읽으므로 작업자 수가 늘어도 로그 데이터는 한 벌
+- 여러 호스트의 로그(--source)는 소스마다 수집 담당 프로세스를 하나씩 두고 호스트별 파티션으로 게시
+"""
+
+import os
+import sys
+import time
+import signal
+import shutil
+import logging
+import argparse
+import traceback
+import subprocess
+
+from log_partitions import SOURCE_SEPARATOR, parse_source_specs
+from log_shared import STATE_FILE, create_shared_directory, source_directory
+
+# 로깅 설정
+def setup_logging():
+    """로깅 설정을 초기화합니다."""
+    log_dir = 'logs'
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    # 운영 서버 로거 설정
+    logger = logging.getLogger('serve')
+    logger.setLevel(logging.INFO)
+
+    # 파일 핸들러 설정
+    file_handler = logging.FileHandler(f'{log_dir}/serve.log', encoding='utf-8')
+    file_handler.setLevel(logging.INFO)
+
+    # 포맷터 설정
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    file_handler.setFormatter(formatter)
+
+    # 핸들러 추가
+    logger.addHandler(file_handler)
+
+    return logger
+
+# 로거 초기화
+logger = setup_logging()
+
+# 기본 로그 파일 (app.py와 같음: 프로젝트 루트의 server_sample.log)
+DEFAULT_LOG_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server_sample.log')
+
+DEFAULT_HOST = '0.0.0.0'
+DEFAULT_PORT = 5000
+
+# 작업자(또는 waitress 프로세스)당 요청 처리 스레드 수
+DEFAULT_THREADS = 8
+
+# 수집 담당 프로세스가 처음 게시할 때까지 기다리는 최대 시간 (초). 큰 로그를 캐시 없이 처음 파싱할 때를 고려
+READY_TIMEOUT = 600
+
+# 응답이 없는 gunicorn 작업자를 재시작하기까지의 시간 (초)
+WORKER_TIMEOUT = 120
+
+
+def available_server(name):
+    """name('auto'/'gunicorn'/'waitress')에 맞는 설치된 서버 이름을 반환합니다. 없으면 None."""
+    candidates = ['gunicorn', 'waitress'] if name == 'auto' else [name]
+    for candidate in candidates:
+        # gunicorn은 fork가 필요해 Windows에서는 쓸 수 없음
+        if candidate == 'gunicorn' and os.name == 'nt':
+            continue
+        try:
+            __import__(candidate)
+            return candidate
+        except ImportError:
+            continue
+    return None
+
+
+def start_ingest_owner(directory, log_file=None, source=None):
+    """수집 담당 프로세스를 띄웁니다. source((이름, [패턴]))를 주면 log_file 대신 그 소스를 수집합니다.
+
+    multiprocessing 대신 별도 파이썬 프로세스로 띄움. gunicorn 작업자는 이 프로세스에서
+    fork되므로, multiprocessing 자식으로 두면 작업자가 종료될 때 수집 프로세스까지 정리하려 함.
+    """
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'log_shared.py')
+    if source is not None:
+        name, patterns = source
+        target = ['--source', f"{name}={','.join(patterns)}"]
+    else:
+        target = ['--log-file', log_file]
+    return subprocess.Popen([sys.executable, script, directory] + target)
+
+
+def stop_ingest_owner(process):
+    """수집 담당 프로세스를 종료합니다 (진행 중인 갱신을 마칠 때까지 최대 5초 기다림)."""
+    if process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def wait_until_published(directory, process, timeout=READY_TIMEOUT):
+    """수집 담당 프로세스가 처음 게시할 때까지 기다립니다."""
+    deadline = time.monotonic() + timeout
+    state_path = os.path.join(directory, STATE_FILE)
+    while not os.path.exists(state_path):
+        if process.poll() is not None:
+            raise RuntimeError('수집 담당 프로세스가 종료되었습니다 (logs/log_shared.log 확인)')
+        if time.monotonic() > deadline:
+            raise RuntimeError(f'수집 담당 프로세스가 {timeout}초 안에 준비되지 않았습니다')
+        time.sleep(0.1)
+
+
+def run_gunicorn(host, port, workers, threads):
+    """gunicorn으로 작업자 프로세스 workers개 x 스레드 threads개를 띄워 서빙합니다."""
+    from gunicorn.app.base import BaseApplication
+
+    class DashboardApplication(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            # 작업자마다 fork 후에 app을 불러와 공유 열에 연결함 (preload 안 함)
+            from app import app
+            return app
+
+    DashboardApplication({
+        'bind': f'{host}:{port}',
+        'workers': workers,
+        'worker_class': 'gthread',
+        'threads': threads,
+        'timeout': WORKER_TIMEOUT,
+        'preload_app': False,
+    }).run()
+
+
+def run_waitress(host, port, threads):
+    """waitress로 한 프로세스에서 스레드 threads개로 서빙합니다."""
+    from waitress import serve
+    from app import app
+    # SIGTERM(서비스 관리자 종료)에도 main()의 정리 코드를 거치도록 SystemExit으로 바꿈
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    serve(app, host=host, port=port, threads=threads)
+
+
+def main(log_file=DEFAULT_LOG_FILE, host=DEFAULT_HOST, port=DEFAULT_PORT, server='auto',
+         workers=None, threads=DEFAULT_THREADS, sources=None):
+    """수집 담당 프로세스와 운영 서버를 실행합니다. 종료 시 공유 메모리를 정리합니다.
+
+    sources(이름=패턴 목록)를 주면 소스마다 수집 담당 프로세스를 띄워 소스별 공유 열로 게시하고,
+    작업자들은 이를 호스트별 파티션으로 매핑해 읽습니다.
+    """
+    server = available_server(server)
+    if server is None:
+        print('운영 서버 패키지가 없습니다. pip install gunicorn (Linux/macOS) 또는 pip install waitress로 설치하세요.')
+        logger.error("운영 서버 패키지 없음")
+        return 1
+    workers = workers or os.cpu_count() or 1
+
+    try:
+        sources = parse_source_specs(sources) if sources else None
+    except ValueError as e:
+        print(f'소스 설정 오류: {e}')
+        logger.error(f"소스 설정 오류: {str(e)}")
+        return 1
+
+    directory = create_shared_directory()
+    # app.py는 이 환경 변수를 보고 직접 파싱하는 대신 공유 열을 읽음
+    os.environ['SHARED_COLUMNS_DIR'] = directory
+    if sources:
+        # 소스마다 수집 담당 프로세스를 따로 둠 (소스끼리는 동시에 파싱, 작업자 수와 관계없이 소스당 한 벌)
+        os.environ['SERVER_LOG_SOURCES'] = SOURCE_SEPARATOR.join(
+            f"{name}={','.join(patterns)}" for name, patterns in sources)
+        owners = []
+        for index, source in enumerate(sources):
+            source_dir = source_directory(directory, index)
+            os.makedirs(source_dir)
+            owners.append((source[0], source_dir, start_ingest_owner(source_dir, source=source)))
+    else:
+        os.environ['SERVER_LOG_FILE'] = os.path.abspath(log_file)
+        owners = [(log_file, directory, start_ingest_owner(directory, log_file=log_file))]
+    server_pid = os.getpid()
+    try:
+        for name, owner_dir, process in owners:
+            logger.info(f"수집 담당 프로세스 시작: {name} -> {owner_dir}")
+            print(f'로그 수집 중: {name}')
+        for name, owner_dir, process in owners:
+            wait_until_published(owner_dir, process)
+
+        print(f'대시보드 접속: http://127.0.0.1:{port}/')
+        if server == 'gunicorn':
+            logger.info(f"gunicorn 서버 시작: {host}:{port}, 작업자 {workers}개 x 스레드 {threads}개")
+            print(f'gunicorn 서버 시작 (작업자 {workers}개 x 스레드 {threads}개)')
+            run_gunicorn(host, port, workers, threads)
+        else:
+            logger.info(f"waitress 서버 시작: {host}:{port}, 스레드 {threads}개")
+            print(f'waitress 서버 시작 (스레드 {threads}개)')
+            run_waitress(host, port, threads)
+        return 0
+    except KeyboardInterrupt:
+        logger.info("사용자에 의해 서버가 중단되었습니다")
+        return 0
+    except Exception as e:
+        logger.error(f"운영 서버 오류: {str(e)}\n{traceback.format_exc()}")
+        print(f'서버 실행 중 오류가 발생했습니다: {e}')
+        return 1
+    finally:
+        # gunicorn 작업자는 이 프로세스에서 fork되어 여기를 거쳐 종료되므로, 정리는 처음 프로세스에서만
+        if os.getpid() == server_pid:
+            for name, owner_dir, process in owners:
+                stop_ingest_owner(process)
+            shutil.rmtree(directory, ignore_errors=True)
+            logger.info("수집 담당 프로세스 종료, 공유 메모리 정리 완료")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='서버 로그 분석 대시보드 운영 서버')
+    parser.add_argument('--log-file', default=os.environ.get('SERVER_LOG_FILE') or DEFAULT_LOG_FILE,
+                        help='수집할 로그 파일 (기본: SERVER_LOG_FILE 환경 변수 또는 server_sample.log)')
+    parser.add_argument('--source', dest='sources', action='append', default=None,
+                        help='호스트별 파티션으로 수집할 소스 (이름=패턴, 여러 번 지정 가능. 예: "web1=/var/log/web1/access.log*")')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='바인드할 주소')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='바인드할 포트')
+    parser.add_argument('--server', choices=['auto', 'gunicorn', 'waitress'], default='auto',
+                        help='사용할 서버 (auto: gunicorn이 있으면 gunicorn, 없으면 waitress)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='gunicorn 작업자 프로세스 수 (기본: CPU 코어 수)')
+    parser.add_argument('--threads', type=int, default=DEFAULT_THREADS,
+                        help='작업자당 요청 처리 스레드 수')
+    args = parser.parse_args()
+    sys.exit(main(args.log_file, args.host, args.port, args.server, args.workers, args.threads, args.sources))